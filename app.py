@@ -1,32 +1,50 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 from src.models.prompt_schema import PromptSchema, UpdatePromptSchema, UpdateProjectSchema, PickAgentSchema
-from src.models.evaluateSchema import EvaluatePipelineInput, FullEvaluationResult
+from src.models.evaluateSchema import EvaluatePipelineInput, FullEvaluationResult, EvaluateBatchInput
 from src.chains.pipeline import PromptPipeline
 from src.chains.project_pipeline import ProjectPipeline
 from src.chains.update_pipeline import UpdatePipeline
 from src.chains.project_update_pipeline import ProjectUpdatePipeline
 from src.chains.evaluate_pipleline import EvaluatePipeline
+from src.chains.speculation import speculation_stats
 from src.models.project_mania_models import ProjectManiaSchema, ProjectManiaResponse
 from src.chains.project_mania_pipeline import ProjectManiaPipeline
-import re
-import json
 from src.agents.pick_agent import PickAgent
-from src.config import GOOGLE_API_KEY, GROQ_API_KEY, MISTRAL_API_KEY
+from src.agents.cascade import cascade_stats
+from src.agents.payload import payload_savings
+from src.agents.structured_output import parse_failures
+from src.model_routing import ModelRouter, stage_stats
+from src.llm_clients import PROVIDERS, build_llm, llm_pool
+from src.warmup import readiness, warm_up
+from src.prompt_cache import cache_stats, context_cache
+from src.session_store import SessionKindMismatch, SessionNotFound, session_store
+from src.template_library import template_library
+from src.token_budget import TokenBudgetExceeded
 from Crypto.Cipher import AES
 from Crypto.Hash import MD5
 from Crypto.Util.Padding import unpad
 import base64
-from src.logger import logger
+from src.logger import logger, log_payload
+from src.config import EVALUATE_BATCH_MAX_PROMPTS
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
-from fastapi.staticfiles import StaticFiles
+import json
+from contextlib import asynccontextmanager
+from src.static_assets import SPAStaticFiles
 from pathlib import Path
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_groq import ChatGroq
-from langchain_mistralai import ChatMistralAI
 
-app = FastAPI(title="PromptNova API", description="API for refining prompts using multiple styles and a framework.")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs in every worker, after any fork, so pooled connections are never shared across processes.
+    # Warmup runs in the background so the worker accepts connections at once; /ready reports 503 until it is done.
+    warmup = asyncio.create_task(warm_up())
+    yield
+    warmup.cancel()
+
+
+app = FastAPI(title="PromptNova API", description="API for refining prompts using multiple styles and a framework.", lifespan=lifespan)
 
 # Allow specific origins for local development and the Render backend itself.
 origins = [
@@ -75,7 +93,7 @@ def decrypt_cryptojs_aes(encrypted_str: str, password: str) -> str:
         decrypted = unpad(decrypted_padded, AES.block_size).decode('utf-8')
         return decrypted
     except Exception as e:
-        logger.error(f"CryptoJS AES decryption failed: {e}")
+        logger.error("CryptoJS AES decryption failed: %s", e)
         raise ValueError("Decryption failed. Invalid API key or password.")
 
 
@@ -90,33 +108,75 @@ def get_llm(prompt_input):
             raise HTTPException(status_code=400, detail="Invalid API key or password.")
 
     model_provider = prompt_input.selected_model or 'gemini' # Default to gemini if not provided
+    if model_provider not in PROVIDERS:
+        raise HTTPException(status_code=400, detail=f"Invalid model provider selected: {model_provider}")
 
-    if model_provider == 'gemini':
-        api_key = decrypted_api_key or GOOGLE_API_KEY
-        return ChatGoogleGenerativeAI(model="gemini-2.5-flash", google_api_key=api_key, temperature=0.7)
+    # Server-key models are shared so requests reuse warm connections.
+    if decrypted_api_key:
+        return build_llm(model_provider, decrypted_api_key, prompt_input.selected_groq_model)
+    return llm_pool.get(model_provider, prompt_input.selected_groq_model)
 
-    elif model_provider == 'groq':
-        api_key = decrypted_api_key or GROQ_API_KEY
-        model_name = prompt_input.selected_groq_model
-        return ChatGroq(model_name=model_name, api_key=api_key, temperature=0.7)
 
-    elif model_provider == 'mistral':
-        api_key = decrypted_api_key or MISTRAL_API_KEY
-        return ChatMistralAI(model="mistral-large-latest", api_key=api_key, temperature=0.7)
+def get_router(prompt_input, llm, overrides=None) -> ModelRouter:
+    """Per-stage models for a request; routes to other providers only apply when it runs on the server keys."""
+    return ModelRouter(llm, overrides=overrides, server_keys=not prompt_input.api_key)
 
-    else:
-        raise HTTPException(status_code=400, detail=f"Invalid model provider selected: {model_provider}")
+
+async def resolve_session(update_input, kind: str, fields: dict, required: tuple) -> tuple:
+    """
+    Completes an update request from its session, so clients can send only a session_id.
+
+    Returns the merged fields and the version they came from; (fields, None) when no session is referenced.
+    A session of another ``kind`` is a 400; a ``required`` field that is still missing after merging is a 422.
+    """
+    version = None
+    if update_input.session_id:
+        try:
+            fields, version = await asyncio.to_thread(
+                session_store.resolve, update_input.session_id, update_input.version, fields, kind
+            )
+        except SessionNotFound:
+            raise HTTPException(status_code=404, detail="Session not found or expired. Send the full payload to start a new one.")
+        except SessionKindMismatch as e:
+            raise HTTPException(status_code=400, detail=f"Session cannot be used here: {e}")
+    missing = [field for field in required if fields.get(field) is None]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"Missing {', '.join(missing)}: not in the request or the session.")
+    return fields, version
+
+
+async def save_version(session_id, kind: str, payload: dict) -> tuple:
+    """Stores ``payload`` as a new version of the session (or a new session); returns (session_id, version)."""
+    try:
+        if session_id:
+            try:
+                return session_id, await asyncio.to_thread(session_store.append, session_id, payload)
+            except SessionNotFound:
+                pass  # Expired while the pipeline ran; start over below.
+        return await asyncio.to_thread(session_store.create, kind, payload)
+    except Exception as e:
+        # The result is still returned; the client just has to send full payloads next time.
+        logger.warning("Could not store %s session version: %s", kind, e)
+        return None, None
 
 
 @app.post("/refine", response_model=PromptSchema)
 async def refine_prompt(prompt_input: PromptSchema):
     try:
         llm = get_llm(prompt_input)
-        pipeline = PromptPipeline(llm=llm)
+        pipeline = PromptPipeline(llm=llm, router=get_router(prompt_input, llm, prompt_input.model_routes))
         result = await pipeline.run(prompt_input)
+        result.session_id, result.version = await save_version(None, "prompt", {
+            "original_prompt": result.user_input,
+            "final_prompt": result.output_str,
+            "style": list(result.style),
+            "framework": result.framework,
+        })
         return result
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
-        logger.error(f"Error refining prompt: {str(e)}", exc_info=True)
+        logger.error("Error refining prompt: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error refining prompt: {str(e)}")
 
 @app.post("/project")
@@ -125,13 +185,27 @@ async def generate_project_prompt(prompt_input: PromptSchema):
         llm = get_llm(prompt_input)
         pipeline = ProjectPipeline(llm=llm)
         result = await pipeline.run(prompt_input)
+        artifacts = result.get("json_prompt")
+        if isinstance(artifacts, dict) and "error" not in artifacts and "error" not in result:
+            result["session_id"], result["version"] = await save_version(None, "project", {
+                "original_user_prompt": prompt_input.user_input,
+                "project_artifacts": artifacts,
+            })
         return result
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
-        logger.error(f"Error generating project prompt: {str(e)}", exc_info=True)
+        logger.error("Error generating project prompt: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error generating project prompt: {str(e)}")
 
 @app.post("/update_prompt")
 async def update_prompt_endpoint(update_input: UpdatePromptSchema):
+    fields, _ = await resolve_session(update_input, "prompt", {
+        "original_prompt": update_input.original_prompt,
+        "final_prompt": update_input.final_prompt,
+        "style": update_input.style,
+        "framework": update_input.framework,
+    }, required=("original_prompt", "final_prompt"))
     try:
         class LLMInput:
             def __init__(self, **kwargs):
@@ -143,20 +217,26 @@ async def update_prompt_endpoint(update_input: UpdatePromptSchema):
         llm = get_llm(llm_input)
         pipeline = UpdatePipeline(llm=llm)
         updated_prompt = await pipeline.run(
-            original_prompt=update_input.original_prompt,
-            final_prompt=update_input.final_prompt,
+            original_prompt=fields["original_prompt"],
+            final_prompt=fields["final_prompt"],
             user_feedback=update_input.user_feedback,
-            style=update_input.style,
-            framework=update_input.framework,
+            style=fields.get("style"),
+            framework=fields.get("framework"),
         )
-        print(f"Updated prompt: {updated_prompt}")
-        return {"updated_prompt": updated_prompt}
+        session_id, version = await save_version(update_input.session_id, "prompt", {**fields, "final_prompt": updated_prompt})
+        return {"updated_prompt": updated_prompt, "session_id": session_id, "version": version}
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
-        logger.error(f"An unexpected error occurred in /update_prompt: {e}", exc_info=True)
+        logger.error("An unexpected error occurred in /update_prompt: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
 @app.post("/project_update")
 async def project_update_endpoint(update_input: UpdateProjectSchema):
+    fields, _ = await resolve_session(update_input, "project", {
+        "original_user_prompt": update_input.original_user_prompt,
+        "project_artifacts": update_input.project_artifacts,
+    }, required=("original_user_prompt", "project_artifacts"))
     try:
         class LLMInput:
             def __init__(self, **kwargs):
@@ -168,13 +248,16 @@ async def project_update_endpoint(update_input: UpdateProjectSchema):
         llm = get_llm(llm_input)
         pipeline = ProjectUpdatePipeline(llm=llm)
         updated_artifacts = await pipeline.run(
-            original_user_prompt=update_input.original_user_prompt,
-            project_artifacts=update_input.project_artifacts,
+            original_user_prompt=fields["original_user_prompt"],
+            project_artifacts=fields["project_artifacts"],
             user_feedback=update_input.user_feedback,
         )
-        return {"updated_artifacts": updated_artifacts}
+        session_id, version = await save_version(update_input.session_id, "project", {**fields, "project_artifacts": updated_artifacts})
+        return {"updated_artifacts": updated_artifacts, "session_id": session_id, "version": version}
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
-        logger.error(f"An unexpected error occurred in /project_update: {e}", exc_info=True)
+        logger.error("An unexpected error occurred in /project_update: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
 @app.post("/pick_agent", response_model=dict)
@@ -183,37 +266,125 @@ async def pick_agent_endpoint(pick_agent_input: PickAgentSchema) -> dict:
     Selects prompt types and a framework based on user input.
     """
     try:
-        logger.info(pick_agent_input.user_input)
+        log_payload("Pick agent input: %s", pick_agent_input.user_input)
         llm = get_llm(pick_agent_input)
         # print(pick_agent_input)
-        agent = PickAgent(llm=llm)
-        result_str = agent.pick(pick_agent_input.user_input)
-        # print(result_str)
-        logger.info(result_str)
-        
-        json_match = re.search(r'\{[\s\S]*\}', result_str)
-        if not json_match:
-            raise ValueError("No valid JSON object found in the LLM's response.")
-        
-        return json.loads(json_match.group(0))
+        agent = PickAgent(llm=get_router(pick_agent_input, llm).llm_for("PickAgent"))
+        result = agent.pick(pick_agent_input.user_input)
+        log_payload("Pick agent result: %s", result)
+        return result
     except Exception as e:
-        logger.error(f"Error picking agent: {str(e)}", exc_info=True)
+        logger.error("Error picking agent: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error picking agent: {str(e)}")
 
+@app.get("/ready")
+async def ready_endpoint():
+    """
+    Readiness probe: 503 until the startup warmup has finished, then 200.
+    """
+    return JSONResponse(readiness.report(), status_code=200 if readiness.ready else 503)
+
+@app.get("/metrics/parse_failures", response_model=dict)
+async def parse_failures_endpoint() -> dict:
+    """
+    Reports structured-output calls and parse failures per agent since startup.
+    """
+    return parse_failures.snapshot()
+
+@app.get("/metrics/payload", response_model=dict)
+async def payload_endpoint() -> dict:
+    """
+    Reports, per agent, the prompt tokens saved by compacting embedded outputs since startup.
+    """
+    return payload_savings.snapshot()
+
+@app.get("/metrics/stages", response_model=dict)
+async def stages_endpoint() -> dict:
+    """
+    Reports model calls, mean latency, tokens and estimated cost per pipeline stage and model since startup.
+    """
+    return stage_stats.snapshot()
+
+@app.get("/metrics/cascade", response_model=dict)
+async def cascade_endpoint() -> dict:
+    """
+    Reports, per style, cascade calls, escalations to the large model and the small model's mean score since startup.
+    """
+    return cascade_stats.snapshot()
+
+@app.get("/metrics/speculation", response_model=dict)
+async def speculation_endpoint() -> dict:
+    """
+    Reports speculative final integrations used and discarded, latency saved and tokens wasted since startup.
+    """
+    return speculation_stats.snapshot()
+
+@app.get("/metrics/prompt_cache", response_model=dict)
+async def prompt_cache_endpoint() -> dict:
+    """
+    Reports the context cache backend and, per agent, cache hits, cached prompt tokens and latency since startup.
+    """
+    return {"backend": context_cache.name, "agents": cache_stats.snapshot()}
+
+@app.get("/metrics/session_store", response_model=dict)
+async def session_store_endpoint() -> dict:
+    """
+    Reports stored sessions, compression and the bytes clients did not resend thanks to session references.
+    """
+    return await asyncio.to_thread(session_store.stats)
+
+@app.get("/metrics/template_library", response_model=dict)
+async def template_library_endpoint() -> dict:
+    """
+    Reports the Project Mania template library's size and how often requests were served or adapted from it.
+    """
+    return await asyncio.to_thread(template_library.stats)
+
 @app.post("/evaluate", response_model=FullEvaluationResult)
 async def evaluate_prompt_endpoint(eval_input: EvaluatePipelineInput):
     """
     Evaluates a given prompt using a multi-agent framework.
     """
     try:
-        llm = get_llm(eval_input)
-        pipeline = EvaluatePipeline(llm=llm)
+        # The heuristic tier runs locally and needs no model.
+        llm = None if eval_input.mode == "heuristic" else get_llm(eval_input)
+        pipeline = EvaluatePipeline(llm=llm, router=get_router(eval_input, llm))
         result = await pipeline.run(eval_input)
         return result
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
-        logger.error(f"Error evaluating prompt: {str(e)}", exc_info=True)
+        logger.error("Error evaluating prompt: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error evaluating prompt: {str(e)}")
 
+@app.post("/evaluate/batch")
+async def evaluate_batch_endpoint(batch_input: EvaluateBatchInput):
+    """
+    Evaluates many candidate prompts and ranks them.
+
+    Streams newline-delimited JSON: one {"event": "result"} line per candidate
+    as soon as it is judged, then a final {"event": "ranking"} line with the
+    table of candidates, best first.
+    """
+    if len(batch_input.prompts) > EVALUATE_BATCH_MAX_PROMPTS:
+        raise HTTPException(status_code=400, detail=f"At most {EVALUATE_BATCH_MAX_PROMPTS} prompts can be evaluated per batch.")
+    llm = None if batch_input.mode == "heuristic" else get_llm(batch_input)
+    pipeline = EvaluatePipeline(llm=llm, router=get_router(batch_input, llm))
+
+    async def stream():
+        items = []
+        async for item in pipeline.run_batch(batch_input):
+            items.append(item)
+            yield json.dumps({"event": "result", **item.dict()}) + "\n"
+        ranking = EvaluatePipeline.rank(items)
+        yield json.dumps({
+            "event": "ranking",
+            "ranking": [row.dict() for row in ranking],
+            "failed": [item.index for item in items if item.error],
+        }) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 @app.post("/project-mania/generate", response_model=ProjectManiaResponse)
 async def generate_project_mania(input_data: ProjectManiaSchema):
     try:
@@ -227,23 +398,16 @@ async def generate_project_mania(input_data: ProjectManiaSchema):
         llm_input = LLMInput(**input_data.dict())
         llm = get_llm(llm_input)
         
-        pipeline = ProjectManiaPipeline(llm=llm)
+        pipeline = ProjectManiaPipeline(llm=llm, model_router=get_router(llm_input, llm))
         result = await pipeline.run(input_data)
         return result
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
-        logger.error(f"Error in Project Mania generation: {str(e)}", exc_info=True)
+        logger.error("Error in Project Mania generation: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error generating template: {str(e)}")
 
 frontend_dir = Path("promptnova/out")
 
-class SPAStaticFiles(StaticFiles):
-    async def get_response(self, path: str, scope):
-        try:
-            return await super().get_response(path, scope)
-        except HTTPException as ex:
-            if ex.status_code == 404:
-                return await super().get_response("index.html", scope)
-            raise ex
-
 if frontend_dir.exists() and frontend_dir.is_dir():
-    app.mount("/", SPAStaticFiles(directory=frontend_dir, html=True), name="static")
+    app.mount("/", SPAStaticFiles(directory=frontend_dir), name="static")
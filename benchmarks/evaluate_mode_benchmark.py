@@ -0,0 +1,155 @@
+"""
+Latency and token comparison of the evaluation modes.
+
+Covers "thorough" and "fast" judging, each with the model-written verdict
+(narrative) and with the local score aggregator. The offline part always
+runs: it drives EvaluatePipeline with a recording model that returns canned
+scores and reports, per configuration, the model calls, sequential round
+trips and prompt/response characters sent over the wire. With
+``--provider`` every configuration is also run against the live model,
+using the server key from the environment, and reports wall-clock latency
+and input/output tokens averaged over ``--repeats`` runs.
+
+    python benchmarks/evaluate_mode_benchmark.py
+    python benchmarks/evaluate_mode_benchmark.py --provider groq --groq-model llama-3.1-8b-instant --repeats 5
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.chains.evaluate_pipleline import EvaluatePipeline  # noqa: E402
+from src.models.evaluateSchema import EvaluatePipelineInput  # noqa: E402
+
+PROMPT = """# Role
+You are a senior travel planner.
+
+## Task
+Plan a 5-day trip to Kyoto for two adults in April with a mid-range budget. Include one day trip to Nara.
+
+## Output
+A day-by-day itinerary as a markdown table with morning, afternoon and evening columns, followed by a cost estimate in JPY.
+
+## Constraints
+Avoid tourist traps, keep travel between sights under 45 minutes and flag anything that needs advance booking."""
+INITIAL_PROMPT = "plan a kyoto trip"
+JUDGES = ("llm_as_judge", "t_rag", "mar_framework")
+CONFIGURATIONS = [(mode, narrative) for mode in ("thorough", "fast") for narrative in (True, False)]
+
+SCORES = {
+    "llm_as_judge": {"clarity": 8, "specificity": 8, "context": 7, "goal_alignment": 9, "measurability": 7,
+                     "overall": 8, "comment": "Clear and well scoped, with a checkable output format."},
+    "t_rag": {"intent_alignment": 9, "completeness": 8, "relevance": 9, "ambiguity": 8, "overall": 8},
+    "mar_framework": {"clarity": 8, "completeness": 7, "relevance": 9, "structure": 9,
+                      "creativity_precision_balance": 7, "overall_score": 8.0},
+    "final_evaluation": {"final_score": 80, "strengths": "Explicit role, format and constraints.",
+                         "areas_for_improvement": "State the travellers' interests.",
+                         "report": "All three rubrics rate the prompt as clear, relevant and well structured."},
+}
+
+
+class RecordingModel(FakeListChatModel):
+    """Answers each judge's prompt with canned scores and records the traffic."""
+    responses: list = [""]
+    calls: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        # Routes bind_schema through JSON mode, which this model can answer.
+        return "groq-chat"
+
+    def _call(self, messages, stop=None, run_manager=None, **kwargs) -> str:
+        text = messages[-1].content
+        if "panel of three" in text:
+            response = SCORES if "final_evaluation" in text else {key: SCORES[key] for key in JUDGES}
+        elif "final arbiter" in text:
+            response = SCORES["final_evaluation"]
+        elif "OBJECTIVE:" in text:
+            response = SCORES["t_rag"]
+        elif "weighted rubric" in text:
+            response = SCORES["mar_framework"]
+        else:
+            response = SCORES["llm_as_judge"]
+        response = json.dumps(response)
+        self.calls.append((len(text), len(response)))
+        return response
+
+
+def offline() -> list:
+    rows = []
+    for mode, narrative in CONFIGURATIONS:
+        model = RecordingModel(calls=[])
+        result = asyncio.run(EvaluatePipeline(model, mode=mode).run(
+            EvaluatePipelineInput(prompt_to_evaluate=PROMPT, initial_prompt=INITIAL_PROMPT, narrative=narrative)
+        ))
+        assert 0 <= result.final_evaluation.final_score <= 100
+        rows.append({
+            "mode": mode,
+            "verdict": "narrative" if narrative else "local",
+            "calls": len(model.calls),
+            "round_trips": 2 if mode == "thorough" and narrative else 1,
+            "prompt_chars": sum(sent for sent, _ in model.calls),
+            "response_chars": sum(received for _, received in model.calls),
+        })
+    return rows
+
+
+async def live(llm, repeats: int) -> list:
+    from langchain_core.callbacks import get_usage_metadata_callback
+
+    rows = []
+    for mode, narrative in CONFIGURATIONS:
+        pipeline = EvaluatePipeline(llm, mode=mode)
+        latencies, input_tokens, output_tokens, scores = [], [], [], []
+        for _ in range(repeats):
+            with get_usage_metadata_callback() as usage:
+                start = time.perf_counter()
+                result = await pipeline.run(EvaluatePipelineInput(
+                    prompt_to_evaluate=PROMPT, initial_prompt=INITIAL_PROMPT, narrative=narrative
+                ))
+                latencies.append(time.perf_counter() - start)
+            input_tokens.append(sum(item.get("input_tokens", 0) for item in usage.usage_metadata.values()))
+            output_tokens.append(sum(item.get("output_tokens", 0) for item in usage.usage_metadata.values()))
+            scores.append(result.final_evaluation.final_score)
+        rows.append({
+            "mode": mode,
+            "verdict": "narrative" if narrative else "local",
+            "latency_s": statistics.median(latencies),
+            "input_tokens": statistics.mean(input_tokens),
+            "output_tokens": statistics.mean(output_tokens),
+            "final_score": statistics.mean(scores),
+        })
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--provider", choices=("gemini", "groq", "mistral"), help="Also run every configuration against this provider.")
+    parser.add_argument("--groq-model", default="llama-3.1-8b-instant")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'mode':>9} {'verdict':>10} {'calls':>6} {'round trips':>12} {'prompt chars':>13} {'response chars':>15}")
+    for row in offline():
+        print(f"{row['mode']:>9} {row['verdict']:>10} {row['calls']:>6} {row['round_trips']:>12} {row['prompt_chars']:>13} {row['response_chars']:>15}")
+
+    if args.provider:
+        from src.llm_clients import llm_pool
+
+        llm = llm_pool.get(args.provider, args.groq_model)
+        print(f"\n{'mode':>9} {'verdict':>10} {'latency s':>10} {'in tokens':>10} {'out tokens':>11} {'score':>6}")
+        for row in asyncio.run(live(llm, args.repeats)):
+            print(f"{row['mode']:>9} {row['verdict']:>10} {row['latency_s']:>10.2f} {row['input_tokens']:>10.0f} "
+                  f"{row['output_tokens']:>11.0f} {row['final_score']:>6.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Event-loop responsiveness while Project Mania refinements run.
+
+Starts ``--refinements`` concurrent ProjectManiaRefinementPipeline runs
+against a simulated model that takes ``--delay`` seconds per call, and
+alongside them a probe that stands in for other in-flight requests: a
+coroutine that asks to wake up every 10 ms and records how late it
+actually ran. Two setups are compared:
+
+- blocking: the refine loop calls the synchronous agent methods from the
+  coroutine, as the pipeline used to; every model round trip stalls the loop.
+- async: the pipeline as shipped, awaiting the agents' async variants.
+
+The simulated model sleeps in ``_call`` (blocking I/O) and awaits in
+``_agenerate`` (non-blocking I/O), like the real provider clients. Reports
+the probe's p50/p95/max lateness and the total wall time of the refinements.
+
+    python benchmarks/event_loop_latency_benchmark.py --refinements 4 --delay 0.2
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.chains.project_mania_refinement_pipeline import ProjectManiaRefinementPipeline  # noqa: E402
+
+TEMPLATE = "## Role\nYou are a support agent.\n\n## Task\nAnswer {question} for {customer} politely."
+INTENT = "customer support replies"
+PROBE_INTERVAL = 0.01
+
+
+class SlowModel(FakeListChatModel):
+    """Answers the refine agents after ``delay`` seconds, blocking in sync calls and yielding in async ones."""
+    responses: list = [""]
+    delay: float = 0.2
+
+    @property
+    def _llm_type(self) -> str:
+        # Routes bind_schema through JSON mode, which this model can answer.
+        return "groq-chat"
+
+    def _answer(self, messages) -> str:
+        text = messages[-1].content
+        if "QA Specialist" in text:
+            return json.dumps({"critique": "Tone is unspecified.", "suggestions": ["State the tone."], "score": 60})
+        if "Final Gatekeeper" in text:
+            passed = "## Tone" in text
+            return json.dumps({"success": passed, "reason": "ok" if passed else "Tone missing"})
+        return TEMPLATE + "\n\n## Tone\nFriendly and concise."
+
+    def _call(self, messages, stop=None, run_manager=None, **kwargs) -> str:
+        time.sleep(self.delay)
+        return self._answer(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._answer(messages)))])
+
+
+async def blocking_run(pipeline: ProjectManiaRefinementPipeline, template: str, intent: str) -> None:
+    # The refine loop as it was: synchronous agent calls straight from the coroutine.
+    for _ in range(pipeline.max_iterations):
+        analysis = pipeline.analyze_agent.analyze(template, intent)
+        if analysis.get("suggestions"):
+            template = pipeline.refine_agent.apply_changes(template, analysis["suggestions"])
+        if pipeline.evaluate_agent.evaluate(template, intent).get("success", False):
+            break
+
+
+async def probe(lateness: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lateness.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def measure(setup: str, refinements: int, delay: float) -> dict:
+    pipeline = ProjectManiaRefinementPipeline(SlowModel(delay=delay))
+    lateness, stop = [], asyncio.Event()
+    probe_task = asyncio.create_task(probe(lateness, stop))
+    await asyncio.sleep(PROBE_INTERVAL * 3)
+    run = blocking_run if setup == "blocking" else lambda p, t, i: p.run(t, i)
+    start = time.perf_counter()
+    await asyncio.gather(*(run(pipeline, TEMPLATE, INTENT) for _ in range(refinements)))
+    wall = time.perf_counter() - start
+    stop.set()
+    await probe_task
+    return {
+        "setup": setup,
+        "p50_ms": statistics.median(lateness) * 1000,
+        "p95_ms": statistics.quantiles(lateness, n=20, method="inclusive")[-1] * 1000,
+        "max_ms": max(lateness) * 1000,
+        "wall_s": wall,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--refinements", type=int, default=4, help="Concurrent refinement runs.")
+    parser.add_argument("--delay", type=float, default=0.2, help="Simulated seconds per model call.")
+    args = parser.parse_args()
+
+    print(f"{'setup':>9} {'probe p50 ms':>13} {'p95 ms':>8} {'max ms':>8} {'wall s':>7}")
+    for setup in ("blocking", "async"):
+        row = asyncio.run(measure(setup, args.refinements, args.delay))
+        print(f"{row['setup']:>9} {row['p50_ms']:>13.1f} {row['p95_ms']:>8.1f} {row['max_ms']:>8.1f} {row['wall_s']:>7.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Throughput of the local heuristic prompt scorer.
+
+Builds ``--count`` synthetic prompts of mixed quality, from one-line requests
+to sectioned prompts with constraints, and scores them in one batch and one
+at a time. Reports prompts per second for both, the score distribution and
+how often the refine-loop gate would skip the LLM evaluation.
+
+    python benchmarks/heuristic_scorer_benchmark.py --count 10000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.agents.evaluate.heuristic_scorer import heuristic_gate, score_prompts  # noqa: E402
+
+TASKS = [
+    "write about dogs",
+    "Summarize the attached quarterly report for the board.",
+    "Explain how vaccines train the immune system to a curious 12-year-old.",
+    "Generate test cases for a password validation function.",
+    "Plan a 5-day trip to Kyoto for two adults in April with a mid-range budget.",
+]
+SECTIONS = [
+    "## Role\nYou are a senior {field} expert with ten years of experience.",
+    "## Context\nThe audience is {audience}. They already know the basics and want practical detail.",
+    "## Constraints\n- Use at most {limit} words.\n- Do not invent facts; say when you are unsure.\n- Always cite the source section.",
+    "## Output Format\nReturn a markdown table followed by 3 bullet points of recommendations.",
+    "## Steps\n1. Identify the key points.\n2. Compare the options.\n3. Recommend one and explain why.",
+    "Maybe add some nice stuff and things about it, etc.",
+]
+
+
+def build_prompts(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    prompts = []
+    for _ in range(count):
+        parts = [rng.choice(TASKS)] + rng.sample(SECTIONS, rng.randint(0, len(SECTIONS)))
+        prompts.append("\n\n".join(parts).format(
+            field=rng.choice(("finance", "medicine", "travel", "software")),
+            audience=rng.choice(("executives", "students", "new hires")),
+            limit=rng.choice((150, 300, 500)),
+        ))
+    return prompts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10000, help="Number of prompts to score.")
+    args = parser.parse_args()
+
+    prompts = build_prompts(args.count)
+    start = time.perf_counter()
+    scores = score_prompts(prompts)
+    batch_s = time.perf_counter() - start
+
+    sample = prompts[:min(len(prompts), 1000)]
+    start = time.perf_counter()
+    for prompt in sample:
+        score_prompts([prompt])
+    single_s = (time.perf_counter() - start) / len(sample) * len(prompts)
+
+    verdicts = [heuristic_gate([prompt])[0] for prompt in sample]
+    print(f"prompts:            {len(prompts)} ({sum(map(len, prompts)) / len(prompts):.0f} chars on average)")
+    print(f"batch:              {batch_s * 1000:.1f} ms ({len(prompts) / batch_s:,.0f} prompts/s)")
+    print(f"one at a time:      {single_s * 1000:.1f} ms ({len(prompts) / single_s:,.0f} prompts/s)")
+    print(f"score p10/p50/p90:  {' / '.join(f'{value:.1f}' for value in np.percentile(scores, [10, 50, 90]))}")
+    print(f"gate on {len(sample)} prompts: pass {verdicts.count('pass')}, fail {verdicts.count('fail')}, "
+          f"LLM needed {verdicts.count(None)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
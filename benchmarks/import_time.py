@@ -0,0 +1,83 @@
+"""
+Import-time report for the API entrypoint.
+
+Runs ``python -X importtime -c "import app"`` in a fresh interpreter and prints
+the modules with the largest cumulative import cost. With ``--budget-ms`` it
+doubles as the startup regression check: it exits non-zero when the total
+exceeds the budget or when a module that must stay lazy (provider SDKs, the
+style/framework agents) shows up at import time.
+
+    python benchmarks/import_time.py --top 25 --budget-ms 2000
+
+fastapi and langchain_core.prompts alone take about 1.2 s and runs on a shared
+machine vary by a few hundred ms, so the budget leaves that much headroom; the
+whole import took about 3.2 s before the startup work.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+# Imported on demand by get_llm / AgentRegistry / the pipelines' graphs; loading them at startup is a regression.
+LAZY_MODULES = (
+    "langgraph",
+    "langchain_google_genai",
+    "langchain_groq",
+    "langchain_mistralai",
+    "src.agents.types.",
+    "src.agents.frameworks.",
+)
+
+
+def measure(target: str = "app"):
+    """Returns ``[(module, self_us, cumulative_us, depth)]`` for one cold import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="app", help="Module to import (default: app).")
+    parser.add_argument("--top", type=int, default=20, help="Number of modules to list.")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the total import time exceeds this budget.")
+    args = parser.parse_args()
+
+    rows = measure(args.target)
+    total_ms = next((cumulative for module, _, cumulative, _ in rows if module == args.target), 0) / 1000
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for module, self_us, cumulative_us, depth in sorted(rows, key=lambda row: row[2], reverse=True)[: args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {'  ' * depth}{module}")
+    print(f"\nTotal import time for '{args.target}': {total_ms:.1f} ms")
+
+    failures = []
+    eager = sorted({module for module, *_ in rows if module.startswith(LAZY_MODULES)})
+    if eager:
+        failures.append(f"modules that should load lazily were imported: {', '.join(eager[:10])}")
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        failures.append(f"{total_ms:.1f} ms exceeds the {args.budget_ms:.1f} ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Size and latency comparison of full-rewrite and JSON Patch project updates.
+
+Builds synthetic project artifacts of increasing size and applies the same
+small set of adjustments. The offline part always runs and reports the
+output a full rewrite has to produce, the equivalent RFC 6902 patch and the
+time to apply that patch locally. With ``--provider`` the updater agent is
+also run against the live model in both modes, using the server key from
+the environment, and reports latency and output tokens.
+
+    python benchmarks/patch_update_benchmark.py --sizes 20 80 200
+    python benchmarks/patch_update_benchmark.py --sizes 80 --provider gemini --groq-model llama-3.1-8b-instant
+"""
+import argparse
+import copy
+import json
+import sys
+import time
+from pathlib import Path
+
+import jsonpatch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.agents.project_refine.project_updater_agent import ProjectUpdaterAgent, apply_operations  # noqa: E402
+
+ADJUSTMENTS = {
+    "deficiencies": ["Password reset is missing.", "Orders have no status field."],
+    "adjustments": [
+        "Add a 'Password reset' feature.",
+        "Add a 'status' column to the orders table.",
+        "Rename the app to 'ShopNova'.",
+    ],
+    "suggestions": [],
+}
+
+
+def build_artifacts(size: int) -> dict:
+    """Project artifacts with ``size`` features, endpoints and tables."""
+    return {
+        "appName": "Shop",
+        "architecture": {
+            "style": "Modular monolith",
+            "techStack": {"frontend": "Next.js, TailwindCSS", "backend": "FastAPI", "database": "PostgreSQL"},
+            "dataFlow": "Clients call the REST API, which reads and writes PostgreSQL. " * 5,
+        },
+        "plan": {
+            "features": [
+                {"name": f"Feature {i}", "description": f"Lets users manage resource {i} with filtering, sorting and export."}
+                for i in range(size)
+            ],
+            "apiEndpoints": [
+                {"method": method, "path": f"/api/resource{i}", "description": f"{method} resource {i}."}
+                for i in range(size) for method in ("GET", "POST")
+            ],
+            "databaseSchema": {
+                "orders" if i == 0 else f"resource{i}": {"id": "uuid", "name": "text", "created_at": "timestamp"}
+                for i in range(size)
+            },
+        },
+    }
+
+
+def apply_adjustments(artifacts: dict) -> dict:
+    """What a correct update produces for ``ADJUSTMENTS``."""
+    updated = copy.deepcopy(artifacts)
+    updated["appName"] = "ShopNova"
+    updated["plan"]["features"].append({"name": "Password reset", "description": "Reset a forgotten password by email."})
+    updated["plan"]["databaseSchema"]["orders"]["status"] = "text"
+    return updated
+
+
+def offline(size: int) -> dict:
+    artifacts = build_artifacts(size)
+    updated = apply_adjustments(artifacts)
+    patch = jsonpatch.make_patch(artifacts, updated).patch
+    runs = 50
+    start = time.perf_counter()
+    for _ in range(runs):
+        patched, failures = apply_operations(artifacts, patch)
+    apply_ms = (time.perf_counter() - start) / runs * 1000
+    assert patched == updated and not failures
+    full_chars = len(json.dumps(updated))
+    patch_chars = len(json.dumps(patch))
+    return {"size": size, "full_chars": full_chars, "patch_chars": patch_chars,
+            "ratio": full_chars / patch_chars, "apply_ms": apply_ms}
+
+
+def live(size: int, llm) -> list:
+    from langchain_core.callbacks import get_usage_metadata_callback
+
+    artifacts = json.dumps(build_artifacts(size))
+    rows = []
+    for mode in ("full", "patch"):
+        agent = ProjectUpdaterAgent(llm, mode=mode)
+        with get_usage_metadata_callback() as usage:
+            start = time.perf_counter()
+            try:
+                result = agent.update(artifacts, ADJUSTMENTS)
+                valid = isinstance(result, dict) and {"architecture", "plan"} <= set(result)
+            except Exception as e:
+                print(f"  {mode} update failed: {e}")
+                valid = False
+            latency = time.perf_counter() - start
+        output_tokens = sum(item.get("output_tokens", 0) for item in usage.usage_metadata.values())
+        rows.append({"size": size, "mode": mode, "latency_s": latency, "output_tokens": output_tokens,
+                     "valid": valid, "stats": agent.last_stats})
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 80, 200], help="Features/endpoints/tables per artifact.")
+    parser.add_argument("--provider", choices=("gemini", "groq", "mistral"), help="Also run the agent against this provider.")
+    parser.add_argument("--groq-model", default="llama-3.1-8b-instant")
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'full chars':>11} {'patch chars':>12} {'ratio':>7} {'apply ms':>9}")
+    for size in args.sizes:
+        row = offline(size)
+        print(f"{row['size']:>6} {row['full_chars']:>11} {row['patch_chars']:>12} {row['ratio']:>6.0f}x {row['apply_ms']:>9.2f}")
+
+    if args.provider:
+        from src.llm_clients import llm_pool
+
+        llm = llm_pool.get(args.provider, args.groq_model)
+        print(f"\n{'size':>6} {'mode':>6} {'latency s':>10} {'out tokens':>11} {'valid':>6}  stats")
+        for size in args.sizes:
+            for row in live(size, llm):
+                print(f"{row['size']:>6} {row['mode']:>6} {row['latency_s']:>10.2f} {row['output_tokens']:>11} "
+                      f"{str(row['valid']):>6}  {row['stats']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""
+Tokens saved by the shared payload minimizer on typical agent inputs.
+
+Builds ``--samples`` synthetic RefineAgent and FinalPrompt payloads: four
+style prompts per request, fenced the way models return them, sharing a
+common role/context block with the framework response, plus a feedback
+dict. Compares the old serialization (``json.dumps(indent=2)``, ``str()``
+of dicts) with the minimized one and reports the mean tokens per payload
+and the share saved, under the Groq character-ratio estimate.
+
+    python benchmarks/payload_benchmark.py --samples 200
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.agents.payload import clean_text, compact_json, dedupe_paragraphs  # noqa: E402
+from src.token_budget import token_counter  # noqa: E402
+
+SHARED = [
+    "You are a senior technical writer who explains complex systems to busy engineering managers. "
+    "Keep every answer grounded in the facts provided and never invent metrics or customer names.",
+    "Context: the team is migrating a monolithic billing service to event-driven microservices over two "
+    "quarters, and leadership wants a weekly status update they can forward without edits.",
+]
+STYLES = ["chain_of_thought", "few_shot", "role_based", "react"]
+SECTIONS = ["## Task\nSummarize progress, risks and next steps.", "## Format\nUse three headed sections and bullets.",
+            "## Tone\nDirect, calm and specific.", "## Constraints\nAt most 250 words; no jargon without a gloss."]
+
+
+def style_prompt(style: str, rng: random.Random) -> str:
+    body = "\n\n".join(SHARED + rng.sample(SECTIONS, 3) + [f"Apply the {style} technique step by step.   "])
+    return f"```markdown\n{body}\n\n\n```"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    count = token_counter("groq", "mixtral-8x7b")
+    before, after = [], []
+    for _ in range(args.samples):
+        prompts = {style: style_prompt(style, rng) for style in STYLES}
+        framework_response = "\n\n".join(SHARED + ["Report on the migration this week."])
+        feedback = {"clarity": rng.randint(4, 9), "issues": ["too long", "missing risks"], "suggestion": "Add owners."}
+        legacy = framework_response + json.dumps(prompts, indent=2) + json.dumps(feedback, indent=2)
+        minimized = dedupe_paragraphs({name: clean_text(prompt) for name, prompt in prompts.items()},
+                                      reference={"Primary Framework Response": framework_response})
+        before.append(count(legacy))
+        after.append(count(framework_response + compact_json(minimized) + compact_json(feedback)))
+
+    mean_before, mean_after = statistics.mean(before), statistics.mean(after)
+    print(f"samples: {args.samples}")
+    print(f"tokens per payload: {mean_before:.0f} -> {mean_after:.0f}")
+    print(f"saved: {mean_before - mean_after:.0f} tokens ({(mean_before - mean_after) / mean_before:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+How much of each style/framework prompt is a prefix shared by all agents.
+
+Runs every registered style and framework agent once on ``--inputs``
+different user inputs against a recording model that answers instantly,
+with the in-process stand-in context cache. Reports the token length of
+the prefix common to every rendered prompt, the share of prompt tokens it
+covers, and the hit rate and cached-token share the cache reported. No
+provider is called.
+
+    python benchmarks/prefix_cache_benchmark.py --inputs 5
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["PROMPT_CACHE_BACKEND"] = "local"
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel  # noqa: E402
+
+from src.agents.registry import AGENT_SPECS, AgentRegistry  # noqa: E402
+from src.prompt_cache import cache_stats  # noqa: E402
+from src.token_budget import count_tokens  # noqa: E402
+
+INPUTS = ["explain photosynthesis to students", "write a cover letter for a data engineer role",
+          "summarize this quarterly report for executives", "plan a three-day trip to Kyoto",
+          "review my python function for bugs", "draft a product launch email"]
+
+
+class RecordingModel(FakeListChatModel):
+    """Answers every call with a fixed refined prompt and keeps the prompts it was sent."""
+
+    responses: list = ["## Task\nRefined prompt."]
+    prompts: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "groq-chat"
+
+    def _call(self, messages, stop=None, run_manager=None, **kwargs) -> str:
+        self.prompts.append(messages[-1].content)
+        return self.responses[0]
+
+
+def common_prefix(texts: list) -> str:
+    return os.path.commonprefix(texts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inputs", type=int, default=5, help=f"user inputs per agent (at most {len(INPUTS)})")
+    args = parser.parse_args()
+
+    llm = RecordingModel()
+    agents = AgentRegistry(llm)
+    for user_input in INPUTS[:args.inputs]:
+        for name in AGENT_SPECS:
+            agents[name].refine(user_input)
+
+    prefix = common_prefix(llm.prompts)
+    prompt_tokens = sum(count_tokens(llm, prompt) for prompt in llm.prompts)
+    stats = cache_stats.snapshot().values()
+    calls, hits = sum(item["calls"] for item in stats), sum(item["hits"] for item in stats)
+    cached = sum(item["cached_tokens"] for item in stats)
+    print(f"agents: {len(AGENT_SPECS)}, calls: {calls}")
+    print(f"shared prefix: {count_tokens(llm, prefix)} tokens "
+          f"({count_tokens(llm, prefix) * len(llm.prompts) / prompt_tokens:.1%} of all prompt tokens)")
+    print(f"stand-in cache: {hits}/{calls} hits, {cached / prompt_tokens:.1%} of prompt tokens cached")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Throughput, latency and memory comparison of the production server against a
+plain single-process ``uvicorn app:app``.
+
+Each setup is started as a subprocess, warmed up, then driven with concurrent
+keep-alive GETs. The report lists requests/s, p50/p95/p99 latency and the
+total RSS / PSS of the process tree (PSS shows how much of the preforked
+workers' memory is actually shared copy-on-write).
+
+    python benchmarks/server_benchmark.py --workers 4 --requests 5000 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _children(pid: int):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def tree_memory_kb(pid: int):
+    """Returns (rss, pss) in kB summed over ``pid`` and all its descendants."""
+    rss = pss = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        pending.extend(_children(current))
+        try:
+            with open(f"/proc/{current}/smaps_rollup") as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    if key == "Rss":
+                        rss += int(value.split()[0])
+                    elif key == "Pss":
+                        pss += int(value.split()[0])
+        except OSError:
+            continue
+    return rss, pss
+
+
+def wait_until_ready(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server at {url} did not come up within {timeout:.0f}s")
+
+
+async def drive(url: str, requests: int, concurrency: int):
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_setup(name: str, command, port: int, args) -> dict:
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}{args.path}"
+    try:
+        wait_until_ready(url)
+        asyncio.run(drive(url, min(args.requests, 200), args.concurrency))
+        latencies, errors, elapsed = asyncio.run(drive(url, args.requests, args.concurrency))
+        rss, pss = tree_memory_kb(process.pid)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return {
+        "setup": name,
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p95": percentile(latencies, 0.95) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+        "mean": statistics.fmean(latencies) * 1000,
+        "errors": errors,
+        "rss_mb": rss / 1024,
+        "pss_mb": pss / 1024,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--path", default="/metrics/parse_failures", help="Endpoint to request.")
+    parser.add_argument("--port", type=int, default=8600, help="First port; each setup uses the next one.")
+    args = parser.parse_args()
+
+    setups = [
+        ("uvicorn app:app", [sys.executable, "-m", "uvicorn", "app:app", "--port", str(args.port)], args.port),
+        (f"server.py x{args.workers}",
+         [sys.executable, "server.py", "--workers", str(args.workers), "--port", str(args.port + 1)],
+         args.port + 1),
+    ]
+    results = [run_setup(name, command, port, args) for name, command, port in setups]
+
+    print(f"{'setup':<20} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'RSS MB':>8} {'PSS MB':>8}")
+    for row in results:
+        print(f"{row['setup']:<20} {row['rps']:>9.0f} {row['p50']:>8.2f} {row['p95']:>8.2f} {row['p99']:>8.2f} "
+              f"{row['errors']:>7} {row['rss_mb']:>8.1f} {row['pss_mb']:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Request-size and storage comparison for update rounds with and without sessions.
+
+Simulates a /project followed by ``--rounds`` of /project_update calls on
+synthetic artifacts, each round changing one feature. Without sessions every
+round uploads the original prompt and the full artifacts; with sessions it
+sends only the session id and the feedback. Reports total request bytes in
+both cases, what the store keeps on disk after content addressing and
+compression, and the time to resolve a session reference.
+
+    python benchmarks/session_store_benchmark.py --sizes 20 80 200 --rounds 10
+"""
+import argparse
+import copy
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from patch_update_benchmark import build_artifacts  # noqa: E402
+from src.session_store import SessionStore  # noqa: E402
+
+USER_PROMPT = "Build an online shop with accounts, a catalogue, a cart and order tracking."
+FEEDBACK = "Make the feature descriptions more specific."
+
+
+def run(size: int, rounds: int, path: str) -> dict:
+    store = SessionStore(path=path, ttl_seconds=3600)
+    artifacts = build_artifacts(size)
+    session_id, _ = store.create("project", {"original_user_prompt": USER_PROMPT, "project_artifacts": artifacts})
+
+    full_bytes = session_bytes = 0
+    resolve_ms = []
+    for i in range(rounds):
+        full_bytes += len(json.dumps({
+            "original_user_prompt": USER_PROMPT, "project_artifacts": artifacts, "user_feedback": FEEDBACK,
+        }))
+        session_bytes += len(json.dumps({"session_id": session_id, "user_feedback": FEEDBACK}))
+
+        start = time.perf_counter()
+        fields, _ = store.resolve(session_id, None, {"original_user_prompt": None, "project_artifacts": None})
+        resolve_ms.append((time.perf_counter() - start) * 1000)
+        assert fields["project_artifacts"] == artifacts
+
+        artifacts = copy.deepcopy(artifacts)
+        feature = artifacts["plan"]["features"][i % size]
+        feature["description"] += f" Revised in round {i + 1}."
+        store.append(session_id, {"project_artifacts": artifacts})
+
+    stats = store.stats()
+    resolve_ms.sort()
+    return {
+        "size": size,
+        "full_kb": full_bytes / 1024,
+        "session_kb": session_bytes / 1024,
+        "saved": 1 - session_bytes / full_bytes,
+        "logical_kb": stats["logical_bytes"] / 1024,
+        "stored_kb": stats["stored_bytes"] / 1024,
+        "storage_ratio": stats["storage_ratio"],
+        "resolve_p50_ms": resolve_ms[len(resolve_ms) // 2],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 80, 200], help="Features/endpoints/tables per artifact.")
+    parser.add_argument("--rounds", type=int, default=10, help="Update rounds per session.")
+    args = parser.parse_args()
+
+    print(f"{'size':>6} {'full KB':>9} {'session KB':>11} {'saved':>7} {'history KB':>11} {'stored KB':>10} "
+          f"{'ratio':>7} {'resolve ms':>11}")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            row = run(size, args.rounds, str(Path(tmp) / "sessions.sqlite3"))
+        print(f"{row['size']:>6} {row['full_kb']:>9.1f} {row['session_kb']:>11.1f} {row['saved']:>7.1%} "
+              f"{row['logical_kb']:>11.1f} {row['stored_kb']:>10.1f} {row['storage_ratio']:>6.1f}x "
+              f"{row['resolve_p50_ms']:>11.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Hit rate and lookup cost of the Project Mania template library.
+
+Replays ``--requests`` synthetic /project-mania/generate requests drawn from
+``--topics`` base intents, each rephrased (word order, filler words,
+plurals) and given an overlapping variable set, against a fresh library in
+a temporary directory. Every miss stores its intent as if the full graph
+had produced and approved a template. Reports how many requests were
+served as-is, adapted or missed, the LLM calls that saves against the
+five-call minimum of the graph, and the median and p95 lookup latency.
+
+    python benchmarks/template_library_benchmark.py --requests 2000 --topics 150
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.template_library import TemplateLibrary  # noqa: E402
+
+SUBJECTS = ["customer support replies", "blog posts", "sql queries", "unit tests", "product descriptions",
+            "meeting summaries", "job descriptions", "marketing emails", "code reviews", "travel itineraries",
+            "lesson plans", "bug reports", "press releases", "recipes", "research abstracts"]
+QUALIFIERS = ["for a saas startup", "for beginners", "in a friendly tone", "for executives", "with citations",
+              "for an ecommerce store", "for a python codebase", "in spanish", "for healthcare", "for students"]
+FILLERS = ["please", "I want a template that can", "can you", "we need to", ""]
+VARIABLES = ["topic", "audience", "tone", "length", "language", "product", "context", "examples"]
+
+
+def build_topics(count: int, rng: random.Random) -> list:
+    return [(rng.choice(SUBJECTS), rng.choice(QUALIFIERS), rng.choice(("general", "crewai", "autogen")),
+             sorted(rng.sample(VARIABLES, rng.randint(1, 3)))) for _ in range(count)]
+
+
+def rephrase(subject: str, qualifier: str, rng: random.Random) -> str:
+    verb = rng.choice(("write", "generate", "create", "draft"))
+    subject = subject[:-1] if subject.endswith("s") and rng.random() < 0.5 else subject
+    return " ".join(filter(None, (rng.choice(FILLERS), verb, subject, qualifier)))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--topics", type=int, default=150, help="Distinct underlying intents.")
+    parser.add_argument("--max-entries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    topics = build_topics(args.topics, rng)
+    library = TemplateLibrary(path=str(Path(tempfile.mkdtemp()) / "library.sqlite3"), max_entries=args.max_entries)
+    latencies = []
+    for _ in range(args.requests):
+        subject, qualifier, template_type, variables = rng.choice(topics)
+        if rng.random() < 0.3:
+            variables = sorted(set(variables) ^ {rng.choice(VARIABLES)}) or variables
+        intent = rephrase(subject, qualifier, rng)
+        start = time.perf_counter()
+        match = library.lookup(intent, template_type, "medium", variables)
+        latencies.append(time.perf_counter() - start)
+        if match is None:
+            library.record("misses")
+            library.store(intent, template_type, "medium", variables, f"Template for {intent} using {variables}")
+        else:
+            library.record("served" if match.exact else "adapted", match)
+
+    stats = library.stats()
+    saved = 5 * stats["served"] + 4 * stats["adapted"]
+    print(f"requests:         {args.requests} over {args.topics} intents")
+    print(f"served / adapted: {stats['served']} / {stats['adapted']} (hit rate {stats['hit_rate']:.1%})")
+    print(f"misses:           {stats['misses']} ({stats['entries']} entries, {stats['evicted']} evicted)")
+    print(f"LLM calls saved:  {saved} of at least {5 * args.requests}")
+    print(f"lookup p50/p95:   {statistics.median(latencies) * 1000:.2f} / "
+          f"{statistics.quantiles(latencies, n=20)[-1] * 1000:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Build step for the exported frontend: writes .gz (and .br, when Brotli is
+installed) siblings of its compressible files, which the API's static file
+server (src/static_assets.py) serves to clients that accept them.
+
+Standard library only, so it runs wherever the frontend is built, without
+the backend's dependencies. ``npm run build`` in ``promptnova`` runs it in
+``postbuild``; for an export built another way:
+
+    python precompress.py promptnova/out
+"""
+import argparse
+import gzip
+import sys
+from pathlib import Path
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # Brotli siblings are skipped, gzip still works.
+    brotli = None
+
+COMPRESSIBLE_SUFFIXES = {".html", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".xml", ".map", ".webmanifest"}
+MIN_COMPRESS_BYTES = 1024
+
+
+def _write_sibling(source: Path, target: Path, data: bytes, compress) -> Optional[bytes]:
+    """Writes ``target`` unless an up-to-date copy exists; returns its bytes."""
+    if target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+        return target.read_bytes()
+    compressed = compress(data)
+    if len(compressed) >= len(data):
+        return None
+    target.write_bytes(compressed)
+    return compressed
+
+
+def precompress(directory: Path) -> int:
+    """Builds the compressed siblings of every compressible file under ``directory``; returns how many exist."""
+    built = 0
+    for source in directory.rglob("*"):
+        if not source.is_file() or source.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        data = source.read_bytes()
+        if len(data) < MIN_COMPRESS_BYTES:
+            continue
+        if _write_sibling(source, source.with_name(source.name + ".gz"), data,
+                          lambda d: gzip.compress(d, compresslevel=9, mtime=0)) is not None:
+            built += 1
+        if brotli is not None and _write_sibling(source, source.with_name(source.name + ".br"), data,
+                                                 lambda d: brotli.compress(d, quality=11)) is not None:
+            built += 1
+    return built
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", nargs="?", default="promptnova/out", help="Exported frontend (default: promptnova/out).")
+    args = parser.parse_args()
+
+    target = Path(args.directory)
+    if not target.is_dir():
+        print(f"No such directory: {target}", file=sys.stderr)
+        return 1
+    print(f"Built {precompress(target)} compressed variants in {target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
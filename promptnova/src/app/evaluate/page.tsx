@@ -61,7 +61,7 @@ const EvaluatePage = () => {
   const [error, setError] = useState<string | null>(null);
   const [result, setResult] = useState<FullEvaluationResult | null>(null);
   const [selectedModel, setSelectedModel] = useState('gemini');
-  const [selectedGroqModel, setSelectedGroqModel] = useState('llama3-8b-8192');
+  const [selectedGroqModel, setSelectedGroqModel] = useState('llama-3.1-8b-instant');
   const [isReauthenticating, setIsReauthenticating] = useState(false);
   const [reauthPassword, setReauthPassword] = useState('');
   const [showPassword, setShowPassword] = useState(false);
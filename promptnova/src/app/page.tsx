@@ -13,7 +13,7 @@ export default function Home() {
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState('');
   const [selectedModel, setSelectedModel] = useState('gemini');
-  const [selectedGroqModel, setSelectedGroqModel] = useState('llama3-8b-8192');
+  const [selectedGroqModel, setSelectedGroqModel] = useState('llama-3.1-8b-instant');
 
   return (
     <div className="flex flex-col min-h-screen bg-white dark:bg-gray-900">
@@ -15,7 +15,7 @@ export default function ProjectManiaPage() {
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState('');
   const [selectedModel, setSelectedModel] = useState('gemini');
-  const [selectedGroqModel, setSelectedGroqModel] = useState('llama3-8b-8192');
+  const [selectedGroqModel, setSelectedGroqModel] = useState('llama-3.1-8b-instant');
   const [templateType, setTemplateType] = useState<'general' | 'crewai' | 'autogen'>('general');
 
   return (
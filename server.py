@@ -0,0 +1,157 @@
+"""
+Production entrypoint for the PromptNova API.
+
+The parent process imports the app and everything it will need (provider
+SDKs, every style/framework agent module, the static asset index), freezes
+the heap with ``gc.freeze()`` and then forks the workers, so that memory is
+shared copy-on-write instead of being rebuilt per worker. Workers accept on a
+socket the parent already bound and run uvicorn on uvloop + httptools.
+
+    python server.py --workers 4 --keep-alive 5 --backlog 2048
+
+Network clients are not created before the fork (gRPC and HTTP pools are not
+fork-safe); each worker opens its own during the app's lifespan.
+Each worker also logs to its own rotating file, ``logs/running_logs.<pid>.log``,
+since rotation of a shared file is not safe across processes.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+from src.config import SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SERVER_KEEPALIVE, SERVER_BACKLOG
+from src.logger import logger, flush_logs
+
+PROVIDER_MODULES = ("langchain_google_genai", "langchain_groq", "langchain_mistralai")
+# Minimum worker lifetime before an exit counts as a crash that needs a respawn delay.
+MIN_WORKER_UPTIME = 1.0
+
+
+def preload():
+    """Imports the app and every lazily loaded module once, in the parent."""
+    import importlib
+    from src.agents.registry import AGENT_SPECS, load_agent_class
+
+    for module in PROVIDER_MODULES:
+        importlib.import_module(module)
+    for name in AGENT_SPECS:
+        load_agent_class(name)
+    import app
+    return app.app
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def build_config(asgi_app, args) -> uvicorn.Config:
+    return uvicorn.Config(
+        asgi_app,
+        loop="uvloop",
+        http="httptools",
+        lifespan="on",
+        timeout_keep_alive=args.keep_alive,
+        backlog=args.backlog,
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+    )
+
+
+def run_worker(asgi_app, sock: socket.socket, args) -> None:
+    # The parent's frozen objects stay in the permanent generation; collect only new ones.
+    gc.enable()
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    uvicorn.Server(build_config(asgi_app, args)).run(sockets=[sock])
+
+
+def spawn(asgi_app, sock: socket.socket, args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            run_worker(asgi_app, sock, args)
+        except BaseException:
+            logger.exception("Worker %d crashed", os.getpid())
+            code = 1
+        finally:
+            flush_logs()
+            os._exit(code)
+    logger.info("Started worker %d", pid)
+    return pid
+
+
+def supervise(asgi_app, sock: socket.socket, args) -> None:
+    workers = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(args.workers):
+        workers[spawn(asgi_app, sock, args)] = time.monotonic()
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = workers.pop(pid, None)
+        if stopping or started is None:
+            continue
+        logger.warning("Worker %d exited with status %d; restarting", pid, os.waitstatus_to_exitcode(status))
+        if time.monotonic() - started < MIN_WORKER_UPTIME:
+            time.sleep(MIN_WORKER_UPTIME)
+        workers[spawn(asgi_app, sock, args)] = time.monotonic()
+    logger.info("All workers stopped")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the PromptNova API with preforked workers.")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Number of worker processes (WEB_CONCURRENCY).")
+    parser.add_argument("--keep-alive", type=int, default=SERVER_KEEPALIVE, help="HTTP keep-alive timeout in seconds.")
+    parser.add_argument("--backlog", type=int, default=SERVER_BACKLOG, help="Listen backlog of the shared socket.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    if not hasattr(os, "fork"):
+        # No fork on Windows: fall back to uvicorn's own multiprocess runner.
+        uvicorn.run("app:app", host=args.host, port=args.port, workers=args.workers,
+                    timeout_keep_alive=args.keep_alive, backlog=args.backlog)
+        return
+
+    gc.disable()
+    asgi_app = preload()
+    gc.freeze()
+    sock = bind_socket(args.host, args.port, args.backlog)
+    logger.info("Serving on %s:%d with %d workers", args.host, args.port, args.workers)
+    supervise(asgi_app, sock, args)
+    sock.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
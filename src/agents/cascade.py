@@ -0,0 +1,101 @@
+import re
+import threading
+from typing import Dict, List, Optional
+
+from src.config import STYLE_CASCADE, STYLE_CASCADE_THRESHOLD
+from src.logger import logger
+from src.prompt_cache import cached_chain
+from .evaluate.heuristic_scorer import score_prompts
+from .prompt_agent import PromptAgent
+
+# Static instructions first so the judge prompt shares a cacheable prefix across styles.
+JUDGE_PREFIX = """You are a strict prompt reviewer. Rate how well the refined prompt at the end of this message turns the user's request into a clear, specific, complete and actionable instruction for a language model. 0 means unusable, 100 means nothing to improve. Reply with a single integer from 0 to 100 and nothing else.
+
+"""
+JUDGE_SUFFIX = """User request: {user_input}
+
+Refined prompt:
+{prompt}"""
+
+_SCORE = re.compile(r"\b(\d{1,3})\b")
+
+
+class CascadeStats:
+    """Thread-safe tally, per style, of cascade calls, escalations to the large model and the small model's scores."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # calls, escalations, scored calls, score sum
+        self._totals: Dict[str, List[float]] = {}
+
+    def record(self, style: str, score: Optional[float], escalated: bool) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(style, [0, 0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += escalated
+            if score is not None:
+                totals[2] += 1
+                totals[3] += score
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Returns calls, escalations, escalation rate and mean small-model score for every style seen so far."""
+        with self._lock:
+            return {
+                style: {
+                    "calls": calls,
+                    "escalations": escalations,
+                    "escalation_rate": round(escalations / calls, 4) if calls else 0.0,
+                    "mean_small_score": round(score_sum / scored, 1) if scored else None,
+                }
+                for style, (calls, escalations, scored, score_sum) in sorted(self._totals.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+cascade_stats = CascadeStats()
+
+
+class CascadeAgent(PromptAgent):
+    """
+    Runs a style or framework agent on a small model first and on the large model only when needed.
+
+    The small model's prompt is scored with the local heuristic scorer, or
+    with a one-number judge call on the small model (``scorer="judge"``). A
+    prompt scoring below ``threshold``, an unparseable judge reply and a
+    failed small call all escalate to the same agent on the large model.
+    """
+
+    def __init__(self, style: str, small: PromptAgent, large: PromptAgent, scorer: str = STYLE_CASCADE,
+                 threshold: float = STYLE_CASCADE_THRESHOLD):
+        super().__init__(large.llm)
+        self.style = style
+        self.small = small
+        self.large = large
+        self.scorer = scorer
+        self.threshold = threshold
+
+    def score(self, user_input: str, prompt: str) -> Optional[float]:
+        if self.scorer == "judge":
+            reply = cached_chain("CascadeJudge", self.small.llm, JUDGE_PREFIX, JUDGE_SUFFIX).invoke(
+                {"user_input": user_input, "prompt": prompt}
+            ).content
+            match = _SCORE.search(str(reply))
+            return min(float(match.group(1)), 100.0) if match else None
+        return float(score_prompts([prompt])[0])
+
+    def refine(self, user_input: str, **kwargs) -> str:
+        try:
+            draft = self.small.refine(user_input, **kwargs)
+            score = self.score(user_input, draft) if draft else None
+        except Exception as e:
+            logger.warning("Cascade '%s': small model failed, escalating: %s", self.style, e)
+            draft, score = None, None
+        escalate = score is None or score < self.threshold
+        cascade_stats.record(self.style, score, escalate)
+        if not escalate:
+            return draft
+        logger.info("Cascade '%s': small-model prompt scored %s (threshold %g), escalating", self.style, score, self.threshold)
+        return self.large.refine(user_input, **kwargs)
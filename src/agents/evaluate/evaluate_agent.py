@@ -1,12 +1,24 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from functools import lru_cache
+from typing import Any, Type
+from langchain_core.output_parsers import JsonOutputParser
+from pydantic import BaseModel
+
+from src.token_budget import cap_output
+
+
+@lru_cache(maxsize=None)
+def format_instructions(schema: Type[BaseModel]) -> str:
+    """Returns the JSON format instructions for ``schema``, built once per schema."""
+    return JsonOutputParser(pydantic_object=schema).get_format_instructions()
 
 
 class EvaluateAgent(ABC):
     """Abstract base class for all evaluation agents."""
 
     def __init__(self, llm: Any):
-        self.llm = llm
+        # Output capped at the agent's token budget, keyed by the class name.
+        self.llm = cap_output(llm, type(self).__name__)
 
     @abstractmethod
     async def evaluate(self, *args, **kwargs) -> Any:
@@ -0,0 +1,119 @@
+from langchain_core.prompts import PromptTemplate
+from .evaluate_agent import EvaluateAgent
+from ..structured_output import bind_schema, ainvoke_structured
+from src.models.evaluateSchema import FullEvaluationResult, JudgeScores, GroupedJudgeScores
+from typing import Dict, List, Optional, Union
+
+RUBRICS = """**1. `llm_as_judge` (rate 1-10, 1 is abysmal and 10 is perfect):**
+- `clarity`: Is the prompt crystal clear, or full of ambiguity?
+- `specificity`: Does it specify the desired depth, format, and persona?
+- `context`: Does it provide all necessary context to avoid incorrect assumptions?
+- `goal_alignment`: Is the user's goal explicit and the prompt aligned to achieve it?
+- `measurability`: Can the quality of the output be checked against the prompt?
+- `overall` and a 1-line `comment` justifying it.
+
+**2. `t_rag` (rate 1-10 against the OBJECTIVE):**
+- `intent_alignment`: How perfectly does the prompt capture the user's goal?
+- `completeness`: Are the instructions exhaustive and self-contained?
+- `relevance`: Will the output be directly and fully relevant to the objective?
+- `ambiguity`: 1 = highly ambiguous, 10 = zero ambiguity.
+- `overall`.
+
+**3. `mar_framework` (rate 1-10, each weighted 20%):**
+- `clarity`, `completeness`, `relevance`, `structure` (format and constraints), `creativity_precision_balance`.
+- `overall_score`: the weighted average.
+"""
+
+# Both templates keep the static instructions and rubrics first and the prompts under evaluation last, so
+# provider prefix caches can reuse everything before them.
+FUSED_TEMPLATE = """You are a panel of three hyper-critical prompt auditors{arbiter}. Evaluate the prompt at the end of this message once, under all three rubrics, with extreme strictness. A simple, vague, or ambiguous prompt like "write about dogs" should score 1 everywhere.
+
+""" + RUBRICS + """{synthesis}
+Score each rubric independently; do not let one rubric's scores anchor another's.
+Output ONLY a raw JSON object with the keys {keys}.
+
+**PROMPT TO EVALUATE:**
+{prompt_to_evaluate}
+
+**OBJECTIVE:** {objective}"""
+
+GROUP_TEMPLATE = """You are a panel of three hyper-critical prompt auditors. Evaluate each of the candidate prompts at the end of this message separately, under all three rubrics, with extreme strictness. A simple, vague, or ambiguous prompt like "write about dogs" should score 1 everywhere.
+
+""" + RUBRICS + """
+Judge every candidate on its own merits; do not rank them against each other or let one candidate's scores anchor another's.
+Output ONLY a raw JSON object of the form {{"items": [{{"id": 1, "llm_as_judge": {{...}}, "t_rag": {{...}}, "mar_framework": {{...}}}}]}} with exactly one item per candidate id.
+
+**OBJECTIVE (shared by all candidates):** {objective}
+
+**CANDIDATES ({count}):**
+{prompts}"""
+
+SYNTHESIS_SECTION = """
+**4. `final_evaluation`:**
+- `final_score`: synthesize the three overall scores into a brutally honest 0-100 score.
+- `strengths`: genuine strengths in 1-2 sentences; say so if there are none.
+- `areas_for_improvement`: direct, actionable advice in 1-2 sentences.
+- `report`: the key finding of each rubric, briefly.
+"""
+
+
+def _objective(initial_prompt: Optional[str]) -> str:
+    if initial_prompt:
+        return f"The user's original goal was: '{initial_prompt}'. The new prompt should be an improvement on that."
+    return "The user wants a high-quality, general-purpose prompt. The objective is to maximize clarity, relevance, and usefulness of the LLM's output."
+
+
+class FusedJudgeAgent(EvaluateAgent):
+    """Scores a prompt under all three rubrics, and optionally writes the verdict, in a single structured call."""
+
+    async def evaluate(
+        self,
+        prompt_to_evaluate: str,
+        initial_prompt: Optional[str] = None,
+        narrative: bool = True,
+        **kwargs,
+    ) -> Optional[Union[FullEvaluationResult, JudgeScores]]:
+        """
+        Returns the full evaluation, or only the judges' scores when ``narrative``
+        is False; None if the response could not be parsed.
+        """
+        objective = _objective(initial_prompt)
+        if narrative:
+            template = PromptTemplate.from_template(FUSED_TEMPLATE).partial(
+                arbiter=" and the arbiter who merges their verdicts",
+                synthesis=SYNTHESIS_SECTION,
+                keys="`llm_as_judge`, `t_rag`, `mar_framework` and `final_evaluation`",
+            )
+            chain = template | bind_schema(self.llm, FullEvaluationResult)
+        else:
+            template = PromptTemplate.from_template(FUSED_TEMPLATE).partial(
+                arbiter="", synthesis="", keys="`llm_as_judge`, `t_rag` and `mar_framework`",
+            )
+            chain = template | bind_schema(self.llm, JudgeScores)
+        return await ainvoke_structured("FusedJudgeAgent", chain, {
+            "prompt_to_evaluate": prompt_to_evaluate,
+            "objective": objective,
+        })
+
+    async def evaluate_group(self, prompts: List[str], initial_prompt: Optional[str] = None) -> Dict[int, JudgeScores]:
+        """
+        Scores several small prompts in one call.
+
+        Returns the judges' scores keyed by position in ``prompts``; prompts the
+        response left out, or the whole group on a parse failure, are missing.
+        """
+        candidates = "\n\n".join(
+            f"### Candidate {number}\n{prompt}\n### End of candidate {number}" for number, prompt in enumerate(prompts, 1)
+        )
+        chain = PromptTemplate.from_template(GROUP_TEMPLATE) | bind_schema(self.llm, GroupedJudgeScores)
+        result = await ainvoke_structured("FusedJudgeAgent.group", chain, {
+            "count": len(prompts),
+            "objective": _objective(initial_prompt),
+            "prompts": candidates,
+        })
+        if result is None:
+            return {}
+        return {
+            item.id - 1: JudgeScores(llm_as_judge=item.llm_as_judge, t_rag=item.t_rag, mar_framework=item.mar_framework)
+            for item in result.items if 1 <= item.id <= len(prompts)
+        }
@@ -0,0 +1,244 @@
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import HEURISTIC_FAIL_SCORE, HEURISTIC_GATE, HEURISTIC_PASS_COVERAGE, HEURISTIC_PASS_SCORE
+from .score_aggregator import aggregate_scores
+from src.models.evaluateSchema import (
+    FinalEvaluationOutput,
+    FullEvaluationResult,
+    LLMAsJudgeOutput,
+    MARFrameworkOutput,
+    TRAGOutput,
+)
+
+FEATURES = ("length", "structure", "instructions", "constraints", "placeholders", "ambiguity", "readability")
+WEIGHTS = np.array([0.15, 0.15, 0.2, 0.15, 0.05, 0.15, 0.15])
+
+_INSTRUCTION, _CONSTRAINT, _AMBIGUITY = 0, 1, 2
+LEXICON: Dict[str, int] = {
+    **dict.fromkeys((
+        "write", "list", "explain", "describe", "generate", "create", "summarize", "summarise", "analyze",
+        "analyse", "provide", "include", "return", "output", "compare", "identify", "classify", "translate",
+        "rewrite", "answer", "draft", "outline", "design", "plan", "evaluate", "review", "suggest", "recommend",
+        "extract", "convert", "calculate", "format", "respond", "use", "avoid", "ensure", "focus", "act",
+    ), _INSTRUCTION),
+    **dict.fromkeys((
+        "must", "should", "never", "always", "only", "exactly", "limit", "within", "maximum", "minimum",
+        "words", "sentences", "paragraphs", "bullet", "bullets", "json", "markdown", "table", "steps",
+        "tone", "audience", "length", "required", "constraints", "criteria",
+    ), _CONSTRAINT),
+    **dict.fromkeys((
+        "something", "stuff", "things", "etc", "maybe", "perhaps", "various", "nice", "good", "interesting",
+        "whatever", "somehow", "anything", "generally", "usually", "some", "several", "appropriate", "stuffs",
+    ), _AMBIGUITY),
+}
+PHRASES: Dict[str, int] = {
+    "do not": _CONSTRAINT, "don't": _CONSTRAINT, "at least": _CONSTRAINT, "at most": _CONSTRAINT,
+    "no more than": _CONSTRAINT, "no longer than": _CONSTRAINT, "you are": _INSTRUCTION,
+    "kind of": _AMBIGUITY, "sort of": _AMBIGUITY, "a bit": _AMBIGUITY, "as needed": _AMBIGUITY,
+    "and so on": _AMBIGUITY, "if possible": _AMBIGUITY,
+}
+
+_TOKEN = re.compile(r"[a-z][a-z']*")
+_PHRASE = re.compile(r"\b(?:" + "|".join(re.escape(phrase) for phrase in sorted(PHRASES, key=len, reverse=True)) + r")\b")
+_STRUCTURE = re.compile(r"(?m)^[ \t]*(?:#{1,6}[ \t]|[-*•][ \t]|\d{1,2}[.)][ \t]|\*\*[^*\n]{1,80}\*\*|[A-Z][\w /&-]{0,40}:[ \t]*$)")
+_SENTENCE = re.compile(r"[.!?](?:\s|$)|\n\s*\S")
+_SLOT = re.compile(r"\{[^{}\n]{1,40}\}|<[^<>\n]{1,40}>|\[[^\[\]\n]{1,40}\]")
+# Words too common to show that a prompt kept the request's subject.
+_STOPWORDS = frozenset((
+    "about", "also", "been", "from", "have", "into", "just", "like", "make", "more", "need", "some", "than",
+    "that", "their", "them", "then", "there", "they", "this", "very", "want", "what", "when", "which", "will",
+    "with", "would", "your",
+))
+_UNFILLED = re.compile(r"\[(?:insert|your|add|fill)|<(?:insert|your)|\b(?:todo|tbd|xxx|lorem ipsum)\b")
+
+# Column order of the raw counts gathered per prompt.
+_WORDS, _LETTERS, _SENTENCES, _MARKERS, _INSTRUCTIONS, _CONSTRAINTS, _AMBIGUOUS, _SLOTS, _UNFILLED_SLOTS = range(9)
+
+ADVICE = {
+    "length": "Add the context, inputs and expected output the task needs.",
+    "structure": "Organize the prompt into labelled sections or lists.",
+    "instructions": "State the task with explicit instruction verbs.",
+    "constraints": "Specify format, length, tone and other constraints.",
+    "placeholders": "Fill in or remove unfinished placeholders.",
+    "ambiguity": "Replace vague words with concrete requirements.",
+    "readability": "Break long sentences into short, direct instructions.",
+}
+
+
+def _counts(prompt: str) -> List[int]:
+    lower = prompt.lower()
+    tokens = _TOKEN.findall(lower)
+    categories = [LEXICON[token] for token in tokens if token in LEXICON]
+    categories += [PHRASES[phrase] for phrase in _PHRASE.findall(lower)]
+    return [
+        len(tokens),
+        sum(map(len, tokens)),
+        len(_SENTENCE.findall(prompt)) + 1,
+        len(_STRUCTURE.findall(prompt)),
+        categories.count(_INSTRUCTION),
+        categories.count(_CONSTRAINT),
+        categories.count(_AMBIGUITY),
+        len(_SLOT.findall(prompt)),
+        len(_UNFILLED.findall(lower)),
+    ]
+
+
+def feature_scores(prompts: Sequence[str]) -> np.ndarray:
+    """
+    Scores every prompt on each of ``FEATURES``.
+
+    Lexicon and marker counts are gathered in one regex pass per prompt; the
+    scoring itself runs on the whole batch at once. Returns an ``(N, 7)``
+    array of values between 0 and 1, higher is better.
+    """
+    raw = np.array([_counts(prompt) for prompt in prompts], dtype=float).reshape(-1, 9)
+    words = np.maximum(raw[:, _WORDS], 1)
+    scores = np.empty((len(raw), len(FEATURES)))
+    scores[:, 0] = np.interp(raw[:, _WORDS], [0, 8, 30, 60, 150, 2000, 4000], [0, 0.15, 0.5, 0.8, 1, 1, 0.6])
+    structure = np.interp(raw[:, _MARKERS], [0, 1, 3, 6], [0.2, 0.5, 0.85, 1])
+    # Short prompts do not need sections.
+    scores[:, 1] = np.where(raw[:, _WORDS] < 40, np.maximum(structure, 0.6), structure)
+    scores[:, 2] = np.interp(raw[:, _INSTRUCTIONS], [0, 1, 3, 6], [0, 0.5, 0.85, 1])
+    scores[:, 3] = np.interp(raw[:, _CONSTRAINTS], [0, 1, 3, 8], [0.1, 0.45, 0.8, 1])
+    scores[:, 4] = np.clip(0.85 + 0.05 * np.minimum(raw[:, _SLOTS], 3) - 0.35 * raw[:, _UNFILLED_SLOTS], 0, 1)
+    scores[:, 5] = np.interp(raw[:, _AMBIGUOUS] * 100 / words, [0, 1, 3, 6], [1, 0.8, 0.4, 0.1])
+    sentence_length = raw[:, _WORDS] / raw[:, _SENTENCES]
+    word_length = raw[:, _LETTERS] / words
+    scores[:, 6] = (0.7 * np.interp(sentence_length, [0, 5, 12, 22, 35, 60], [0.4, 0.8, 1, 1, 0.6, 0.2])
+                    + 0.3 * np.interp(word_length, [2, 3.5, 4.5, 6, 7.5], [0.4, 0.8, 1, 1, 0.6]))
+    return scores
+
+
+def score_prompts(prompts: Sequence[str]) -> np.ndarray:
+    """Overall heuristic quality (0-100) for every prompt; too-short prompts are capped by their length score."""
+    return _overall(feature_scores(prompts))
+
+
+def _overall(features: np.ndarray) -> np.ndarray:
+    return np.round(100 * (features @ WEIGHTS) * (0.4 + 0.6 * features[:, 0]), 1)
+
+
+def weak_points(features: np.ndarray, threshold: float = 0.6) -> List[str]:
+    """Advice for each feature of a single prompt's row that scores below ``threshold``, weakest first."""
+    order = np.argsort(features)
+    return [ADVICE[FEATURES[index]] for index in order if features[index] < threshold]
+
+
+def heuristic_gate(prompts: Sequence[str], initial_prompt: Optional[str] = None) -> Tuple[Optional[str], np.ndarray]:
+    """
+    Decides whether an LLM evaluation of ``prompts`` can be skipped.
+
+    Returns ``("pass", scores)`` when every prompt clearly passes, ``("fail",
+    scores)`` when any clearly fails, and ``(None, scores)`` when the model
+    has to judge. The features say nothing about relevance, so a pass also
+    needs every prompt to keep HEURISTIC_PASS_COVERAGE of ``initial_prompt``'s
+    content words; without it only a fail is decided locally. The verdict is
+    always None when HEURISTIC_GATE is off.
+    """
+    scores = score_prompts(prompts)
+    if not HEURISTIC_GATE or not len(scores):
+        return None, scores
+    if (scores <= HEURISTIC_FAIL_SCORE).any():
+        return "fail", scores
+    if initial_prompt and (scores >= HEURISTIC_PASS_SCORE).all():
+        if (coverage(prompts, initial_prompt) >= HEURISTIC_PASS_COVERAGE).all():
+            return "pass", scores
+    return None, scores
+
+
+def failure_summary(named_prompts: Dict[str, str], scores: np.ndarray) -> Dict[str, object]:
+    """``key_points``/``guidance`` for the prompts at or below the fail score, in the evaluators' format."""
+    failing = [(name, prompt, score) for (name, prompt), score in zip(named_prompts.items(), scores)
+               if score <= HEURISTIC_FAIL_SCORE]
+    advice: List[str] = []
+    for _, prompt, _ in failing:
+        for item in weak_points(feature_scores([prompt])[0]):
+            if item not in advice:
+                advice.append(item)
+    return {
+        "key_points": [f"'{name}' scored {score:g}/100 on the local quality heuristics." for name, _, score in failing],
+        "guidance": " ".join(advice) or ADVICE["length"],
+    }
+
+
+def _rating(value: float) -> int:
+    return int(round(1 + 9 * float(value)))
+
+
+def coverage(prompts: Sequence[str], initial_prompt: str) -> np.ndarray:
+    """Share (0-1) of the initial prompt's content words that each prompt still contains; 1 when it has none."""
+    wanted = {token for token in _TOKEN.findall(initial_prompt.lower()) if len(token) > 3 and token not in _STOPWORDS}
+    if not wanted:
+        return np.ones(len(prompts))
+    return np.array([len(wanted & set(_TOKEN.findall(prompt.lower()))) / len(wanted) for prompt in prompts])
+
+
+def heuristic_evaluations(prompts: Sequence[str], initial_prompt: Optional[str] = None) -> List[FullEvaluationResult]:
+    """
+    Estimates the three judges' rubrics for every prompt from its features, without a model call.
+
+    Each rubric dimension is mapped to the closest features and rated 1-10;
+    the final verdict comes from the local score aggregator. With an
+    ``initial_prompt``, the T-RAG intent and relevance ratings and its overall
+    score also reflect how much of the request's vocabulary the prompt kept.
+    """
+    features = feature_scores(prompts)
+    overall = _overall(features) / 10
+    kept = coverage(prompts, initial_prompt) if initial_prompt else [None] * len(prompts)
+    return [
+        _evaluation(dict(zip(FEATURES, row)), float(score), share)
+        for row, score, share in zip(features, overall, kept)
+    ]
+
+
+def heuristic_evaluation(prompt: str, initial_prompt: Optional[str] = None) -> FullEvaluationResult:
+    """Heuristic estimate of a single prompt; see :func:`heuristic_evaluations`."""
+    return heuristic_evaluations([prompt], initial_prompt)[0]
+
+
+def _evaluation(f: Dict[str, float], overall: float, kept: Optional[float] = None) -> FullEvaluationResult:
+    clarity = (f["readability"] + f["ambiguity"]) / 2
+    intent, relevance, t_rag_overall = f["instructions"], (f["instructions"] + f["ambiguity"]) / 2, overall
+    if kept is not None:
+        # A prompt that drops the request's subject cannot be aligned with it, however well written.
+        intent, relevance = (intent + kept) / 2, (relevance + kept) / 2
+        t_rag_overall = overall * (0.6 + 0.4 * kept)
+    llm_as_judge = LLMAsJudgeOutput(
+        clarity=_rating(clarity),
+        specificity=_rating(f["constraints"]),
+        context=_rating(f["length"]),
+        goal_alignment=_rating(f["instructions"]),
+        measurability=_rating((f["constraints"] + f["structure"]) / 2),
+        overall=max(1, round(overall)),
+        comment="Heuristic estimate from length, structure, instruction, constraint and ambiguity features.",
+    )
+    t_rag = TRAGOutput(
+        intent_alignment=_rating(intent),
+        completeness=_rating((f["length"] + f["placeholders"]) / 2),
+        relevance=_rating(relevance),
+        ambiguity=_rating(f["ambiguity"]),
+        overall=max(1, round(t_rag_overall)),
+    )
+    mar = MARFrameworkOutput(
+        clarity=_rating(clarity),
+        completeness=_rating(f["length"]),
+        relevance=_rating(f["instructions"]),
+        structure=_rating(f["structure"]),
+        creativity_precision_balance=_rating((f["constraints"] + f["ambiguity"]) / 2),
+        overall_score=round(max(1.0, overall), 1),
+    )
+    final = aggregate_scores(llm_as_judge, t_rag, mar)
+    return FullEvaluationResult(
+        llm_as_judge=llm_as_judge,
+        t_rag=t_rag,
+        mar_framework=mar,
+        final_evaluation=FinalEvaluationOutput(
+            final_score=final.final_score,
+            strengths=final.strengths,
+            areas_for_improvement=final.areas_for_improvement,
+            report="Heuristic tier: no model was called. " + final.report,
+        ),
+    )
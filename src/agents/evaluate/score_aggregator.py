@@ -0,0 +1,154 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.config import EVALUATE_SCORE_CALIBRATION, EVALUATE_SCORE_WEIGHTS
+from src.models.evaluateSchema import FinalEvaluationOutput
+
+JUDGE_LABELS = {"llm_as_judge": "LLM-as-a-Judge", "t_rag": "T-RAG", "mar_framework": "MAR"}
+
+# Sub-scores that describe the prompt, keyed by field name; "overall" fields are excluded.
+DIMENSIONS = {
+    "clarity": "clarity",
+    "specificity": "specificity",
+    "context": "context",
+    "goal_alignment": "goal alignment",
+    "measurability": "measurability",
+    "intent_alignment": "intent alignment",
+    "completeness": "completeness",
+    "relevance": "relevance",
+    "ambiguity": "freedom from ambiguity",
+    "structure": "structure and constraints",
+    "creativity_precision_balance": "creativity/precision balance",
+}
+
+ADVICE = {
+    "clarity": "Rephrase the request so each instruction has a single reading.",
+    "specificity": "State the expected depth, format and persona of the answer.",
+    "context": "Add the background the model needs instead of leaving it to assumptions.",
+    "goal alignment": "Say explicitly what the output is for and what success looks like.",
+    "measurability": "Give criteria the output can be checked against.",
+    "intent alignment": "Restate the user's actual goal at the start of the prompt.",
+    "completeness": "Cover the missing steps and inputs so the prompt is self-contained.",
+    "relevance": "Cut instructions that do not serve the objective.",
+    "freedom from ambiguity": "Replace vague terms with concrete values or examples.",
+    "structure and constraints": "Define the output structure and the constraints it must respect.",
+    "creativity/precision balance": "Mark where the model may be creative and where it must be exact.",
+}
+
+
+def parse_weights(spec: str) -> Dict[str, float]:
+    """Parses ``"llm_as_judge=0.35,t_rag=0.35,mar_framework=0.3"``; weights are normalized to sum to 1."""
+    weights = {judge: 0.0 for judge in JUDGE_LABELS}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        judge, _, value = item.partition("=")
+        if judge.strip() not in weights:
+            raise ValueError(f"Unknown judge in score weights: {judge!r}")
+        weights[judge.strip()] = float(value)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError("Score weights must not all be zero.")
+    return {judge: weight / total for judge, weight in weights.items()}
+
+
+def parse_calibration(spec: str) -> List[Tuple[float, float]]:
+    """Parses ``"0:0,60:45,100:100"`` into knots mapping raw 0-100 scores to calibrated ones."""
+    knots = sorted(tuple(float(value) for value in item.split(":")) for item in spec.split(",") if item.strip())
+    if len(knots) < 2:
+        raise ValueError("Score calibration needs at least two raw:calibrated points.")
+    return knots
+
+
+def calibrate(raw: float, knots: Sequence[Tuple[float, float]]) -> float:
+    """Piecewise-linear interpolation through ``knots``, clamped to 0-100."""
+    if raw <= knots[0][0]:
+        value = knots[0][1]
+    elif raw >= knots[-1][0]:
+        value = knots[-1][1]
+    else:
+        for (x0, y0), (x1, y1) in zip(knots, knots[1:]):
+            if x0 <= raw <= x1:
+                value = y0 + (y1 - y0) * (raw - x0) / (x1 - x0) if x1 > x0 else y1
+                break
+    return min(100.0, max(0.0, value))
+
+
+WEIGHTS = parse_weights(EVALUATE_SCORE_WEIGHTS)
+CALIBRATION = parse_calibration(EVALUATE_SCORE_CALIBRATION)
+
+
+def _as_dict(result: Any) -> Dict[str, Any]:
+    return result.dict() if hasattr(result, "dict") else dict(result)
+
+
+def _overall(judge: str, scores: Dict[str, Any]) -> float:
+    return float(scores["overall_score" if judge == "mar_framework" else "overall"])
+
+
+def _dimension_averages(results: Dict[str, Dict[str, Any]]) -> List[Tuple[str, float]]:
+    """Every rubric dimension averaged over the judges that rate it, best first."""
+    collected: Dict[str, List[float]] = {}
+    for scores in results.values():
+        for field, label in DIMENSIONS.items():
+            try:
+                collected.setdefault(label, []).append(float(scores[field]))
+            except (KeyError, TypeError, ValueError):
+                continue
+    averages = [(label, sum(values) / len(values)) for label, values in collected.items() if values]
+    return sorted(averages, key=lambda item: item[1], reverse=True)
+
+
+def _listing(items: Sequence[Tuple[str, float]]) -> str:
+    return " and ".join(f"{label} ({score:g}/10)" for label, score in items)
+
+
+def aggregate_scores(
+    llm_as_judge_result: Any,
+    t_rag_result: Any,
+    mar_result: Any,
+    weights: Optional[Dict[str, float]] = None,
+    calibration: Optional[Sequence[Tuple[float, float]]] = None,
+) -> FinalEvaluationOutput:
+    """
+    Builds the final evaluation from the three judges without a model call.
+
+    ``final_score`` is the weighted mean of the judges' overall scores on a
+    0-100 scale, passed through the calibration curve. Strengths and areas
+    for improvement name the best and worst rated rubric dimensions and quote
+    the LLM-as-a-Judge comment.
+    """
+    weights = weights or WEIGHTS
+    calibration = calibration or CALIBRATION
+    results = {
+        "llm_as_judge": _as_dict(llm_as_judge_result),
+        "t_rag": _as_dict(t_rag_result),
+        "mar_framework": _as_dict(mar_result),
+    }
+    overall = {judge: _overall(judge, scores) for judge, scores in results.items()}
+    raw = sum(weights[judge] * overall[judge] * 10 for judge in overall)
+    final_score = round(calibrate(raw, calibration), 1)
+
+    dimensions = _dimension_averages(results)
+    strong = [item for item in dimensions[:2] if item[1] >= 7]
+    weak = [item for item in dimensions[::-1][:2] if item[1] < 8]
+    comment = (results["llm_as_judge"].get("comment") or "").strip()
+
+    if strong:
+        strengths = f"Strongest on {_listing(strong)}."
+    else:
+        strengths = "No dimension scored 7/10 or higher, so there are no clear strengths yet."
+    if comment:
+        strengths += f" Judge's note: {comment}"
+    if weak:
+        areas_for_improvement = f"Weakest on {_listing(weak)}. " + " ".join(ADVICE[label] for label, _ in weak)
+    else:
+        areas_for_improvement = "Every dimension scored 8/10 or higher; only minor polishing remains."
+
+    report = " ".join(
+        f"{JUDGE_LABELS[judge]}: {overall[judge]:g}/10 (weight {weights[judge]:.0%})."
+        for judge in JUDGE_LABELS
+    ) + f" Weighted score {raw:.1f}, calibrated to {final_score:g}/100."
+    return FinalEvaluationOutput(
+        final_score=final_score,
+        strengths=strengths,
+        areas_for_improvement=areas_for_improvement,
+        report=report,
+    )
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class AppFramework(PromptAgent):
@@ -10,11 +10,8 @@ class AppFramework(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using APP framework."""
-        app_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt for short, transactional tasks, optimized for large language models. Use the APP framework: Ask (state exactly what you want), Provide (supply necessary context or examples), and Perform (instruct how to deliver the output, including format or next steps).
+        app_template = """The prompt is for short, transactional tasks. Use the APP framework: Ask (state exactly what you want), Provide (supply necessary context or examples), and Perform (instruct how to deliver the output, including format or next steps).
 
 User Input: {user_input}"""
-        )
-        chain = app_template | self.llm
+        chain = cached_chain("AppFramework", self.llm, REFINER_PREFIX, app_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
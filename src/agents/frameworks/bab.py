@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class Bab(PromptAgent):
@@ -10,11 +10,8 @@ class Bab(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Before-After-Bridge (BAB) framework."""
-        bab_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use the Before-After-Bridge (BAB) framework: Before (describe the current state), After (outline the desired state), Bridge (explain how to transition). Ensure the refined prompt incorporates all elements for persuasive, problem-solving outputs.
+        bab_template = """Use the Before-After-Bridge (BAB) framework: Before (describe the current state), After (outline the desired state), Bridge (explain how to transition). Ensure the refined prompt incorporates all elements for persuasive, problem-solving outputs.
 
 User Input: {user_input}"""
-        )
-        chain = bab_template | self.llm
+        chain = cached_chain("Bab", self.llm, REFINER_PREFIX, bab_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class Clear(PromptAgent):
@@ -10,11 +10,8 @@ class Clear(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using CLEAR framework."""
-        clear_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use the CLEAR framework: ensure the prompt is Concise (complete but not wordy), Logical (ordered correctly), Explicit (no assumptions), Actionable (the AI can do it), and Relevant (related to the outcome). The final prompt must be sharp and executable.
+        clear_template = """Use the CLEAR framework: ensure the prompt is Concise (complete but not wordy), Logical (ordered correctly), Explicit (no assumptions), Actionable (the AI can do it), and Relevant (related to the outcome). The final prompt must be sharp and executable.
 
 User Input: {user_input}"""
-        )
-        chain = clear_template | self.llm
+        chain = cached_chain("Clear", self.llm, REFINER_PREFIX, clear_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
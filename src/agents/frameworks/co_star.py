@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class CoStar(PromptAgent):
@@ -10,11 +10,8 @@ class CoStar(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using CO-STAR framework."""
-        co_star_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use the CO-STAR framework: Context (provide background), Objective (state the goal), Style (define the format), Tone (set the voice), Audience (target the reader), Response (specify output format). Ensure the refined prompt incorporates all elements for comprehensive guidance.
+        co_star_template = """Use the CO-STAR framework: Context (provide background), Objective (state the goal), Style (define the format), Tone (set the voice), Audience (target the reader), Response (specify output format). Ensure the refined prompt incorporates all elements for comprehensive guidance.
 
 User Input: {user_input}"""
-        )
-        chain = co_star_template | self.llm
+        chain = cached_chain("CoStar", self.llm, REFINER_PREFIX, co_star_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
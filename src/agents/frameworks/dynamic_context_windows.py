@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class DynamicContextWindows(PromptAgent):
@@ -10,11 +10,8 @@ class DynamicContextWindows(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Dynamic Context Windows framework."""
-        dynamic_context_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use the Dynamic Context Windows framework: instruct the AI to manage its context window by prioritizing critical information from the conversation history. The prompt should guide the AI to summarize or discard less relevant details to maintain focus and continuity over long interactions.
+        dynamic_context_template = """Use the Dynamic Context Windows framework: instruct the AI to manage its context window by prioritizing critical information from the conversation history. The prompt should guide the AI to summarize or discard less relevant details to maintain focus and continuity over long interactions.
 
 User Input: {user_input}"""
-        )
-        chain = dynamic_context_template | self.llm
+        chain = cached_chain("DynamicContextWindows", self.llm, REFINER_PREFIX, dynamic_context_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class FlippedInteraction(PromptAgent):
@@ -10,11 +10,8 @@ class FlippedInteraction(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Flipped Interaction Pattern framework."""
-        flipped_interaction_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use the Flipped Interaction Pattern framework: instruct the AI to ask clarifying questions first, then use the answers to generate a tailored response, uncovering hidden requirements for a precise output.
+        flipped_interaction_template = """Use the Flipped Interaction Pattern framework: instruct the AI to ask clarifying questions first, then use the answers to generate a tailored response, uncovering hidden requirements for a precise output.
 
 User Input: {user_input}"""
-        )
-        chain = flipped_interaction_template | self.llm
+        chain = cached_chain("FlippedInteraction", self.llm, REFINER_PREFIX, flipped_interaction_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
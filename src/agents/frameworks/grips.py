@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class Grips(PromptAgent):
@@ -10,11 +10,8 @@ class Grips(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using GRIPS framework."""
-        grips_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt for complex reasoning tasks, optimized for large language models. Use the GRIPS framework: Goal (clearly state the objective), Role (assign a persona), Input (supply relevant data), Process (describe the thinking steps), and Scope (define the limits like time or length).
+        grips_template = """The prompt is for complex reasoning tasks. Use the GRIPS framework: Goal (clearly state the objective), Role (assign a persona), Input (supply relevant data), Process (describe the thinking steps), and Scope (define the limits like time or length).
 
 User Input: {user_input}"""
-        )
-        chain = grips_template | self.llm
+        chain = cached_chain("Grips", self.llm, REFINER_PREFIX, grips_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class Pecra(PromptAgent):
@@ -10,11 +10,8 @@ class Pecra(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using PECRA framework."""
-        pecra_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use the PECRA framework: Purpose (define the goal), Expectation (set output expectations), Context (provide background), Request (specify action), Audience (target reader). Ensure the refined prompt incorporates all elements for user-centered, persuasive outputs.
+        pecra_template = """Use the PECRA framework: Purpose (define the goal), Expectation (set output expectations), Context (provide background), Request (specify action), Audience (target reader). Ensure the refined prompt incorporates all elements for user-centered, persuasive outputs.
 
 User Input: {user_input}"""
-        )
-        chain = pecra_template | self.llm
+        chain = cached_chain("Pecra", self.llm, REFINER_PREFIX, pecra_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
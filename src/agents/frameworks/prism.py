@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class Prism(PromptAgent):
@@ -10,11 +10,8 @@ class Prism(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using PRISM framework."""
-        prism_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use the PRISM framework for a creative and multifaceted prompt: Perspective (e.g., optimistic, critical), Role (e.g., expert, marketer), Input (the data or context provided), Style (tone, format, voice), and Medium (e.g., blog, tweet, script).
+        prism_template = """Use the PRISM framework for a creative and multifaceted prompt: Perspective (e.g., optimistic, critical), Role (e.g., expert, marketer), Input (the data or context provided), Style (tone, format, voice), and Medium (e.g., blog, tweet, script).
 
 User Input: {user_input}"""
-        )
-        chain = prism_template | self.llm
+        chain = cached_chain("Prism", self.llm, REFINER_PREFIX, prism_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class PromptEnsembles(PromptAgent):
@@ -10,11 +10,8 @@ class PromptEnsembles(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Prompt Ensembles framework."""
-        prompt_ensembles_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use the Prompt Ensembles framework: instruct the AI to generate multiple diverse responses by applying several different strategies or perspectives in parallel. Then, it should merge, weight, or select from these outputs to create a final, more robust and creative answer.
+        prompt_ensembles_template = """Use the Prompt Ensembles framework: instruct the AI to generate multiple diverse responses by applying several different strategies or perspectives in parallel. Then, it should merge, weight, or select from these outputs to create a final, more robust and creative answer.
 
 User Input: {user_input}"""
-        )
-        chain = prompt_ensembles_template | self.llm
+        chain = cached_chain("PromptEnsembles", self.llm, REFINER_PREFIX, prompt_ensembles_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
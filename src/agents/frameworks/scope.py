@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class Scope(PromptAgent):
@@ -10,11 +10,8 @@ class Scope(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using SCOPE framework."""
-        scope_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt for planning larger workflows, optimized for large language models. Use the SCOPE framework: Situation (describe the context/problem), Constraints (list limitations), Objectives (state desired outcomes), Persona (assign a role), and Execution (instruct how to produce the answer, including steps and format).
+        scope_template = """The prompt is for planning larger workflows. Use the SCOPE framework: Situation (describe the context/problem), Constraints (list limitations), Objectives (state desired outcomes), Persona (assign a role), and Execution (instruct how to produce the answer, including steps and format).
 
 User Input: {user_input}"""
-        )
-        chain = scope_template | self.llm
+        chain = cached_chain("Scope", self.llm, REFINER_PREFIX, scope_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
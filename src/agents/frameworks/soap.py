@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class Soap(PromptAgent):
@@ -10,11 +10,8 @@ class Soap(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using SOAP framework."""
-        soap_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use the SOAP framework: Subject (identify the topic), Objective (state what you want done), Audience (define who will read the output), and Parameters (specify constraints like word count or format). Ensure the prompt is unambiguous and audience-specific.
+        soap_template = """Use the SOAP framework: Subject (identify the topic), Objective (state what you want done), Audience (define who will read the output), and Parameters (specify constraints like word count or format). Ensure the prompt is unambiguous and audience-specific.
 
 User Input: {user_input}"""
-        )
-        chain = soap_template | self.llm
+        chain = cached_chain("Soap", self.llm, REFINER_PREFIX, soap_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
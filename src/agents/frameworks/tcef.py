@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class Tcef(PromptAgent):
@@ -10,11 +10,8 @@ class Tcef(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using TCEF framework."""
-        tcef_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use the TCEF framework: Task (define the action), Context (provide background), Example (include a demonstration), Format (specify output structure). Ensure the refined prompt incorporates all elements for quick and effective results.
+        tcef_template = """Use the TCEF framework: Task (define the action), Context (provide background), Example (include a demonstration), Format (specify output structure). Ensure the refined prompt incorporates all elements for quick and effective results.
 
 User Input: {user_input}"""
-        )
-        chain = tcef_template | self.llm
+        chain = cached_chain("Tcef", self.llm, REFINER_PREFIX, tcef_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
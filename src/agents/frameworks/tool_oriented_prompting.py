@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class ToolOrientedPrompting(PromptAgent):
@@ -10,11 +10,8 @@ class ToolOrientedPrompting(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Tool-Oriented Prompting framework."""
-        top_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use the Tool-Oriented Prompting (TOP) framework: instruct the AI to identify opportunities to use external tools, plan the sequence of tool calls, and integrate their outputs back into the reasoning process to produce a comprehensive, action-oriented response.
+        top_template = """Use the Tool-Oriented Prompting (TOP) framework: instruct the AI to identify opportunities to use external tools, plan the sequence of tool calls, and integrate their outputs back into the reasoning process to produce a comprehensive, action-oriented response.
 
 User Input: {user_input}"""
-        )
-        chain = top_template | self.llm
+        chain = cached_chain("ToolOrientedPrompting", self.llm, REFINER_PREFIX, top_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
@@ -0,0 +1,140 @@
+import json
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from src.logger import logger
+from src.token_budget import count_tokens
+
+# Paragraphs shorter than this are left alone even when repeated: the reference would not be much shorter.
+MIN_DEDUPE_CHARS = 120
+
+_WRAPPING_FENCE = re.compile(r"\A\s*```[\w+-]*[ \t]*\n(.*?)\n[ \t]*```\s*\Z", re.S)
+_TRAILING_SPACE = re.compile(r"[ \t]+$", re.M)
+_BLANK_RUN = re.compile(r"\n{3,}")
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n")
+
+
+def compact_json(value: Any) -> str:
+    """
+    Serializes ``value`` without indentation or padding.
+
+    Pydantic models are dumped first; non-ASCII text is kept as-is rather
+    than escaped, which is shorter in every tokenizer.
+    """
+    if hasattr(value, "dict"):
+        value = value.dict()
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def clean_text(text: Optional[str]) -> str:
+    """
+    Removes formatting that carries no meaning for the model.
+
+    Unwraps a code fence around the whole text (the way models often return
+    a prompt), drops trailing spaces and collapses runs of blank lines. Code
+    fences inside the text and indentation are kept.
+    """
+    if not text:
+        return ""
+    match = _WRAPPING_FENCE.match(text)
+    if match and "```" not in match.group(1):
+        text = match.group(1)
+    text = _TRAILING_SPACE.sub("", text)
+    return _BLANK_RUN.sub("\n\n", text).strip()
+
+
+def _key(paragraph: str) -> str:
+    return " ".join(paragraph.split())
+
+
+def dedupe_paragraphs(texts: Dict[str, str], reference: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """
+    Replaces paragraphs already sent earlier in the same payload with a short reference.
+
+    ``reference`` texts are sent as they are and only seed the paragraphs
+    seen so far; ``texts`` are processed in order, so the first occurrence
+    of a paragraph is always kept in full. Paragraphs inside code fences and
+    paragraphs under MIN_DEDUPE_CHARS are never replaced.
+    """
+    seen: Dict[str, str] = {}
+
+    def paragraphs(text: str) -> List[tuple]:
+        # (paragraph, dedupable) pairs; a paragraph that opens, closes or sits in a fence is kept.
+        result, in_fence = [], False
+        for paragraph in _PARAGRAPH_BREAK.split(text):
+            fences = paragraph.count("```")
+            result.append((paragraph, not in_fence and not fences and len(_key(paragraph)) >= MIN_DEDUPE_CHARS))
+            in_fence ^= fences % 2 == 1
+        return result
+
+    for name, text in (reference or {}).items():
+        for paragraph, dedupable in paragraphs(text or ""):
+            if dedupable:
+                seen.setdefault(_key(paragraph), name)
+
+    deduped = {}
+    for name, text in texts.items():
+        kept = []
+        for paragraph, dedupable in paragraphs(text or ""):
+            key = _key(paragraph)
+            if dedupable and key in seen:
+                excerpt = " ".join(key.split()[:8])
+                kept.append(f'[Same paragraph as in "{seen[key]}": "{excerpt} ..."]')
+                continue
+            if dedupable:
+                seen[key] = name
+            kept.append(paragraph)
+        deduped[name] = "\n\n".join(kept)
+    return deduped
+
+
+class PayloadSavings:
+    """Thread-safe tally, per agent, of payload tokens before and after minimizing."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0])
+
+    def record(self, agent: str, before: int, after: int) -> None:
+        with self._lock:
+            totals = self._totals[agent]
+            totals[0] += 1
+            totals[1] += before
+            totals[2] += after
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Returns calls, tokens before/after and the share saved for every agent seen so far."""
+        with self._lock:
+            return {
+                agent: {
+                    "calls": calls,
+                    "tokens_before": before,
+                    "tokens_after": after,
+                    "tokens_saved": before - after,
+                    "saved_ratio": round((before - after) / before, 4) if before else 0.0,
+                }
+                for agent, (calls, before, after) in sorted(self._totals.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+payload_savings = PayloadSavings()
+
+
+def report(agent: str, llm: Any, before: str, after: str) -> int:
+    """
+    Records the tokens a minimized payload saved against the serialization it replaces.
+
+    ``before`` is what the agent used to send (pretty-printed JSON, ``str()``
+    of dicts, uncleaned prompts); ``after`` is what it sends now. Returns the
+    tokens saved.
+    """
+    before_tokens, after_tokens = count_tokens(llm, before), count_tokens(llm, after)
+    payload_savings.record(agent, before_tokens, after_tokens)
+    logger.info("%s payload: %d -> %d tokens (%d saved)", agent, before_tokens, after_tokens, before_tokens - after_tokens)
+    return before_tokens - after_tokens
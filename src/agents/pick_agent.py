@@ -1,13 +1,22 @@
 from langchain_core.prompts import PromptTemplate
-from typing import Any
+from typing import Any, Dict, List
+from pydantic import BaseModel, Field
+from .structured_output import bind_schema, invoke_structured
+from src.token_budget import cap_output
+
+class PickResult(BaseModel):
+    """The prompt types and framework picked for a user input."""
+    types: List[str] = Field(description="The selected prompt types, lowercase with underscores.")
+    framework: str = Field(description="The selected framework, lowercase with underscores.")
 
 class PickAgent:
     """Agent that intelligently selects prompt types and framework based on user input."""
 
     def __init__(self, llm: Any):
-        self.llm = llm
+        self.llm = cap_output(llm, "PickAgent")
+        self.structured_llm = bind_schema(self.llm, PickResult)
 
-    def pick(self, user_input: str) -> str:
+    def pick(self, user_input: str) -> Dict[str, Any]:
         """Selects the most suitable prompt types and framework based on user input."""
         pick_template = PromptTemplate(
             input_variables=["user_input"],
@@ -43,5 +52,8 @@ User Input: {user_input}
 """
         )
 
-        chain = pick_template | self.llm
-        return chain.invoke({"user_input": user_input}).content
+        chain = pick_template | self.structured_llm
+        result = invoke_structured("PickAgent", chain, {"user_input": user_input})
+        if result is None:
+            raise ValueError("No valid JSON object found in the LLM's response.")
+        return result.dict()
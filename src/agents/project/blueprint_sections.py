@@ -0,0 +1,178 @@
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+from pydantic import BaseModel, Field
+
+# Scope-dependent top-level sections of the project blueprint, in output order,
+# with the guidance each section generator gets.
+SECTION_GUIDES: Dict[str, str] = {
+    "techStack": "The technology stack from the architecture proposal, as an object keyed by layer (for example `frontend`, `backend`, `database`).",
+    "features": "A list of key features, each with a `name` and a short `description`.",
+    "uiComponents": "A list of UI components from the plan, each with a `name` and its `purpose`.",
+    "apiEndpoints": "A list of API endpoints, each with `method`, `path` and `description`.",
+    "databaseSchema": "The database schema: the tables or collections with their fields and relations.",
+    "uiDesign": "An object with `colorPalette`, `typography` and `aesthetic` details from the architecture proposal.",
+}
+SECTIONS = tuple(SECTION_GUIDES)
+CORE_KEYS = ("appName", "description", "userRoles")
+# appName, description and userRoles are regenerated together as one section.
+CORE_SECTION = "core"
+
+# Phrases that tie a QA issue to a section, checked after the exact key names.
+SECTION_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    CORE_SECTION: ("app name", "application name", "app description", "application description", "user role"),
+    "techStack": ("tech stack", "technology stack", "technologies", "library", "libraries"),
+    "features": ("feature",),
+    "uiComponents": ("ui component", "component"),
+    "apiEndpoints": ("api endpoint", "endpoint", "route", "http method", "rest"),
+    "databaseSchema": ("database", "table", "collection", "relation", "foreign key", "primary key"),
+    "uiDesign": ("ui design", "design", "color", "colour", "palette", "typography", "font", "aesthetic"),
+}
+
+# Path segments that name an action or utility rather than a stored entity.
+_NON_ENTITY_SEGMENTS = {
+    "api", "auth", "login", "logout", "register", "signup", "signin", "token", "refresh", "me",
+    "health", "status", "search", "upload", "uploads", "webhook", "webhooks", "stats", "dashboard",
+}
+_SCHEMA_CONTAINER_KEYS = ("tables", "collections", "entities", "models")
+_ENTITY_NAME_KEYS = ("name", "table", "tableName", "collection", "entity", "model")
+_BACKEND_LAYER = re.compile(r"backend|server|api|runtime", re.IGNORECASE)
+
+
+class BlueprintCore(BaseModel):
+    """The always-present blueprint fields plus the sections the user's scope calls for."""
+    appName: str = Field(..., description="A suitable name for the application.")
+    description: str = Field(..., description="A detailed description of the application's purpose and functionality.")
+    userRoles: List[Any] = Field(..., description="The user roles with brief descriptions.")
+    sections: List[str] = Field(..., description="The top-level sections this blueprint should contain.")
+
+
+class BlueprintSection(BaseModel):
+    """One generated top-level section; ``content`` is null when the scope excludes it."""
+    content: Any = Field(..., description="The value of the section, or null if it does not apply.")
+
+
+def _normalize(name: str) -> str:
+    name = re.sub(r"[^a-z0-9]", "", name.lower())
+    if name.endswith("ies"):
+        return name[:-3] + "y"
+    if name.endswith("s") and not name.endswith("ss"):
+        return name[:-1]
+    return name
+
+
+def schema_entities(schema: Any) -> set:
+    """Normalized table/collection names found in a ``databaseSchema`` section."""
+    if isinstance(schema, dict):
+        for key in _SCHEMA_CONTAINER_KEYS:
+            if key in schema:
+                return schema_entities(schema[key])
+        return {_normalize(key) for key in schema}
+    if isinstance(schema, list):
+        names = set()
+        for item in schema:
+            if isinstance(item, dict):
+                name = next((item[key] for key in _ENTITY_NAME_KEYS if isinstance(item.get(key), str)), None)
+                if name:
+                    names.add(_normalize(name))
+            elif isinstance(item, str):
+                names.add(_normalize(item))
+        return names
+    return set()
+
+
+def endpoint_resources(endpoints: Any) -> set:
+    """Normalized resource names (the first entity-like path segment) of ``apiEndpoints``."""
+    resources = set()
+    if not isinstance(endpoints, list):
+        return resources
+    for endpoint in endpoints:
+        path = (endpoint.get("path") or endpoint.get("endpoint")) if isinstance(endpoint, dict) else endpoint
+        if not isinstance(path, str):
+            continue
+        for segment in path.split("?")[0].strip("/").split("/"):
+            if not segment or segment.startswith(("{", ":", "<")) or re.fullmatch(r"v\d+", segment):
+                continue
+            if segment.lower() in _NON_ENTITY_SEGMENTS:
+                continue
+            resources.add(_normalize(segment))
+            break
+    return resources
+
+
+def cross_reference_issues(blueprint: Dict[str, Any]) -> List[str]:
+    """
+    Finds places where independently generated sections disagree with each other.
+
+    Only checks that can be decided locally are made: API resources that have no
+    table in the database schema, and API endpoints without a backend layer in
+    the tech stack.
+    """
+    issues = []
+    endpoints = blueprint.get("apiEndpoints")
+    schema = blueprint.get("databaseSchema")
+    if endpoints and schema:
+        entities = schema_entities(schema)
+        if entities:
+            missing = sorted(
+                resource for resource in endpoint_resources(endpoints)
+                if not any(resource in entity or entity in resource for entity in entities)
+            )
+            if missing:
+                issues.append(
+                    f"apiEndpoints reference resources with no table in databaseSchema: {', '.join(missing)}."
+                )
+    tech_stack = blueprint.get("techStack")
+    if endpoints and isinstance(tech_stack, dict) and tech_stack and not any(_BACKEND_LAYER.search(key) for key in tech_stack):
+        issues.append("apiEndpoints are defined but techStack names no backend layer.")
+    return issues
+
+
+def sections_for_issue(issue: str) -> List[str]:
+    """Sections an evaluator issue is about; exact key names win over keywords."""
+    text = issue.lower()
+    # "description" is left out: sections have descriptions of their own.
+    exact = [name for name in ("appName", "userRoles", *SECTIONS) if name.lower() in text]
+    if exact:
+        return sorted({CORE_SECTION if name in CORE_KEYS else name for name in exact})
+    return [name for name, keywords in SECTION_KEYWORDS.items() if any(keyword in text for keyword in keywords)]
+
+
+def map_issues(issues: Iterable[str]) -> Tuple[Dict[str, List[str]], List[str]]:
+    """Groups issues by section; issues that name no section are returned separately."""
+    by_section: Dict[str, List[str]] = {}
+    unmapped = []
+    for issue in issues:
+        sections = sections_for_issue(issue)
+        if not sections:
+            unmapped.append(issue)
+        for name in sections:
+            by_section.setdefault(name, []).append(issue)
+    return by_section, unmapped
+
+
+def get_section(blueprint: Dict[str, Any], name: str) -> Any:
+    if name == CORE_SECTION:
+        return {key: blueprint[key] for key in CORE_KEYS if key in blueprint}
+    return blueprint.get(name)
+
+
+def set_section(blueprint: Dict[str, Any], name: str, value: Any) -> None:
+    if name == CORE_SECTION:
+        if isinstance(value, dict):
+            blueprint.update({key: value[key] for key in CORE_KEYS if key in value})
+    elif value in (None, "", [], {}):
+        blueprint.pop(name, None)
+    else:
+        blueprint[name] = value
+
+
+def blueprint_sections(blueprint: Dict[str, Any]) -> List[str]:
+    """The sections present in ``blueprint``, core first."""
+    return [CORE_SECTION] + [name for name in blueprint if name not in CORE_KEYS]
+
+
+def blueprint_subset(blueprint: Dict[str, Any], sections: Iterable[str]) -> Dict[str, Any]:
+    """The core plus ``sections``, in blueprint order, for scoped re-validation."""
+    wanted = set(sections)
+    return {key: value for key, value in blueprint.items() if key in CORE_KEYS or key in wanted}
@@ -0,0 +1,96 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+# Sections each scope must contain and must leave out, as JSONGeneratorAgent's prompt asks.
+SCOPE_RULES: Dict[str, Dict[str, tuple]] = {
+    "frontend": {"required": ("features", "uiComponents", "uiDesign"), "forbidden": ("apiEndpoints", "databaseSchema")},
+    "backend": {"required": ("apiEndpoints", "databaseSchema"), "forbidden": ("uiComponents", "uiDesign")},
+    "full-stack": {"required": ("techStack", "features", "apiEndpoints", "databaseSchema"), "forbidden": ()},
+}
+_FULL_STACK = re.compile(r"\bfull[\s-]?stack\b", re.IGNORECASE)
+_FRONTEND = re.compile(r"\b(front[\s-]?end|client[\s-]?side|landing page|ui only)\b", re.IGNORECASE)
+_BACKEND = re.compile(r"\b(back[\s-]?end|server[\s-]?side|rest api|graphql api|api only|microservices?)\b", re.IGNORECASE)
+
+
+class _Endpoint(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    method: str = Field(..., min_length=1)
+    path: str = Field(..., pattern=r"^/")
+
+
+class _UIDesign(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    colorPalette: Any
+    typography: Any
+    aesthetic: Any
+
+
+class _Blueprint(BaseModel):
+    """Structural rules for a generated blueprint; validated from JSON text in one pass."""
+    model_config = ConfigDict(extra="allow")
+    appName: str = Field(..., min_length=1)
+    description: str = Field(..., min_length=1)
+    userRoles: List[Any] = Field(..., min_length=1)
+    techStack: Optional[Any] = None
+    features: Optional[List[Any]] = Field(None, min_length=1)
+    uiComponents: Optional[List[Any]] = Field(None, min_length=1)
+    apiEndpoints: Optional[List[_Endpoint]] = Field(None, min_length=1)
+    databaseSchema: Optional[Any] = None
+    uiDesign: Optional[_UIDesign] = None
+
+    @field_validator("techStack", "databaseSchema")
+    @classmethod
+    def _non_empty_collection(cls, value: Any) -> Any:
+        if value is not None and not (isinstance(value, (dict, list)) and value):
+            raise ValueError("must be a non-empty object or array")
+        return value
+
+
+def detect_scope(user_input: str) -> Optional[str]:
+    """Scope named in the user's goal: "frontend", "backend", "full-stack", or None if it is not explicit."""
+    if _FULL_STACK.search(user_input):
+        return "full-stack"
+    frontend, backend = bool(_FRONTEND.search(user_input)), bool(_BACKEND.search(user_input))
+    if frontend and backend:
+        return "full-stack"
+    if frontend:
+        return "frontend"
+    if backend:
+        return "backend"
+    return None
+
+
+def _describe(error: Dict[str, Any]) -> str:
+    location = ".".join(str(part) for part in error["loc"])
+    if error["type"] == "json_invalid":
+        return f"The blueprint is not valid JSON: {error['msg'].removeprefix('Invalid JSON: ')}."
+    if error["type"] == "model_type" and not location:
+        return "The blueprint must be a JSON object."
+    if error["type"] == "missing":
+        return f"`{location}` is missing."
+    return f"`{location}`: {error['msg']}."
+
+
+def validate_blueprint(json_prompt: str, user_input: str = "") -> List[str]:
+    """
+    Checks a blueprint's structure without calling a model.
+
+    Returns human-readable issues naming the offending keys, so that
+    RefinementAgent can scope its fixes; an empty list means the blueprint is
+    structurally valid and ready for semantic review.
+    """
+    try:
+        blueprint = _Blueprint.model_validate_json(json_prompt or "")
+    except ValidationError as e:
+        return [_describe(error) for error in e.errors(include_url=False)]
+
+    scope = detect_scope(user_input)
+    if scope is None:
+        return []
+    present = {key for key, value in blueprint.model_dump(exclude_none=True).items()}
+    rules = SCOPE_RULES[scope]
+    issues = [f"`{name}` is missing; a {scope} blueprint needs it." for name in rules["required"] if name not in present]
+    issues += [f"`{name}` must be removed; it is irrelevant to a {scope} project." for name in rules["forbidden"] if name in present]
+    return issues
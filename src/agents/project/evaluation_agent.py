@@ -1,15 +1,28 @@
 from langchain_core.prompts import PromptTemplate
 from ..prompt_agent import PromptAgent
-from typing import Any, Dict
+from typing import Any, Dict, List, Literal
 import json
-import re
-from src.logger import logger
+from pydantic import BaseModel, Field
+from ..structured_output import bind_schema, ainvoke_structured
+from .blueprint_sections import blueprint_subset
+
+SCOPED_NOTE = """
+**Scope of This Review:** Only the following sections were just rewritten: {sections}. Every other section was already accepted and is not shown. Evaluate only these sections (with the core fields for context), and do not report sections that are not shown as missing.
+"""
+
+
+class BlueprintEvaluation(BaseModel):
+    """QA verdict for a generated project blueprint."""
+    status: Literal["success", "failure"]
+    issues: List[str] = Field(description="Specific, actionable issues to be fixed; empty on success.")
+
 
 class EvaluationAgent(PromptAgent):
     """Agent that evaluates the generated JSON prompt."""
 
     def __init__(self, llm: Any):
         super().__init__(llm)
+        self.structured_llm = bind_schema(self.llm, BlueprintEvaluation)
 
     async def refine(self, user_input: str, **kwargs) -> Dict:
         """
@@ -17,15 +30,24 @@ class EvaluationAgent(PromptAgent):
 
         Args:
             user_input: The user's initial prompt.
-            **kwargs: Expects 'json_prompt' to evaluate.
+            **kwargs: Expects 'json_prompt' to evaluate. An optional 'sections' list
+                limits the review to those sections of the blueprint.
 
         Returns:
             A JSON string with evaluation results.
         """
         json_prompt = kwargs.get("json_prompt", "")
+        sections = kwargs.get("sections")
+        scope_note = ""
+        if sections:
+            try:
+                json_prompt = json.dumps(blueprint_subset(json.loads(json_prompt), sections), indent=2)
+                scope_note = SCOPED_NOTE.format(sections=", ".join(sections))
+            except (json.JSONDecodeError, TypeError, AttributeError):
+                pass  # Not a JSON object; review all of it.
 
         template = PromptTemplate(
-            input_variables=["user_input", "json_prompt"],
+            input_variables=["user_input", "json_prompt", "scope_note"],
             template="""You are a meticulous and detail-oriented QA Engineer, UI/UX Analyst, and JSON Schema expert. Your primary role is to validate a generated JSON configuration against the original user request to ensure it is complete, correct, clear, and aligns with modern design and development principles.
 
 **User's Original Goal:** 
@@ -35,7 +57,7 @@ class EvaluationAgent(PromptAgent):
             ```json
             {json_prompt}
             ```
-
+{scope_note}
 **Evaluation Criteria:**
 1.  **Completeness:** Does the JSON object fully capture all the requirements, features, and entities described in the user's goal? Are there any missing keys or sections (e.g., `techStack`, `uiComponents`, `features`)?
 2.  **Correctness:** Is the JSON well-formed and syntactically valid? Are the data types appropriate for each value?
@@ -51,20 +73,12 @@ Example for failure: `{{"status": "failure", "issues": ["The 'authentication' fe
 
             Evaluation:"""
         )
-        chain = template | self.llm
-        response = await chain.ainvoke({
+        chain = template | self.structured_llm
+        evaluation = await ainvoke_structured("EvaluationAgent", chain, {
             "user_input": user_input,
-            "json_prompt": json_prompt
+            "json_prompt": json_prompt,
+            "scope_note": scope_note,
         })
-
-        # Basic parsing and fallback
-        try:
-            json_str = response.content
-            match = re.search(r"```json\n(.*?)\n```", json_str, re.DOTALL)
-            if match:
-                json_str = match.group(1)
-
-            return json.loads(json_str)
-        except (json.JSONDecodeError, Exception) as e:
-            logger.error(f"Failed to parse evaluation response: {e}")
-            return {"status": "failure", "issues": ["Failed to parse evaluation output."]}
\ No newline at end of file
+        if evaluation is None:
+            return {"status": "failure", "issues": ["Failed to parse evaluation output."]}
+        return evaluation.dict()
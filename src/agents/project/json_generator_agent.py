@@ -1,28 +1,172 @@
 from langchain_core.prompts import PromptTemplate
 from ..prompt_agent import PromptAgent
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+import asyncio
 import json
-import re
+import time
+from src.config import PROJECT_JSON_MODE
+from src.logger import logger
+from src.models.project_schema import ProjectBlueprint
+from ..structured_output import bind_schema, ainvoke_structured
+from .blueprint_validation import SCOPE_RULES, detect_scope
+from .blueprint_sections import (
+    SECTION_GUIDES,
+    SECTIONS,
+    BlueprintCore,
+    BlueprintSection,
+    cross_reference_issues,
+)
+
+SOURCE_CONTEXT = """**Source Information:**
+1. **User's Goal / Scope:** {user_input}
+2. **Brainstormed Ideas:**
+{ideas}
+3. **Structural Plan:**
+{plan}
+4. **Proposed Architecture (including Tech Stack and Design):**
+{architecture}
+"""
+
+CORE_TEMPLATE = """You are a Senior Software Engineer and Prompt Engineering specialist. Several engineers are writing the sections of a project blueprint in parallel from the same source information; you write its core and decide its scope.
+
+""" + SOURCE_CONTEXT + """
+**Your Task:**
+Return a JSON object with exactly these keys:
+- `appName`: A suitable name for the application.
+- `description`: A detailed description of the application's purpose and functionality.
+- `userRoles`: An array of strings listing the user roles with brief descriptions.
+- `sections`: The sections the blueprint must contain for the **scope specified in the user's goal**, chosen from: """ + ", ".join(SECTIONS) + """.
+  - **frontend** only: features, uiComponents, uiDesign, techStack.
+  - **backend** only: apiEndpoints, databaseSchema, techStack.
+  - **full-stack**: all relevant sections.
+
+**CRITICAL INSTRUCTION:** Your output must be ONLY the raw JSON object. Do not include any explanations or text outside of the JSON."""
+
+SECTION_TEMPLATE = """You are a Senior Software Engineer and UI/UX specialist. Several engineers are writing the sections of a project blueprint in parallel from the same source information; you write exactly one section.
+
+""" + SOURCE_CONTEXT + """
+**Your Section:** `{section}`
+{guide}
+
+Keep names consistent with the source information, since the other sections are written from the same material. If the **scope specified in the user's goal** makes this section irrelevant (for example API endpoints for a frontend-only project), set `content` to null.
+
+**CRITICAL INSTRUCTION:** Your output must be ONLY a raw JSON object of the form {{"content": <the {section} value>}}. Do not include any explanations or text outside of the JSON."""
+
+RECONCILE_TEMPLATE = """You are a Senior Software Engineer reviewing a project blueprint whose sections were written independently. Some of them disagree with each other.
+
+**User's Goal / Scope:** {user_input}
+
+**Blueprint:**
+```json
+{json_prompt}
+```
+
+**Inconsistencies to Fix:**
+- {issues}
+
+**Your Task:**
+Return the complete blueprint with only these inconsistencies fixed. Keep every other key and value unchanged.
+
+**CRITICAL INSTRUCTION:** Your output must be ONLY the raw JSON object. Do not include any other text, explanations, or wrappers."""
 
 class JSONGeneratorAgent(PromptAgent):
     """Agent that generates a structured JSON prompt that adapts to the user’s requirements."""
 
-    def __init__(self, llm: Any):
+    def __init__(self, llm: Any, mode: Optional[str] = None):
         super().__init__(llm)
+        self.mode = mode or PROJECT_JSON_MODE
+        self.structured_llm = bind_schema(self.llm, ProjectBlueprint, free_form=True)
+        self.core_llm = bind_schema(self.llm, BlueprintCore, free_form=True)
+        self.section_llm = bind_schema(self.llm, BlueprintSection, free_form=True)
 
-    async def refine(self, user_input: str, **kwargs) -> Dict[str, str]:
+    async def refine(self, user_input: str, **kwargs) -> Dict[str, Any]:
         """
         Generates the final JSON prompt based on all gathered information.
         Args:
             user_input: The user's initial prompt.
             **kwargs: Expects 'ideas', 'plan', and 'architecture'.
         Returns:
-            A dictionary containing the structured JSON prompt under the 'json' key.
+            A dictionary containing the structured JSON prompt under the 'json' key
+            and generation timings under 'metrics'.
+        """
+        context = {
+            "user_input": user_input,
+            "ideas": kwargs.get("ideas", ""),
+            "plan": kwargs.get("plan", ""),
+            "architecture": kwargs.get("architecture", ""),
+        }
+        started = time.perf_counter()
+        if self.mode == "sectioned":
+            result = await self._refine_sectioned(context)
+        else:
+            result = await self._refine_single(context)
+        result["metrics"]["total_ms"] = _elapsed_ms(started)
+        return result
+
+    async def _refine_sectioned(self, context: Dict[str, str]) -> Dict[str, Any]:
         """
-        ideas = kwargs.get("ideas", "")
-        plan = kwargs.get("plan", "")
-        architecture = kwargs.get("architecture", "")
+        Generates the core and the sections concurrently, then merges them locally.
+
+        Sections that the scope named in the user's goal rules out are never
+        generated; when the goal names no scope, every section is generated
+        and the core's ``sections`` decides which are kept.
+        """
+        section_latency: Dict[str, float] = {}
+        scope = detect_scope(str(context["user_input"]))
+        skipped = SCOPE_RULES[scope]["forbidden"] if scope else ()
+        names = [name for name in SECTIONS if name not in skipped]
+
+        async def timed(name: str, chain: Any, inputs: Dict[str, str]):
+            started = time.perf_counter()
+            result = await ainvoke_structured(f"JSONGeneratorAgent.{name}", chain, inputs)
+            section_latency[name] = _elapsed_ms(started)
+            return result
+
+        core_chain = PromptTemplate.from_template(CORE_TEMPLATE) | self.core_llm
+        section_chain = PromptTemplate.from_template(SECTION_TEMPLATE) | self.section_llm
+        core, *sections = await asyncio.gather(
+            timed("core", core_chain, context),
+            *(
+                timed(name, section_chain, {**context, "section": name, "guide": SECTION_GUIDES[name]})
+                for name in names
+            ),
+        )
+        metrics = {"mode": "sectioned", "section_latency_ms": section_latency, "sections_skipped": list(skipped),
+                   "consistency_issues": [], "consistency_pass": False}
+        if core is None:
+            logger.warning("Blueprint core generation failed, falling back to single-call generation")
+            result = await self._refine_single(context)
+            result["metrics"]["section_latency_ms"] = section_latency
+            return result
 
+        # The core's scope decides which sections are kept.
+        blueprint = {"appName": core.appName, "description": core.description, "userRoles": core.userRoles}
+        for name, section in zip(names, sections):
+            if name in core.sections and section is not None and section.content not in (None, "", [], {}):
+                blueprint[name] = section.content
+
+        issues = cross_reference_issues(blueprint)
+        if issues:
+            metrics["consistency_issues"] = issues
+            metrics["consistency_pass"] = True
+            blueprint = await self._reconcile(context["user_input"], blueprint, issues, section_latency)
+        return {"json": json.dumps(blueprint, indent=2), "metrics": metrics}
+
+    async def _reconcile(self, user_input: str, blueprint: Dict[str, Any], issues, section_latency: Dict[str, float]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        chain = PromptTemplate.from_template(RECONCILE_TEMPLATE) | self.structured_llm
+        reconciled = await ainvoke_structured("JSONGeneratorAgent.consistency", chain, {
+            "user_input": user_input,
+            "json_prompt": json.dumps(blueprint, indent=2),
+            "issues": "\n- ".join(issues),
+        })
+        section_latency["consistency"] = _elapsed_ms(started)
+        # Sections the model left out are kept as generated.
+        return blueprint if reconciled is None else {**blueprint, **reconciled.dict()}
+
+    async def _refine_single(self, context: Dict[str, str]) -> Dict[str, Any]:
+        """Generates the whole blueprint in one call."""
+        started = time.perf_counter()
         template = PromptTemplate(
             input_variables=["user_input", "ideas", "plan", "architecture"],
             template="""You are a Senior Software Engineer and Prompt Engineering specialist with a keen eye for UI/UX and design. 
@@ -60,29 +204,17 @@ Generate a single, clean, and well-formed JSON object that encapsulates all of t
   - `uiDesign`: If the scope includes a frontend, add this key. It should be an object containing `colorPalette`, `typography`, and `aesthetic` details from the architecture proposal.
 
 **CRITICAL INSTRUCTION:** 
-Your output must be a JSON object with a single key "json". 
-The value of this key should be the complete, raw JSON object representing the project blueprint. 
-Do not include any explanations or text outside of the JSON.
-
-Example:
-```json
-{{"json": {{...the entire project blueprint, adapted to the user's goal...}} }}
-```"""
+Your output must be ONLY the complete, raw JSON object representing the project blueprint, adapted to the user's goal. 
+Do not include any explanations or text outside of the JSON."""
         )
 
-        chain = template | self.llm
-        response = await chain.ainvoke({
-            "user_input": user_input,
-            "ideas": ideas,
-            "plan": plan,
-            "architecture": architecture
-        })
+        chain = template | self.structured_llm
+        blueprint = await ainvoke_structured("JSONGeneratorAgent", chain, context)
+        metrics = {"mode": "single", "section_latency_ms": {"blueprint": _elapsed_ms(started)}}
+        if blueprint is None:
+            return {"json": "{}", "metrics": metrics}
+        return {"json": json.dumps(blueprint.dict(), indent=2), "metrics": metrics}
+
 
-        json_string = response.content
-        match = re.search(r"```json\n(.*?)\n```", json_string, re.DOTALL)
-        if match:
-            json_string = match.group(1)
-        try:
-            return {"json": json_string}
-        except (json.JSONDecodeError, AttributeError):
-            return {"json": json_string}
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
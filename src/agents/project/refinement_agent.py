@@ -1,10 +1,45 @@
 from langchain_core.prompts import PromptTemplate
 from ..prompt_agent import PromptAgent
 from typing import Any, Dict, List
+import asyncio
 import json
-import re
 from src.logger import logger
-from pydantic import BaseModel, Field
+from src.models.project_schema import ProjectBlueprint
+from ..structured_output import bind_schema, ainvoke_structured
+from .blueprint_sections import (
+    CORE_SECTION,
+    SECTION_GUIDES,
+    BlueprintSection,
+    blueprint_sections,
+    get_section,
+    map_issues,
+    set_section,
+)
+
+CORE_GUIDE = "An object with `appName`, `description` and `userRoles` (an array of strings listing the user roles with brief descriptions)."
+
+SECTION_REFINE_TEMPLATE = """You are a Senior Software Engineer and UI/UX specialist fixing one section of a project blueprint. The rest of the blueprint has already been accepted and will not change.
+
+**Original User Goal:** 
+{user_input}
+
+**Application:** {app_name} - {description}
+
+**Section:** `{section}`
+{guide}
+
+**Current Value:**
+```json
+{current}
+```
+
+**Issues to Fix in This Section:**
+- {issues}
+
+**Your Task:**
+Rewrite this section so that every listed issue is fixed. If the section is missing, write it from scratch; if an issue says it must be removed, set `content` to null. Do not touch anything outside this section.
+
+**CRITICAL INSTRUCTION:** Your output must be ONLY a raw JSON object of the form {{"content": <the new {section} value>}}. Do not include any other text, explanations, or wrappers."""
 
 
 class RefinementAgent(PromptAgent):
@@ -12,6 +47,8 @@ class RefinementAgent(PromptAgent):
 
     def __init__(self, llm: Any):
         super().__init__(llm)
+        self.structured_llm = bind_schema(self.llm, ProjectBlueprint, free_form=True)
+        self.section_llm = bind_schema(self.llm, BlueprintSection, free_form=True)
 
     async def refine(self, user_input: str, **kwargs) -> str:
         """
@@ -45,18 +82,71 @@ class RefinementAgent(PromptAgent):
 **Your Task:**
 Rewrite the entire JSON object, correcting all the listed issues. This may involve adding missing sections (like `uiDesign` or `techStack`), correcting values, or restructuring parts of the JSON to meet the requirements. The final output must be a single, complete, and valid JSON object.
 
-**CRITICAL INSTRUCTION:** Your output must be ONLY the raw JSON object, enclosed in ```json ... ```. Do not include any other text, explanations, or wrappers."""
+**CRITICAL INSTRUCTION:** Your output must be ONLY the raw JSON object. Do not include any other text, explanations, or wrappers."""
         )
-        chain = template | self.llm
-        response = await chain.ainvoke({
+        chain = template | self.structured_llm
+        blueprint = await ainvoke_structured("RefinementAgent", chain, {
             "user_input": user_input,
             "json_prompt": json_prompt,
             "issues": "\n- ".join(issues)
         })
+        if blueprint is None:
+            logger.warning("Refinement failed, returning the current JSON prompt unchanged")
+            return json_prompt
+        return json.dumps(blueprint.dict(), indent=2)
+
+    async def refine_sections(self, user_input: str, **kwargs) -> Dict[str, Any]:
+        """
+        Regenerates only the blueprint sections the issues point at.
+
+        Args:
+            user_input: The user's initial prompt.
+            **kwargs: Expects 'json_prompt' and 'issues'.
+
+        Returns:
+            A dictionary with the refined JSON prompt under 'json', the regenerated
+            sections under 'regenerated' and the sections kept unchanged under 'reused'.
+            Issues that cannot be tied to a section fall back to a full rewrite.
+        """
+        json_prompt = kwargs.get("json_prompt", "")
+        issues = kwargs.get("issues", [])
+        try:
+            blueprint = json.loads(json_prompt)
+        except (json.JSONDecodeError, TypeError):
+            blueprint = None
+        by_section, unmapped = map_issues(issues)
+
+        if not isinstance(blueprint, dict) or unmapped or not by_section:
+            if unmapped:
+                logger.info("Issues without a section, rewriting the whole blueprint: %s", unmapped)
+            refined = await self.refine(user_input, json_prompt=json_prompt, issues=issues)
+            try:
+                sections = blueprint_sections(json.loads(refined))
+            except (json.JSONDecodeError, TypeError, AttributeError):
+                sections = []
+            return {"json": refined, "regenerated": sections, "reused": []}
+
+        async def regenerate(name: str):
+            chain = PromptTemplate.from_template(SECTION_REFINE_TEMPLATE) | self.section_llm
+            return await ainvoke_structured(f"RefinementAgent.{name}", chain, {
+                "user_input": user_input,
+                "app_name": blueprint.get("appName", ""),
+                "description": blueprint.get("description", ""),
+                "section": name,
+                "guide": CORE_GUIDE if name == CORE_SECTION else SECTION_GUIDES.get(name, ""),
+                "current": json.dumps(get_section(blueprint, name), indent=2),
+                "issues": "\n- ".join(by_section[name]),
+            })
 
-        json_string = response.content
-        # Use regex to find the JSON block and extract it
-        match = re.search(r"```json\n(.*?)\n```", json_string, re.DOTALL)
-        if match:
-            return match.group(1).strip()
-        return json_string.strip()
\ No newline at end of file
+        names = list(by_section)
+        results = await asyncio.gather(*(regenerate(name) for name in names))
+        regenerated = []
+        for name, result in zip(names, results):
+            if result is None:
+                logger.warning("Refinement of section '%s' failed, keeping it unchanged", name)
+                continue
+            set_section(blueprint, name, result.content)
+            regenerated.append(name)
+        reused = [name for name in blueprint_sections(blueprint) if name not in regenerated]
+        # Untouched sections serialize to exactly the same text as before.
+        return {"json": json.dumps(blueprint, indent=2), "regenerated": regenerated, "reused": reused}
@@ -0,0 +1,49 @@
+from typing import Any, Dict, List, Tuple
+from langchain_core.prompts import PromptTemplate
+from src.agents.prompt_agent import PromptAgent
+
+
+class TemplateAdaptAgent(PromptAgent):
+    """Adapts a finished library template to a closely related request in one call."""
+
+    def __init__(self, llm: Any):
+        super().__init__(llm)
+
+    def refine(self, user_input: str, **kwargs) -> str:
+        return user_input
+
+    def _prepare(self, template: str, source_intent: str, intent: str, variables: List[str]) -> Tuple[Any, Dict[str, str]]:
+        prompt = PromptTemplate(
+            input_variables=["template", "source_intent", "intent", "variables"],
+            template="""You are an Expert Editor. The template below was written and approved for a closely related request. Adapt it to the new request.
+
+Original Request: {source_intent}
+
+Template:
+{template}
+
+New Request: {intent}
+Required Variables: {variables}
+
+**Instructions:**
+- Change only what the new request needs; keep the structure, tone and quality of the template.
+- The template must use exactly the required variables as placeholders, in the same placeholder syntax it already uses.
+
+Return the ADAPTED TEMPLATE only.
+"""
+        )
+        chain = prompt | self.llm
+        return chain, {
+            "template": template,
+            "source_intent": source_intent,
+            "intent": intent,
+            "variables": ", ".join(variables)
+        }
+
+    def adapt(self, template: str, source_intent: str, intent: str, variables: List[str]) -> str:
+        chain, inputs = self._prepare(template, source_intent, intent, variables)
+        return chain.invoke(inputs).content
+
+    async def aadapt(self, template: str, source_intent: str, intent: str, variables: List[str]) -> str:
+        chain, inputs = self._prepare(template, source_intent, intent, variables)
+        return (await chain.ainvoke(inputs)).content
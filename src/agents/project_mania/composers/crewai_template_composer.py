@@ -1,6 +1,7 @@
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Tuple
 from langchain_core.prompts import PromptTemplate
 from src.agents.prompt_agent import PromptAgent
+from src.agents.payload import compact_json
 
 class CrewAITemplateComposer(PromptAgent):
     """Composer for CrewAI Configuration Templates."""
@@ -11,7 +12,7 @@ class CrewAITemplateComposer(PromptAgent):
     def refine(self, user_input: str, **kwargs) -> str:
         return user_input
 
-    def compose(self, intent: str, variables: List[str], router_plan: Dict[str, Any], prompt_length: str = "medium") -> str:
+    def _prepare(self, intent: str, variables: List[str], router_plan: Dict[str, Any], prompt_length: str) -> Tuple[Any, Dict[str, str]]:
         length_instruction = ""
         if prompt_length == "low":
             length_instruction = "Keep the configuration concise. Use minimal agents and tasks necessary."
@@ -45,9 +46,17 @@ Output the code/config only.
 """
         )
         chain = prompt | self.llm
-        return chain.invoke({
+        return chain, {
             "intent": intent,
             "variables": ", ".join([f"{{{v}}}" for v in variables]),
-            "plan": str(router_plan),
+            "plan": compact_json(router_plan),
             "length_instruction": length_instruction
-        }).content
+        }
+
+    def compose(self, intent: str, variables: List[str], router_plan: Dict[str, Any], prompt_length: str = "medium") -> str:
+        chain, inputs = self._prepare(intent, variables, router_plan, prompt_length)
+        return chain.invoke(inputs).content
+
+    async def acompose(self, intent: str, variables: List[str], router_plan: Dict[str, Any], prompt_length: str = "medium") -> str:
+        chain, inputs = self._prepare(intent, variables, router_plan, prompt_length)
+        return (await chain.ainvoke(inputs)).content
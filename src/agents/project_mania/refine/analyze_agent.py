@@ -1,19 +1,28 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 from langchain_core.prompts import PromptTemplate
+from pydantic import BaseModel, Field, conint
 from src.agents.prompt_agent import PromptAgent
-import json
-import re
+from src.agents.structured_output import bind_schema, invoke_structured, ainvoke_structured
+
+
+class TemplateAnalysis(BaseModel):
+    """QA findings for a draft template."""
+    critique: str = Field(description="Summary of issues found.")
+    suggestions: List[str] = Field(description="List of specific actionable improvements.")
+    score: conint(ge=0, le=100) = Field(description="Quality score from 0 to 100.")
+
 
 class AnalyzeAgent(PromptAgent):
     """Analyzes the draft template for improvements."""
 
     def __init__(self, llm: Any):
         super().__init__(llm)
+        self.structured_llm = bind_schema(self.llm, TemplateAnalysis)
 
     def refine(self, user_input: str, **kwargs) -> str:
         return user_input
 
-    def analyze(self, current_template: str, intent: str) -> Dict[str, Any]:
+    def _chain(self) -> Any:
         prompt = PromptTemplate(
             input_variables=["template", "intent"],
             template="""You are a QA Specialist for AI Prompts. Analyze the following prompt template against the user's intent.
@@ -31,13 +40,20 @@ Return a JSON object:
 }}
 """
         )
-        chain = prompt | self.llm
-        response = chain.invoke({"template": current_template, "intent": intent}).content
-        
-        try:
-            json_match = re.search(r'\{[\s\S]*\}', response)
-            if json_match:
-                return json.loads(json_match.group(0))
-            return json.loads(response)
-        except:
+        return prompt | self.structured_llm
+
+    @staticmethod
+    def _result(analysis: Optional[TemplateAnalysis]) -> Dict[str, Any]:
+        if analysis is None:
             return {"critique": "Analysis failed", "suggestions": [], "score": 50}
+        return analysis.dict()
+
+    def analyze(self, current_template: str, intent: str) -> Dict[str, Any]:
+        return self._result(invoke_structured(
+            "ProjectMania.AnalyzeAgent", self._chain(), {"template": current_template, "intent": intent}
+        ))
+
+    async def aanalyze(self, current_template: str, intent: str) -> Dict[str, Any]:
+        return self._result(await ainvoke_structured(
+            "ProjectMania.AnalyzeAgent", self._chain(), {"template": current_template, "intent": intent}
+        ))
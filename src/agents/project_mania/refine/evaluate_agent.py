@@ -1,19 +1,28 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from langchain_core.prompts import PromptTemplate
+from pydantic import BaseModel, Field
 from src.agents.prompt_agent import PromptAgent
-import json
-import re
+from src.agents.structured_output import bind_schema, invoke_structured, ainvoke_structured
+
+
+class TemplateVerdict(BaseModel):
+    """Final gatekeeper decision for a template."""
+    success: bool = Field(description="Whether the template is ready for the user.")
+    reason: str = Field(description="Why it passed or failed.")
+    final_polish_needed: Optional[str] = Field(None, description="Any minor tweaks needed.")
+
 
 class EvaluateAgent(PromptAgent):
     """Evaluates if the template is ready for production."""
 
     def __init__(self, llm: Any):
         super().__init__(llm)
+        self.structured_llm = bind_schema(self.llm, TemplateVerdict)
 
     def refine(self, user_input: str, **kwargs) -> str:
         return user_input
 
-    def evaluate(self, current_template: str, intent: str) -> Dict[str, Any]:
+    def _chain(self) -> Any:
         prompt = PromptTemplate(
             input_variables=["template", "intent"],
             template="""You are the Final Gatekeeper. Evaluate if this prompt template is ready for the user.
@@ -31,13 +40,20 @@ Return JSON:
 }}
 """
         )
-        chain = prompt | self.llm
-        response = chain.invoke({"template": current_template, "intent": intent}).content
-        
-        try:
-            json_match = re.search(r'\{[\s\S]*\}', response)
-            if json_match:
-                return json.loads(json_match.group(0))
-            return json.loads(response)
-        except:
+        return prompt | self.structured_llm
+
+    @staticmethod
+    def _result(verdict: Optional[TemplateVerdict]) -> Dict[str, Any]:
+        if verdict is None:
             return {"success": True, "reason": "Default pass due to parse error"}
+        return verdict.dict()
+
+    def evaluate(self, current_template: str, intent: str) -> Dict[str, Any]:
+        return self._result(invoke_structured(
+            "ProjectMania.EvaluateAgent", self._chain(), {"template": current_template, "intent": intent}
+        ))
+
+    async def aevaluate(self, current_template: str, intent: str) -> Dict[str, Any]:
+        return self._result(await ainvoke_structured(
+            "ProjectMania.EvaluateAgent", self._chain(), {"template": current_template, "intent": intent}
+        ))
@@ -1,4 +1,4 @@
-from typing import Any, List
+from typing import Any, Dict, List, Tuple
 from langchain_core.prompts import PromptTemplate
 from src.agents.prompt_agent import PromptAgent
 
@@ -11,7 +11,7 @@ class RefineAgent(PromptAgent):
     def refine(self, user_input: str, **kwargs) -> str:
         return user_input
 
-    def apply_changes(self, current_template: str, suggestions: List[str]) -> str:
+    def _prepare(self, current_template: str, suggestions: List[str]) -> Tuple[Any, Dict[str, str]]:
         prompt = PromptTemplate(
             input_variables=["template", "suggestions"],
             template="""You are an Expert Editor. Improve the following prompt template based on the provided suggestions.
@@ -31,7 +31,15 @@ Return the IMPROVED TEMPLATE only.
 """
         )
         chain = prompt | self.llm
-        return chain.invoke({
+        return chain, {
             "template": current_template,
             "suggestions": "\n- ".join(suggestions)
-        }).content
+        }
+
+    def apply_changes(self, current_template: str, suggestions: List[str]) -> str:
+        chain, inputs = self._prepare(current_template, suggestions)
+        return chain.invoke(inputs).content
+
+    async def aapply_changes(self, current_template: str, suggestions: List[str]) -> str:
+        chain, inputs = self._prepare(current_template, suggestions)
+        return (await chain.ainvoke(inputs)).content
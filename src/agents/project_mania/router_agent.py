@@ -1,8 +1,16 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from langchain_core.prompts import PromptTemplate
+from pydantic import BaseModel, Field
 from src.agents.prompt_agent import PromptAgent
-import json
-import re
+from src.agents.structured_output import bind_schema, invoke_structured, ainvoke_structured
+
+
+class RouterPlan(BaseModel):
+    """Structured plan handed from the router to the composer."""
+    enhanced_intent: str = Field(description="A more detailed and technical description of what the template should achieve.")
+    suggested_structure: List[str] = Field(description="List of sections that should be included in the template.")
+    tone: str = Field(description="The recommended tone for the template (e.g., Professional, Creative, Strict).")
+
 
 class RouterAgent(PromptAgent):
     """
@@ -11,6 +19,7 @@ class RouterAgent(PromptAgent):
     """
     def __init__(self, llm: Any):
         super().__init__(llm)
+        self.structured_llm = bind_schema(self.llm, RouterPlan)
 
     def refine(self, user_input: str, **kwargs) -> str:
         # This agent doesn't use the standard refine method in the same way, 
@@ -18,10 +27,7 @@ class RouterAgent(PromptAgent):
         # Ideally, it should be called with specific arguments.
         return user_input
 
-    def route(self, intent: str, template_type: str, variables: List[str]) -> Dict[str, Any]:
-        """
-        Analyzes the intent and prepares instructions for the composer.
-        """
+    def _chain(self) -> Any:
         prompt = PromptTemplate(
             input_variables=["intent", "template_type", "variables"],
             template="""You are an expert AI Architect. Your task is to analyze a user's request for a prompt template and prepare a structured plan for the composer agent.
@@ -41,23 +47,35 @@ Return a JSON object with the following structure:
 Ensure the output is valid JSON.
 """
         )
-        chain = prompt | self.llm
-        response = chain.invoke({
+        return prompt | self.structured_llm
+
+    def route(self, intent: str, template_type: str, variables: List[str]) -> Dict[str, Any]:
+        """
+        Analyzes the intent and prepares instructions for the composer.
+        """
+        plan = invoke_structured("RouterAgent", self._chain(), {
             "intent": intent, 
             "template_type": template_type, 
             "variables": ", ".join(variables)
-        }).content
-        
-        try:
-            # Extract JSON if wrapped in code blocks
-            json_match = re.search(r'\{[\s\S]*\}', response)
-            if json_match:
-                return json.loads(json_match.group(0))
-            return json.loads(response)
-        except Exception:
+        })
+        return self._result(plan, intent)
+
+    async def aroute(self, intent: str, template_type: str, variables: List[str]) -> Dict[str, Any]:
+        """Async variant of :meth:`route`."""
+        plan = await ainvoke_structured("RouterAgent", self._chain(), {
+            "intent": intent,
+            "template_type": template_type,
+            "variables": ", ".join(variables)
+        })
+        return self._result(plan, intent)
+
+    @staticmethod
+    def _result(plan: Optional[RouterPlan], intent: str) -> Dict[str, Any]:
+        if plan is None:
             # Fallback if JSON parsing fails
             return {
                 "enhanced_intent": intent,
                 "suggested_structure": ["Standard Structure"],
                 "tone": "Professional"
             }
+        return plan.dict()
@@ -2,6 +2,8 @@ from langchain_core.prompts import PromptTemplate
 from ..prompt_agent import PromptAgent
 from typing import Dict, Optional, List, Any, Literal
 from pydantic import BaseModel, Field
+from ..structured_output import bind_schema, invoke_structured
+from ..payload import compact_json
 
 class EvaluationSummary(BaseModel):
     key_points: List[str] = Field(
@@ -22,7 +24,7 @@ class ProjectEvaluatorAgent(PromptAgent):
 
     def __init__(self, llm: Any):
         super().__init__(llm)
-        self.structured_llm = self.llm.with_structured_output(EvaluationResult)
+        self.structured_llm = bind_schema(self.llm, EvaluationResult)
 
     async def refine(self, user_input: str, **kwargs) -> str:
         raise NotImplementedError("ProjectEvaluatorAgent agent is designed for evaluation, not refinement.")
@@ -55,15 +57,12 @@ You MUST respond ONLY with a valid JSON object. If the status is "no", the `summ
 '''
         )
         chain = evaluation_template | self.structured_llm
-        try:
-            response = chain.invoke({
-                "original_user_prompt": original_user_prompt,
-                "updated_project_artifacts": str(updated_project_artifacts),
-                "suggestions": str(suggestions),
-            })
-            return response.dict()
-        except Exception as e:
-            logger.error(f"Structured output parsing failed in ProjectEvaluatorAgent: {e}", exc_info=True)
+        response = invoke_structured("ProjectEvaluatorAgent", chain, {
+            "original_user_prompt": original_user_prompt,
+            "updated_project_artifacts": compact_json(updated_project_artifacts),
+            "suggestions": compact_json(suggestions),
+        })
+        if response is None:
             return {
                 "status": "no",
                 "summary": {
@@ -73,3 +72,4 @@ You MUST respond ONLY with a valid JSON object. If the status is "no", the `summ
                     "guidance": "Re-run evaluation with stricter schema enforcement and narrower scope."
                 }
             }
+        return response.dict()
@@ -2,6 +2,7 @@ from langchain_core.prompts import PromptTemplate
 from ..prompt_agent import PromptAgent
 from typing import Optional, List, Any, Dict
 from pydantic import BaseModel, Field
+from ..structured_output import bind_schema, invoke_structured
 
 class ReviewSuggestions(BaseModel):
     """Structured output for prompt review suggestions."""
@@ -20,7 +21,7 @@ class ProjectFeedbackAnalyzerAgent(PromptAgent):
     """Agent that analyzes user feedback on project artifacts and generates structured suggestions."""
     def __init__(self, llm: Any):
         super().__init__(llm)
-        self.structured_llm = self.llm.with_structured_output(ReviewSuggestions)
+        self.structured_llm = bind_schema(self.llm, ReviewSuggestions)
 
     def analyze(
         self,
@@ -51,11 +52,14 @@ Your output must be a JSON object conforming to the required schema.
 '''
         )
         chain = analyzer_template | self.structured_llm
-        return chain.invoke({
+        suggestions = invoke_structured("ProjectFeedbackAnalyzerAgent", chain, {
             "original_user_prompt": original_user_prompt,
             "project_artifacts": str(project_artifacts),
             "user_feedback": user_feedback,
         })
+        if suggestions is None:
+            raise ValueError("ProjectFeedbackAnalyzerAgent could not produce structured review suggestions.")
+        return suggestions
 
     def refine(self, user_input: str, **kwargs) -> str:
         raise NotImplementedError("ProjectFeedbackAnalyzerAgent uses the 'analyze' method, not 'refine'.")
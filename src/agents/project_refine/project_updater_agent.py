@@ -1,14 +1,106 @@
 from langchain_core.prompts import PromptTemplate
 from ..prompt_agent import PromptAgent
-from typing import Dict, Any
+from typing import Dict, Any, List, Literal, Optional, Tuple
 from langchain_core.output_parsers import JsonOutputParser
+from pydantic import BaseModel, Field
+import copy
 import json
+import jsonpatch
+from jsonpointer import JsonPointerException
+from src.config import PROJECT_UPDATE_MODE, PROJECT_PATCH_MAX_RETRIES
+from src.logger import logger
+from ..structured_output import bind_schema, invoke_structured
+from src.token_budget import check_output, count_tokens
+from ..payload import compact_json, report
+
+
+class PatchOperation(BaseModel):
+    """A single RFC 6902 JSON Patch operation."""
+    op: Literal["add", "remove", "replace", "move", "copy", "test"]
+    path: str = Field(..., description="RFC 6901 JSON Pointer to the target location, e.g. /plan/features/2/name.")
+    value: Optional[Any] = Field(None, description="The value for add, replace and test operations.")
+    from_: Optional[str] = Field(None, alias="from", description="The source pointer for move and copy operations.")
+
+    class Config:
+        populate_by_name = True
+
+    def to_patch(self) -> Dict[str, Any]:
+        operation = {"op": self.op, "path": self.path}
+        if self.op in ("add", "replace", "test"):
+            operation["value"] = self.value
+        if self.op in ("move", "copy"):
+            operation["from"] = self.from_
+        return operation
+
+
+class ArtifactPatch(BaseModel):
+    """The edits that apply the adjustments to the project artifacts."""
+    operations: List[PatchOperation]
+
+
+PATCH_TEMPLATE = '''You are a project architect and planner.
+
+**Task:** Express the following 'Adjustments' to the 'Current Project Artifacts' as RFC 6902 JSON Patch operations. Do NOT rewrite the artifacts.
+
+**Inputs:**
+- Current Project Artifacts (JSON): {project_artifacts}
+- Adjustments: {review_suggestions}
+
+**Instructions:**
+1.  Change only what the 'Adjustments' require; everything else stays as it is.
+2.  Paths are RFC 6901 JSON Pointers into the artifacts above (e.g. `/plan/features/0/description`). Array items are addressed by index; use `-` to append.
+3.  Use `replace` for changed values, `add` for new keys or array items, `remove` for deletions, and `move`/`copy` (with `from`) to relocate content.
+4.  Never remove a top-level key.
+5.  Output ONLY a raw JSON object of the form {{"operations": [{{"op": "replace", "path": "/...", "value": ...}}]}}.
+'''
+
+RETRY_TEMPLATE = '''You are a project architect and planner fixing JSON Patch operations that could not be applied.
+
+**Current Project Artifacts (JSON, with the other operations already applied):** {project_artifacts}
+- Adjustments being applied: {review_suggestions}
+
+**Failed Operations and Errors:**
+{failures}
+
+**Instructions:**
+Return corrected RFC 6902 operations for these changes only, with paths that exist in the artifacts above (use `add` for keys that do not exist yet and `-` to append to arrays). Never remove a top-level key.
+Output ONLY a raw JSON object of the form {{"operations": [{{"op": "replace", "path": "/...", "value": ...}}]}}.
+'''
+
+
+def apply_operations(document: Dict, operations: List[Dict]) -> Tuple[Dict, List[Tuple[Dict, str]]]:
+    """
+    Applies patch operations one by one, skipping the ones that fail.
+
+    Returns the patched copy of ``document`` and ``(operation, error)`` pairs for
+    every operation that could not be applied or would drop a top-level key.
+    """
+    required = set(document)
+    current = copy.deepcopy(document)
+    failures = []
+    for operation in operations:
+        try:
+            candidate = jsonpatch.apply_patch(current, [operation])
+        except (jsonpatch.JsonPatchException, JsonPointerException, TypeError, KeyError) as e:
+            # Pointer errors quote the whole document; the type and the start are enough.
+            failures.append((operation, f"{type(e).__name__}: {str(e)[:200]}"))
+            continue
+        if not isinstance(candidate, dict) or not required <= set(candidate):
+            failures.append((operation, "removes a required top-level key"))
+            continue
+        current = candidate
+    return current, failures
+
 
 class ProjectUpdaterAgent(PromptAgent):
     """Agent that updates project artifacts based on structured suggestions."""
-    def __init__(self, llm: Any):
+    def __init__(self, llm: Any, mode: Optional[str] = None):
         super().__init__(llm)
+        self.mode = mode or PROJECT_UPDATE_MODE
         self.parser = JsonOutputParser()
+        self.patch_llm = bind_schema(self.llm, ArtifactPatch, free_form=True)
+        # Size and retry counts of the last update, for logging and benchmarks.
+        self.last_stats: Dict[str, Any] = {}
 
     def update(
         self,
@@ -17,7 +109,63 @@ class ProjectUpdaterAgent(PromptAgent):
     ) -> Dict: # Returns a dictionary
         """
         Updates project artifacts based on structured review suggestions.
+
+        In "patch" mode the model returns JSON Patch operations that are applied
+        locally; only operations that fail are sent back for correction. If no
+        patch can be obtained at all, the artifacts are rewritten in full.
         """
+        report("ProjectUpdaterAgent", self.llm, str(review_suggestions), compact_json(review_suggestions))
+        if self.mode == "patch":
+            updated = self._update_with_patch(project_artifacts, review_suggestions)
+            if updated is not None:
+                return updated
+            logger.warning("Patch update failed, falling back to a full rewrite")
+        return self._update_full(project_artifacts, review_suggestions)
+
+    def _update_with_patch(self, project_artifacts: str, review_suggestions: Dict) -> Optional[Dict]:
+        try:
+            document = json.loads(project_artifacts)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(document, dict):
+            return None
+
+        patch = invoke_structured("ProjectUpdaterAgent.patch", PromptTemplate.from_template(PATCH_TEMPLATE) | self.patch_llm, {
+            "project_artifacts": project_artifacts,
+            "review_suggestions": compact_json(review_suggestions),
+        })
+        if patch is None:
+            return None
+        operations = [operation.to_patch() for operation in patch.operations]
+        document, failures = apply_operations(document, operations)
+        stats = {"mode": "patch", "operations": len(operations), "retries": 0, "dropped": 0,
+                 "output_chars": len(json.dumps(operations))}
+
+        retry_chain = PromptTemplate.from_template(RETRY_TEMPLATE) | self.patch_llm
+        while failures and stats["retries"] < PROJECT_PATCH_MAX_RETRIES:
+            stats["retries"] += 1
+            logger.info("Retrying %d failed patch operations (attempt %d)", len(failures), stats["retries"])
+            retry = invoke_structured("ProjectUpdaterAgent.patch_retry", retry_chain, {
+                "project_artifacts": compact_json(document),
+                "review_suggestions": compact_json(review_suggestions),
+                "failures": "\n".join(f"- {json.dumps(operation)}: {error}" for operation, error in failures),
+            })
+            if retry is None:
+                break
+            operations = [operation.to_patch() for operation in retry.operations]
+            stats["output_chars"] += len(json.dumps(operations))
+            document, failures = apply_operations(document, operations)
+
+        if failures:
+            stats["dropped"] = len(failures)
+            logger.warning("Dropped %d patch operations that could not be applied: %s", len(failures), failures)
+        self.last_stats = stats
+        logger.info("Patch update stats: %s", stats)
+        return document
+
+    def _update_full(self, project_artifacts: str, review_suggestions: Dict) -> Dict:
+        # A full rewrite has to echo every artifact back; fail now rather than on a cut-off response.
+        check_output(self.llm, "ProjectUpdaterAgent", count_tokens(self.llm, project_artifacts))
         updater_template = PromptTemplate(
             template='''You are a project architect and planner.
 
@@ -40,8 +188,9 @@ class ProjectUpdaterAgent(PromptAgent):
         chain = updater_template | self.llm | self.parser
         response = chain.invoke({
             "project_artifacts": project_artifacts, # This is already a string from the pipeline
-            "review_suggestions": str(review_suggestions),
+            "review_suggestions": compact_json(review_suggestions),
         })
+        self.last_stats = {"mode": "full", "output_chars": len(json.dumps(response))}
         return response
 
     def refine(self, user_input: str, **kwargs) -> str:
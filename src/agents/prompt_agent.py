@@ -1,6 +1,14 @@
 from abc import ABC, abstractmethod
 from typing import Any
 
+from src.token_budget import cap_output
+
+# Static preamble shared by every style and framework agent. It comes first and is identical in every call, so provider
+# prefix caches (and src/prompt_cache.py) can reuse it; each agent appends its technique and the user input.
+REFINER_PREFIX = """You are an expert prompt engineer with 25+ years of experience. Transform the raw, improper user input given at the end of this message into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions.
+
+"""
+
 class PromptAgent(ABC):
     """Abstract base class for all prompt refinement agents."""
     
@@ -9,9 +17,10 @@ class PromptAgent(ABC):
         Initializes the agent with a language model.
 
         Args:
-            llm: The language model instance to be used by the agent.
+            llm: The language model instance to be used by the agent. Its output is
+                capped at the agent's token budget, keyed by the class name.
         """
-        self.llm = llm
+        self.llm = cap_output(llm, type(self).__name__)
 
     @abstractmethod
     def refine(self, user_input: str, **kwargs) -> str:
@@ -2,6 +2,8 @@ from langchain_core.prompts import PromptTemplate
 from ..prompt_agent import PromptAgent
 from typing import Optional, List, Any
 from pydantic import BaseModel, Field
+from ..structured_output import bind_schema, invoke_structured
+from ..payload import compact_json
 
 class ReviewSuggestions(BaseModel):
     """Structured output for prompt review suggestions."""
@@ -20,7 +22,7 @@ class FeedbackAnalyzerAgent(PromptAgent):
     """Agent that analyzes feedback and generates structured suggestions."""
     def __init__(self, llm: Any):
         super().__init__(llm)
-        self.structured_llm = self.llm.with_structured_output(ReviewSuggestions)
+        self.structured_llm = bind_schema(self.llm, ReviewSuggestions)
 
     def analyze(
         self,
@@ -54,13 +56,16 @@ class FeedbackAnalyzerAgent(PromptAgent):
 Your output must be a JSON object.'''
         )
         chain = analyzer_template | self.structured_llm
-        return chain.invoke({
+        suggestions = invoke_structured("FeedbackAnalyzerAgent", chain, {
             "original_prompt": original_prompt,
             "final_prompt": final_prompt,
             "user_feedback": user_feedback,
-            "style": str(style) if style else "Not specified",
+            "style": compact_json(style) if style else "Not specified",
             "framework": framework if framework else "Not specified",
         })
+        if suggestions is None:
+            raise ValueError("FeedbackAnalyzerAgent could not produce structured review suggestions.")
+        return suggestions
 
     def refine(self, user_input: str, **kwargs) -> str:
         raise NotImplementedError("FeedbackAnalyzerAgent uses the 'analyze' method, not 'refine'.")
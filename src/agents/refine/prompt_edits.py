@@ -0,0 +1,161 @@
+import difflib
+import re
+from typing import List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+# Markdown headings, bold labels ("**Context:**") and short "Label:" lines open a section.
+_HEADING = re.compile(r"^(?:(#{1,6})\s+.+|\*\*[^*\n]{1,80}\*\*:?\s*|[A-Z][^\n.!?]{0,60}:)\s*$")
+# Bold and "Label:" headings rank below every markdown level and end each other's sections.
+_LABEL_LEVEL = 7
+
+
+class PromptEdit(BaseModel):
+    """One targeted edit, anchored on a heading or on text copied verbatim from the prompt."""
+    op: Literal["replace", "insert_after", "insert_before", "delete"]
+    target: Literal["section", "text"] = Field(
+        ..., description="'section' when the anchor is a heading and the edit covers its whole section; 'text' for a sentence or phrase."
+    )
+    anchor: str = Field(..., description="The heading line or the exact sentence from the current prompt.")
+    text: Optional[str] = Field(None, description="New text for replace and insert operations.")
+
+
+class PromptEdits(BaseModel):
+    """The edit script that applies the adjustments to the prompt."""
+    edits: List[PromptEdit]
+
+
+def _normalize_heading(line: str) -> str:
+    return re.sub(r"[#*:\s]+", " ", line).strip().lower()
+
+
+def _headings(prompt: str) -> List[Tuple[int, int, int, str]]:
+    """``(start, end_of_line, level, normalized)`` for every heading line."""
+    headings = []
+    offset = 0
+    for line in prompt.splitlines(keepends=True):
+        stripped = line.strip()
+        match = _HEADING.match(stripped) if stripped else None
+        if match:
+            level = len(match.group(1)) if match.group(1) else _LABEL_LEVEL
+            headings.append((offset, offset + len(line), level, _normalize_heading(stripped)))
+        offset += len(line)
+    return headings
+
+
+def _section_span(prompt: str, anchor: str) -> Tuple[int, int, int]:
+    """
+    ``(start, end_of_heading_line, end_of_section)`` for the section under ``anchor``.
+
+    A section runs to the next heading of the same or a higher level. An H1 is
+    usually the prompt's title with every other section below it, so its
+    section stops at the next heading of any level.
+    """
+    headings = _headings(prompt)
+    wanted = _normalize_heading(anchor)
+    matches = [index for index, heading in enumerate(headings) if heading[3] == wanted]
+    if not matches:
+        raise ValueError("heading not found")
+    if len(matches) > 1:
+        raise ValueError("heading is not unique")
+    start, line_end, level, _ = headings[matches[0]]
+    end = next((h[0] for h in headings[matches[0] + 1:] if h[2] <= level or level == 1), len(prompt))
+    return start, line_end, end
+
+
+def _text_span(prompt: str, anchor: str) -> Tuple[int, int]:
+    anchor = anchor.strip()
+    if not anchor:
+        raise ValueError("empty anchor")
+    count = prompt.count(anchor)
+    if count == 1:
+        start = prompt.index(anchor)
+        return start, start + len(anchor)
+    if count > 1:
+        raise ValueError("anchor text is not unique")
+    # Models often reflow whitespace when quoting; match on any whitespace run.
+    pattern = r"\s+".join(re.escape(word) for word in anchor.split())
+    matches = list(re.finditer(pattern, prompt))
+    if len(matches) != 1:
+        raise ValueError("anchor text not found" if not matches else "anchor text is not unique")
+    return matches[0].span()
+
+
+def _replacement(edit: PromptEdit, prompt: str, span: Tuple[int, int]) -> Tuple[int, int, str]:
+    """The ``(start, end, new_text)`` splice an edit makes."""
+    start, end = span
+    text = edit.text or ""
+    if edit.op == "delete":
+        if edit.target == "text":
+            # Do not leave a leading, doubled or dangling space where a sentence was removed.
+            while end < len(prompt) and prompt[end] in " \t" and (start == 0 or prompt[start - 1] in " \t\n"):
+                end += 1
+            while start > 0 and prompt[start - 1] in " \t" and (end == len(prompt) or prompt[end] in "\n.,;:!?)"):
+                start -= 1
+        return start, end, ""
+    if edit.op == "replace":
+        if edit.target == "section" and prompt[start:end].endswith("\n") and not text.endswith("\n"):
+            text += "\n\n"
+        return start, end, text
+    if edit.target == "section":
+        block = text.strip("\n")
+        if edit.op == "insert_before":
+            return start, start, block + "\n\n"
+        before = prompt[:end]
+        lead = "" if before.endswith("\n\n") else "\n" if before.endswith("\n") else "\n\n"
+        return end, end, lead + block + ("\n" if end == len(prompt) else "\n\n")
+    if edit.op == "insert_before":
+        return start, start, text if text.endswith((" ", "\n")) else text + " "
+    return end, end, text if text.startswith((" ", "\n")) else " " + text
+
+
+def apply_edits(prompt: str, edits: List[PromptEdit]) -> Tuple[str, List[Tuple[PromptEdit, str]]]:
+    """
+    Applies an edit script to ``prompt``.
+
+    Every edit is resolved against the original text first; edits whose anchor
+    is missing or ambiguous, or whose span overlaps an earlier edit, are
+    returned as conflicts and not applied. The rest are spliced in from the
+    end of the prompt backwards so offsets stay valid.
+    """
+    claimed: List[Tuple[int, int]] = []
+    splices: List[Tuple[int, int, str, bool]] = []
+    conflicts = []
+    for edit in edits:
+        if edit.op in ("replace", "insert_after", "insert_before") and edit.text is None:
+            conflicts.append((edit, f"'{edit.op}' needs text"))
+            continue
+        try:
+            if edit.target == "section":
+                start, line_end, end = _section_span(prompt, edit.anchor)
+                span = (start, end)
+                if edit.op in ("replace", "delete") and not prompt[:start].strip() and end == len(prompt):
+                    raise ValueError("section is the whole prompt; edit the sections or text inside it")
+                # Inserts only hold on to the heading, so edits inside the section stay possible.
+                claim = span if edit.op in ("replace", "delete") else (start, line_end)
+            else:
+                span = claim = _text_span(prompt, edit.anchor)
+        except ValueError as e:
+            conflicts.append((edit, str(e)))
+            continue
+        if any(claim[0] < other_end and other_start < claim[1] for other_start, other_end in claimed):
+            conflicts.append((edit, "overlaps another edit"))
+            continue
+        claimed.append(claim)
+        start, end, text = _replacement(edit, prompt, span)
+        splices.append((start, end, text, edit.op == "insert_before"))
+
+    # Splice from the end backwards. At a shared offset the wider splice goes first,
+    # and inserts before the next anchor go in ahead of inserts after the previous one.
+    updated = prompt
+    for start, end, text, _ in sorted(splices, key=lambda splice: (splice[0], splice[1], splice[3]), reverse=True):
+        updated = updated[:start] + text + updated[end:]
+    return updated, conflicts
+
+
+def prompt_diff(before: str, after: str, context: int = 1) -> str:
+    """Line-level unified diff between two prompt versions."""
+    return "".join(difflib.unified_diff(
+        before.splitlines(keepends=True), after.splitlines(keepends=True),
+        fromfile="previous", tofile="updated", n=context,
+    ))
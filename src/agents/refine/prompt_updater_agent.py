@@ -1,11 +1,53 @@
 from langchain_core.prompts import PromptTemplate
 from ..prompt_agent import PromptAgent
 from typing import Optional, Dict, List, Any
+from src.config import PROMPT_UPDATE_MODE, PROMPT_EDIT_MAX_RETRIES
+from src.logger import logger
+from ..structured_output import bind_schema, invoke_structured
+from ..payload import compact_json, report
+from .prompt_edits import PromptEdits, apply_edits
+
+EDITS_TEMPLATE = '''You are a prompt refining expert.
+
+**Task:** Express the following adjustments to the 'Current Prompt' as a short edit script. Do NOT rewrite the prompt.
+
+**Inputs:**
+- Style: {style}
+- Framework: {framework}
+- Current Prompt:
+{final_prompt}
+- Adjustments: {review_suggestions}
+
+**Instructions:**
+1.  Change only what the 'Adjustments' require; every other section stays exactly as it is.
+2.  Each edit has an `op` ("replace", "insert_after", "insert_before" or "delete"), a `target` and an `anchor`:
+    - `target: "section"`: `anchor` is a heading line copied from the prompt; the edit covers that heading and its body.
+    - `target: "text"`: `anchor` is a sentence or phrase copied verbatim from the prompt and occurring only once.
+3.  `text` is the new content for replace and insert edits (include the heading when replacing a section).
+4.  Do not give two edits the same or overlapping anchors.
+5.  Output ONLY a raw JSON object of the form {{"edits": [{{"op": "replace", "target": "text", "anchor": "...", "text": "..."}}]}}.'''
+
+RETRY_TEMPLATE = '''You are a prompt refining expert fixing edits that could not be applied to a prompt.
+
+**Current Prompt (with the other edits already applied):**
+{final_prompt}
+
+**Adjustments being applied:** {review_suggestions}
+
+**Edits that could not be applied, with the reason:**
+{conflicts}
+
+**Instructions:**
+Return corrected edits for these changes only. Anchors must be copied verbatim from the current prompt above and be unique; do not overlap them.
+Output ONLY a raw JSON object of the form {{"edits": [{{"op": "replace", "target": "text", "anchor": "...", "text": "..."}}]}}.'''
+
 
 class PromptUpdaterAgent(PromptAgent):
     """Agent that updates a prompt based on structured suggestions with strict constraints."""
-    def __init__(self, llm: Any):
+    def __init__(self, llm: Any, mode: Optional[str] = None):
         super().__init__(llm)
+        self.mode = mode or PROMPT_UPDATE_MODE
+        self.edits_llm = bind_schema(self.llm, PromptEdits, free_form=True)
 
     def update(
         self,
@@ -16,7 +58,71 @@ class PromptUpdaterAgent(PromptAgent):
     ) -> str:
         """
         Updates a prompt based on structured review suggestions.
+
+        In "edits" mode the model returns anchored edits that are applied locally;
+        edits that conflict are sent back for correction up to
+        PROMPT_EDIT_MAX_RETRIES times. If no edit can be applied, the prompt is
+        rewritten in full.
         """
+        report("PromptUpdaterAgent", self.llm, str(review_suggestions) + str(style),
+               compact_json(review_suggestions) + compact_json(style))
+        if self.mode == "edits":
+            updated = self._update_with_edits(final_prompt, review_suggestions, style, framework)
+            if updated is not None:
+                return updated
+            logger.warning("Edit-script update failed, falling back to a full rewrite")
+        return self._update_full(final_prompt, review_suggestions, style, framework)
+
+    def _update_with_edits(
+        self,
+        final_prompt: str,
+        review_suggestions: Dict,
+        style: Optional[List[str]],
+        framework: Optional[str],
+    ) -> Optional[str]:
+        script = invoke_structured("PromptUpdaterAgent.edits", PromptTemplate.from_template(EDITS_TEMPLATE) | self.edits_llm, {
+            "final_prompt": final_prompt,
+            "review_suggestions": compact_json(review_suggestions),
+            "style": compact_json(style) if style else "Not specified",
+            "framework": framework if framework else "Not specified",
+        })
+        if script is None or not script.edits:
+            return None
+        updated, conflicts = apply_edits(final_prompt, script.edits)
+        applied = len(script.edits) - len(conflicts)
+
+        retry_chain = PromptTemplate.from_template(RETRY_TEMPLATE) | self.edits_llm
+        retries = 0
+        while conflicts and retries < PROMPT_EDIT_MAX_RETRIES:
+            retries += 1
+            logger.info("Retrying %d conflicting prompt edits (attempt %d)", len(conflicts), retries)
+            retry = invoke_structured("PromptUpdaterAgent.edits_retry", retry_chain, {
+                "final_prompt": updated,
+                "review_suggestions": compact_json(review_suggestions),
+                "conflicts": "\n".join(
+                    f"- {edit.op} {edit.target} anchored on {edit.anchor!r}: {reason}" for edit, reason in conflicts
+                ),
+            })
+            if retry is None:
+                break
+            updated, conflicts = apply_edits(updated, retry.edits)
+            applied += len(retry.edits) - len(conflicts)
+
+        if conflicts:
+            logger.warning("Dropped %d prompt edits that could not be applied: %s",
+                           len(conflicts), [(edit.anchor, reason) for edit, reason in conflicts])
+        if not applied:
+            return None
+        logger.info("Applied %d prompt edits with %d retries", applied, retries)
+        return updated
+
+    def _update_full(
+        self,
+        final_prompt: str,
+        review_suggestions: Dict,
+        style: Optional[List[str]],
+        framework: Optional[str],
+    ) -> str:
         updater_template = PromptTemplate(
             input_variables=["final_prompt", "review_suggestions", "style", "framework"],
             template='''You are a prompt refining expert.
@@ -37,8 +143,8 @@ class PromptUpdaterAgent(PromptAgent):
         chain = updater_template | self.llm
         return chain.invoke({
             "final_prompt": final_prompt,
-            "review_suggestions": str(review_suggestions),
-            "style": str(style) if style else "Not specified",
+            "review_suggestions": compact_json(review_suggestions),
+            "style": compact_json(style) if style else "Not specified",
             "framework": framework if framework else "Not specified",
         }).content
 
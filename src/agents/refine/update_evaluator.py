@@ -1,8 +1,9 @@
 from langchain_core.prompts import PromptTemplate
 from ..prompt_agent import PromptAgent
 from typing import Dict, Optional, List, Literal, Any
-from src.logger import logger
 from pydantic import BaseModel, Field
+from ..structured_output import bind_schema, invoke_structured
+from ..payload import compact_json
 
 class EvaluationSummary(BaseModel):
     key_points: List[str] = Field(
@@ -23,7 +24,7 @@ class UpdateEvaluator(PromptAgent):
 
     def __init__(self, llm: Any):
         super().__init__(llm)
-        self.structured_llm = self.llm.with_structured_output(EvaluationResult)
+        self.structured_llm = bind_schema(self.llm, EvaluationResult)
 
     async def refine(self, user_input: str, **kwargs) -> str:
         raise NotImplementedError("UpdateEvaluator agent is designed for evaluation, not refinement.")
@@ -35,10 +36,16 @@ class UpdateEvaluator(PromptAgent):
         suggestions: Dict,
         style: Optional[List[str]],
         framework: Optional[str],
+        diff: Optional[str] = None,
     ) -> Dict:
-        """Evaluates whether the updated prompt has correctly applied improvements and meets expert-level quality."""
+        """
+        Evaluates whether the updated prompt has correctly applied improvements and meets expert-level quality.
+
+        ``diff`` is the unified diff of the last update; when given, the evaluator is
+        pointed at the changed lines instead of having to find them in the full text.
+        """
         evaluation_template = PromptTemplate(
-            input_variables=["user_prompt", "generated_prompt", "suggestions", "style", "framework"],
+            input_variables=["user_prompt", "generated_prompt", "suggestions", "style", "framework", "changes"],
             template='''You are a Prompt Evaluation Expert. Your task is to evaluate if the 'Updated Prompt' has correctly integrated the 'Improvement Suggestions'.
 
 - **Inputs:**
@@ -46,7 +53,7 @@ class UpdateEvaluator(PromptAgent):
 - Required Framework: {framework}
 - Improvement Suggestions: {suggestions}
 - Updated Prompt: {generated_prompt}
-
+{changes}
 **Instructions & Rules:**
 1.  **Verify Integration:** Has the 'Updated Prompt' fully applied the 'Improvement Suggestions'? If there is no suggestions means "No".
 2.  **Check Alignment:** Does the prompt align with the required 'Style' and 'Framework'?
@@ -77,17 +84,15 @@ You MUST respond ONLY with a valid JSON object. If the status is "no", the `summ
 ```'''
         )
         chain = evaluation_template | self.structured_llm
-        try:
-            response = chain.invoke({
-                "user_prompt": user_prompt,
-                "generated_prompt": generated_prompt,
-                "suggestions": str(suggestions),
-                "style": str(style) if style else "Not specified",
-                "framework": framework if framework else "Not specified",
-            })
-            return response.dict()
-        except Exception as e:
-            logger.error(f"Structured output parsing failed in UpdateEvaluator: {e}", exc_info=True)
+        response = invoke_structured("UpdateEvaluator", chain, {
+            "user_prompt": user_prompt,
+            "generated_prompt": generated_prompt,
+            "suggestions": compact_json(suggestions),
+            "style": compact_json(style) if style else "Not specified",
+            "framework": framework if framework else "Not specified",
+            "changes": f"- Changes Made in This Update (unified diff; check these lines first):\n{diff}\n" if diff else "",
+        })
+        if response is None:
             return {
                 "status": "no",
                 "summary": {
@@ -97,3 +102,4 @@ You MUST respond ONLY with a valid JSON object. If the status is "no", the `summ
                     "guidance": "Re-run evaluation with stricter schema enforcement and narrower scope."
                 }
             }
+        return response.dict()
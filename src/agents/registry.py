@@ -0,0 +1,113 @@
+import importlib
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Dict, Iterator
+
+from .prompt_agent import PromptAgent
+
+# Style and framework agents by the key used in PromptSchema, as "module:Class".
+# Modules are imported on first lookup so the app does not pay for all of them at startup.
+AGENT_SPECS: Dict[str, str] = {
+    "zero_shot": "src.agents.types.zero_shot:ZeroShot",
+    "one_shot": "src.agents.types.one_shot:OneShot",
+    "cot": "src.agents.types.chain_of_thought:ChainOfThought",
+    "tot": "src.agents.types.tree_of_thought:TreeOfThought",
+    "react": "src.agents.types.react:ReAct",
+    "in_context": "src.agents.types.in_context:InContext",
+    "emotion": "src.agents.types.emotion:Emotion",
+    "role": "src.agents.types.role:Role",
+    "few_shot": "src.agents.types.few_shot:FewShot",
+    "self_consistency": "src.agents.types.self_consistency:SelfConsistency",
+    "meta_prompting": "src.agents.types.meta_prompting:MetaPrompting",
+    "least_to_most": "src.agents.types.least_to_most:LeastToMost",
+    "multi_task": "src.agents.types.multi_task:MultiTask",
+    "task_decomposition": "src.agents.types.task_decomposition:TaskDecomposition",
+    "constrained": "src.agents.types.constrained:Constrained",
+    "generated_knowledge": "src.agents.types.generated_knowledge:GeneratedKnowledge",
+    "automatic_prompt_engineering": "src.agents.types.automatic_prompt_engineering:AutomaticPromptEngineering",
+    "directional_stimulus": "src.agents.types.directional_stimulus:DirectionalStimulus",
+    "chain_of_verification": "src.agents.types.chain_of_verification:ChainOfVerification",
+    "skeleton_of_thought": "src.agents.types.skeleton_of_thought:SkeletonOfThought",
+    "graph_of_thoughts": "src.agents.types.graph_of_thoughts:GraphOfThoughts",
+    "plan_and_solve": "src.agents.types.plan_and_solve:PlanAndSolve",
+    "maieutic_prompting": "src.agents.types.maieutic_prompting:MaieuticPrompting",
+    "reflexion_type": "src.agents.types.reflexion:Reflexion",
+    "chain_of_density": "src.agents.types.chain_of_density:ChainOfDensity",
+    "active_prompt": "src.agents.types.active_prompt:ActivePrompt",
+    "retrieval_augmented_prompting": "src.agents.types.retrieval_augmented_prompting:RetrievalAugmentedPrompting",
+    "multi_agent_debate": "src.agents.types.multi_agent_debate:MultiAgentDebate",
+    "persona_switching": "src.agents.types.persona_switching:PersonaSwitching",
+    "scaffolded_prompting": "src.agents.types.scaffolded_prompting:ScaffoldedPrompting",
+    "deliberation_prompting": "src.agents.types.deliberation_prompting:DeliberationPrompting",
+    "context_expansion": "src.agents.types.context_expansion:ContextExpansion",
+    "goal_oriented_prompting": "src.agents.types.goal_oriented_prompting:GoalOrientedPrompting",
+    "co_star": "src.agents.frameworks.co_star:CoStar",
+    "tcef": "src.agents.frameworks.tcef:Tcef",
+    "crispe": "src.agents.frameworks.crispe:Crispe",
+    "rtf": "src.agents.frameworks.rtf:Rtf",
+    "ice": "src.agents.frameworks.ice:Ice",
+    "craft": "src.agents.frameworks.craft:Craft",
+    "ape": "src.agents.frameworks.ape:Ape",
+    "pecra": "src.agents.frameworks.pecra:Pecra",
+    "oscar": "src.agents.frameworks.oscar:Oscar",
+    "rasce": "src.agents.frameworks.rasce:Rasce",
+    "reflection": "src.agents.frameworks.reflection:Reflection",
+    "flipped_interaction": "src.agents.frameworks.flipped_interaction:FlippedInteraction",
+    "bab": "src.agents.frameworks.bab:Bab",
+    "prompt": "src.agents.frameworks.prompt_framework:PromptFramework",
+    "soap": "src.agents.frameworks.soap:Soap",
+    "clear": "src.agents.frameworks.clear:Clear",
+    "prism": "src.agents.frameworks.prism:Prism",
+    "grips": "src.agents.frameworks.grips:Grips",
+    "app": "src.agents.frameworks.app_framework:AppFramework",
+    "scope": "src.agents.frameworks.scope:Scope",
+    "tool_oriented_prompting": "src.agents.frameworks.tool_oriented_prompting:ToolOrientedPrompting",
+    "neuro_symbolic_prompting": "src.agents.frameworks.neuro_symbolic_prompting:NeuroSymbolicPrompting",
+    "dynamic_context_windows": "src.agents.frameworks.dynamic_context_windows:DynamicContextWindows",
+    "meta_cognitive_prompting": "src.agents.frameworks.meta_cognitive_prompting:MetaCognitivePrompting",
+    "prompt_ensembles": "src.agents.frameworks.prompt_ensembles:PromptEnsembles",
+}
+
+
+@lru_cache(maxsize=None)
+def load_agent_class(name: str) -> type:
+    """Imports and returns the agent class registered under ``name``."""
+    module_name, class_name = AGENT_SPECS[name].split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class AgentRegistry(Mapping):
+    """
+    Read-only mapping of agent key to agent instance, built on first access.
+
+    With a ``fast_llm`` every agent is a :class:`~src.agents.cascade.CascadeAgent`
+    that tries ``fast_llm`` before ``llm``.
+    """
+
+    def __init__(self, llm: Any, fast_llm: Any = None):
+        self.llm = llm
+        self.fast_llm = fast_llm
+        self._agents: Dict[str, PromptAgent] = {}
+
+    def __getitem__(self, name: str) -> PromptAgent:
+        agent = self._agents.get(name)
+        if agent is None:
+            if name not in AGENT_SPECS:
+                raise KeyError(name)
+            agent_class = load_agent_class(name)
+            if self.fast_llm is None:
+                agent = agent_class(llm=self.llm)
+            else:
+                from .cascade import CascadeAgent
+                agent = CascadeAgent(name, agent_class(llm=self.fast_llm), agent_class(llm=self.llm))
+            self._agents[name] = agent
+        return agent
+
+    def __contains__(self, name: object) -> bool:
+        return name in AGENT_SPECS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(AGENT_SPECS)
+
+    def __len__(self) -> int:
+        return len(AGENT_SPECS)
@@ -5,9 +5,11 @@ from typing import Any, Dict
 from langchain_core.prompts import PromptTemplate
 from pydantic import BaseModel, Field
 
-from src.logger import logger
 from ..prompt_agent import PromptAgent
 from ..refine.update_evaluator import UpdateEvaluator
+from ..structured_output import bind_schema, ainvoke_structured
+from src.token_budget import fit_inputs
+from ..payload import clean_text, compact_json, dedupe_paragraphs, report
 
 
 class PromptOutput(BaseModel):
@@ -21,8 +23,8 @@ class FinalPrompt(PromptAgent):
     def __init__(self, llm: Any):
         super().__init__(llm)
         self.evaluator = UpdateEvaluator(llm)
-        # Wrap LLM with structured output for models that support it
-        self.structured_llm = llm.with_structured_output(PromptOutput)
+        # Provider-native structured output (JSON mode on Groq)
+        self.structured_llm = bind_schema(self.llm, PromptOutput)
 
     async def refine(self, user_input: str, **kwargs) -> Dict[str, str]:
         refined_responses = kwargs.get("refined_responses", {})
@@ -37,16 +39,24 @@ class FinalPrompt(PromptAgent):
         framework = kwargs.get("framework", "")
         style = kwargs.get("style")
         suggestions = kwargs.get("suggestions")
-        selected_model = kwargs.get("selected_model", "")
 
         framework_response = refined_responses.get(framework, "")
         if not framework_response:
             framework_response = next(iter(refined_responses.values()), "")
 
         # Sanitize inputs to remove any code fences
-        framework_response = re.sub(r'```[a-zA-Z]*\n?|```', '', framework_response)
-        type_prompts_str = json.dumps(type_prompts, indent=2)
-        type_prompts_str = re.sub(r'```[a-zA-Z]*\n?|```', '', type_prompts_str)
+        legacy_payload = re.sub(r'```[a-zA-Z]*\n?|```', '', framework_response + json.dumps(type_prompts, indent=2))
+        framework_response = clean_text(re.sub(r'```[a-zA-Z]*\n?|```', '', framework_response))
+        # The style snippets often repeat the framework response, which is sent whole as the foundation;
+        # repeated paragraphs are sent once and the snippets are condensed if they still do not fit.
+        type_prompts = dedupe_paragraphs(
+            {name: clean_text(re.sub(r'```[a-zA-Z]*\n?|```', '', prompt)) for name, prompt in type_prompts.items()},
+            reference={"Primary Framework Response": framework_response},
+        )
+        type_prompts = fit_inputs(self.llm, "FinalPrompt", framework_response + user_input + str(framework),
+                                  type_prompts, policy="summarize")
+        type_prompts_str = compact_json(type_prompts)
+        report("FinalPrompt", self.llm, legacy_payload, framework_response + type_prompts_str)
 
         # Base template content
         base_template = f'''
@@ -73,20 +83,9 @@ You are a world-class prompt engineer with 20+ years of experience. Your task is
 {{user_input}}
 '''
 
-        # Model-specific output instructions
-        if selected_model.lower() == "groq":
-            output_instructions = '''
+        output_instructions = '''
 **Output Format:**
 Respond ONLY with a valid JSON object.
-Do NOT include any Markdown code fences.
-Your JSON object must have exactly two keys:
-- "refined_prompt": string containing the complete final prompt
-- "explanation": string explaining the improvements
-'''
-        else:
-            output_instructions = '''
-**Output Format:**
-Respond ONLY with a valid JSON object enclosed in ```json```.
 Your JSON object must have exactly two keys:
 - "refined_prompt": string containing the complete final prompt
 - "explanation": string explaining the improvements
@@ -99,40 +98,18 @@ Your JSON object must have exactly two keys:
             template=final_template
         )
 
-        response: PromptOutput
-
-        if selected_model.lower() == "groq":
-            logger.info("Using Groq model (no JSON fences)...")
-            chain = integration_template | self.llm
-            response_content = await chain.ainvoke({
-                "framework_response": framework_response,
-                "type_prompts": type_prompts_str,
-                "user_input": user_input,
-                "framework": framework
-            })
-
-            raw_json_str = getattr(response_content, "content", str(response_content)).strip()
-            raw_json_str = re.sub(r'```json|```', '', raw_json_str).strip()
-
-            try:
-                response_data = json.loads(raw_json_str)
-                response = PromptOutput(**response_data)
-            except (json.JSONDecodeError, TypeError) as e:
-                logger.error(f"Failed to parse Groq JSON: {e}")
-                logger.error(f"Raw response: {raw_json_str}")
-                return {
-                    "refined_prompt": "Error: Could not parse model output.",
-                    "explanation": f"The Groq model returned malformed JSON. Raw output: {raw_json_str}"
-                }
-        else:
-            logger.info("Using structured output model...")
-            chain = integration_template | self.structured_llm
-            response = await chain.ainvoke({
-                "framework_response": framework_response,
-                "type_prompts": type_prompts_str,
-                "user_input": user_input,
-                "framework": framework
-            })
+        chain = integration_template | self.structured_llm
+        response = await ainvoke_structured("FinalPrompt", chain, {
+            "framework_response": framework_response,
+            "type_prompts": type_prompts_str,
+            "user_input": user_input,
+            "framework": framework
+        })
+        if response is None:
+            return {
+                "refined_prompt": "Error: Could not parse model output.",
+                "explanation": "The model returned output that did not match the expected schema."
+            }
 
         refined_prompt = response.refined_prompt.strip()
         explanation = response.explanation.strip()
@@ -2,19 +2,27 @@ from langchain_core.prompts import PromptTemplate
 from ..prompt_agent import PromptAgent
 from typing import Dict, List, Optional, Any
 import json
-import re
 from src.logger import logger
 from pydantic import BaseModel, Field
+from ..structured_output import bind_schema, ainvoke_structured
+from src.token_budget import fit_inputs
+from ..payload import clean_text, compact_json, dedupe_paragraphs, report
+
+class AgentPrompt(BaseModel):
+    """A refined prompt for a single agent."""
+    agent: str = Field(description="The agent name, exactly as given in the list of agents to refine.")
+    prompt: str = Field(description="The refined version of that agent's original prompt.")
 
 class RefinedAgentPrompts(BaseModel):
     """A model to hold the refined prompts for each agent."""
-    prompts: Dict[str, str] = Field(description="A dictionary where keys are agent names and values are the refined prompts.")
+    prompts: List[AgentPrompt] = Field(description="One entry per agent holding its refined prompt.")
 
 class RefineAgent(PromptAgent):
     """Agent for refining based on feedback."""
     
     def __init__(self, llm: Any):
         super().__init__(llm)
+        self.structured_llm = bind_schema(self.llm, RefinedAgentPrompts)
     
     async def refine(self, user_input: str, **kwargs) -> str:
         """Placeholder refine method to satisfy abstract base class requirement."""
@@ -32,7 +40,7 @@ class RefineAgent(PromptAgent):
 1.  Analyze the current prompts and the feedback provided.
 2.  For each agent, refine the existing prompt to address the feedback while maintaining its core structure and quality.
 3.  DO NOT oversimplify or dumb down the prompts. Preserve the expert-level quality.
-4.  Return a JSON object with a single key \"prompts\", which is a dictionary where keys are the agent names and values are the refined versions of the original prompts.
+4.  Return a JSON object with a single key \"prompts\", which is a list of objects, each holding an agent name under \"agent\" and the refined version of its original prompt under \"prompt\".
 
 **User Input:**
 {user_input}
@@ -47,38 +55,38 @@ class RefineAgent(PromptAgent):
 {agents}
 
 **Output Format:**
-You MUST respond with a JSON object enclosed in ```json ... ```. Ensure all strings are properly escaped. Example:
+You MUST respond ONLY with a valid JSON object. Ensure all strings are properly escaped. Example:
 ```json
 {{
-  "prompts": {{
-    "react": "[Refined version of the original react prompt]",
-    "one_shot": "[Refined version of the original one_shot prompt]"
-  }}
+  "prompts": [
+    {{"agent": "react", "prompt": "[Refined version of the original react prompt]"}},
+    {{"agent": "one_shot", "prompt": "[Refined version of the original one_shot prompt]"}}
+  ]
 }}
 ```
 """
         )
         
-        chain = refinement_template | self.llm
-        try:
-            response = await chain.ainvoke({
-                "user_input": user_input,
-                "current_prompts": json.dumps(current_prompts, indent=2),
-                "feedback": json.dumps(feedback, indent=2),
-                "agents": ', '.join(agents)
-            })
-            
-            json_str = response.content
-            match = re.search(r"```json\n(.*?)\n```", json_str, re.DOTALL)
-            if match:
-                json_str = match.group(1)
-
-            response_data = json.loads(json_str, strict=False)
-            validated_data = RefinedAgentPrompts(**response_data)
-            return validated_data.prompts
-            
-        except (json.JSONDecodeError, Exception) as e:
-            logger.error(f"Structured output parsing failed in RefineAgent: {e}", exc_info=True)
+        # Up to one prompt per style goes into this call: paragraphs they share are sent once, and
+        # long prompts are condensed to fit the context window.
+        prompts = dedupe_paragraphs({agent: clean_text(prompt) for agent, prompt in current_prompts.items()})
+        fitted = fit_inputs(
+            self.llm, "RefineAgent", refinement_template.template + user_input + ', '.join(agents),
+            {**prompts, "__feedback__": compact_json(feedback)}, policy="summarize",
+        )
+        feedback_str = fitted.pop("__feedback__")
+        prompts_str = compact_json(fitted)
+        report("RefineAgent", self.llm, json.dumps(current_prompts, indent=2) + json.dumps(feedback, indent=2),
+               prompts_str + feedback_str)
+        chain = refinement_template | self.structured_llm
+        result = await ainvoke_structured("RefineAgent", chain, {
+            "user_input": user_input,
+            "current_prompts": prompts_str,
+            "feedback": feedback_str,
+            "agents": ', '.join(agents)
+        })
+        if result is None:
             # Fallback: return the original prompts unchanged
             logger.warning("Refinement failed, returning original prompts as fallback")
             return {agent: current_prompts.get(agent, "") for agent in agents}
+        return {item.agent: item.prompt for item in result.prompts}
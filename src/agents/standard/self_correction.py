@@ -1,18 +1,20 @@
 from langchain_core.prompts import PromptTemplate
 from ..prompt_agent import PromptAgent
 from typing import List, Dict, Optional, Literal, Any
-import json
-import re
-from src.logger import logger
 from pydantic import BaseModel, Field, conint
+from ..structured_output import bind_schema, invoke_structured
 
 class AgentGuidance(BaseModel):
     key_points: List[str] = Field(description="List of issues found in the prompt.")
     guidance: str = Field(description="A single string of improvement suggestions.")
 
+class AgentScore(BaseModel):
+    agent: str = Field(description="Name of the agent being scored.")
+    score: conint(ge=0, le=100) = Field(description="Percentage score for the agent.")
+
 class SelfCorrectionResult(BaseModel):
     status: Literal["yes", "no"]
-    agents: Optional[Dict[str, conint(ge=0, le=100)]] = Field(None, description="Percentage score for each agent.")
+    agents: Optional[List[AgentScore]] = Field(None, description="Percentage score for each agent.")
     summary: Optional[AgentGuidance] = Field(None, description="Summary of issues if status is 'no'.")
 
 class SelfCorrection(PromptAgent):
@@ -20,6 +22,7 @@ class SelfCorrection(PromptAgent):
     
     def __init__(self, llm: Any):
         super().__init__(llm)
+        self.structured_llm = bind_schema(self.llm, SelfCorrectionResult)
     
     async def refine(self, user_input: str, **kwargs) -> str:
         """Placeholder refine method to satisfy abstract base class requirement."""
@@ -48,14 +51,14 @@ class SelfCorrection(PromptAgent):
 {agents}
 
 **Output Format:**
-You MUST respond with a JSON object enclosed in ```json ... ```. Ensure all strings are properly escaped. Example for a 'no' status:
+You MUST respond ONLY with a valid JSON object. Ensure all strings are properly escaped. Example for a 'no' status:
 ```json
 {{
   "status": "no",
-  "agents": {{
-    "one_shot": 80,
-    "tot": 75
-  }},
+  "agents": [
+    {{"agent": "one_shot", "score": 80}},
+    {{"agent": "tot", "score": 75}}
+  ],
   "summary": {{
     "key_points": ["The prompt is too complex for a beginner.", "It assumes prior knowledge of advanced topics."],
     "guidance": "Simplify the prompt to focus on foundational concepts. Remove jargon and start with a basic 'Hello, World!' example to make it more accessible for beginners."
@@ -64,19 +67,11 @@ You MUST respond with a JSON object enclosed in ```json ... ```. Ensure all stri
 ```
 """
         )
-        chain = evaluation_template | self.llm
-        try:
-            response = chain.invoke({"prompt": prompt, "user_prompt": user_prompt, "agents": ', '.join(agents)})
-            json_str = response.content
-            match = re.search(r"```json\n(.*?)\n```", json_str, re.DOTALL)
-            if match:
-                json_str = match.group(1)
-            
-            response_data = json.loads(json_str, strict=False)
-            validated_data = SelfCorrectionResult(**response_data)
-            return validated_data.dict()
-        except (json.JSONDecodeError, Exception) as e:
-            logger.error(f"Structured output parsing failed in SelfCorrection: {e}", exc_info=True)
+        chain = evaluation_template | self.structured_llm
+        result = invoke_structured(
+            "SelfCorrection", chain, {"prompt": prompt, "user_prompt": user_prompt, "agents": ', '.join(agents)}
+        )
+        if result is None:
             return {
                 "status": "no",
                 "agents": {agent: 50 for agent in agents},
@@ -85,3 +80,8 @@ You MUST respond with a JSON object enclosed in ```json ... ```. Ensure all stri
                     "guidance": "Simplify the prompt to focus on direct alignment with user intent."
                 }
             }
+        return {
+            "status": result.status,
+            "agents": {item.agent: item.score for item in result.agents or []},
+            "summary": result.summary.dict() if result.summary else None,
+        }
@@ -0,0 +1,108 @@
+import json
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional, Type
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import BaseModel, ValidationError
+
+from src.logger import logger
+
+
+class ParseFailureCounter:
+    """Thread-safe tally of structured-output calls and parse failures per agent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._failures: Dict[str, int] = defaultdict(int)
+
+    def record(self, agent: str, failed: bool) -> None:
+        with self._lock:
+            self._calls[agent] += 1
+            if failed:
+                self._failures[agent] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Returns calls, failures and failure rate for every agent seen so far."""
+        with self._lock:
+            return {
+                agent: {
+                    "calls": calls,
+                    "failures": self._failures[agent],
+                    "failure_rate": round(self._failures[agent] / calls, 4) if calls else 0.0,
+                }
+                for agent, calls in sorted(self._calls.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._failures.clear()
+
+
+parse_failures = ParseFailureCounter()
+
+
+def is_groq(llm: Any) -> bool:
+    return getattr(llm, "_llm_type", "") == "groq-chat"
+
+
+# Providers whose native JSON/structured output holds up for long, multi-item responses.
+STRUCTURED_LLM_TYPES = ("chat-google-generative-ai", "groq-chat", "mistralai-chat")
+
+
+def supports_structured_output(llm: Any) -> bool:
+    return getattr(llm, "_llm_type", "") in STRUCTURED_LLM_TYPES
+
+
+def json_mode(llm: Any) -> Any:
+    """Binds the provider's native JSON response mode, if it has one."""
+    llm_type = getattr(llm, "_llm_type", "")
+    if llm_type == "chat-google-generative-ai":
+        return llm.bind(generation_config={"response_mime_type": "application/json"})
+    if llm_type in ("groq-chat", "mistralai-chat"):
+        return llm.bind(response_format={"type": "json_object"})
+    return llm
+
+
+def bind_schema(llm: Any, schema: Type[BaseModel], free_form: bool = False) -> Any:
+    """
+    Returns a runnable that produces validated ``schema`` instances.
+
+    Tool-calling structured output is used where the provider handles it well.
+    Groq, and schemas with open-ended objects (``free_form``) that tool
+    declarations cannot express, go through provider JSON mode and are
+    validated locally against the same schema.
+    """
+    if free_form or is_groq(llm):
+        return json_mode(llm) | PydanticOutputParser(pydantic_object=schema)
+    return llm.with_structured_output(schema)
+
+
+# Errors that mean the model answered but its output did not fit the schema. Anything else (network,
+# auth, rate limits) is not a parse failure: it is re-raised and not counted.
+PARSE_ERRORS = (OutputParserException, ValidationError, json.JSONDecodeError)
+
+
+def invoke_structured(agent: str, chain: Any, inputs: Dict[str, Any]) -> Optional[BaseModel]:
+    """Invokes a structured chain, recording the outcome; returns None on a parse failure."""
+    try:
+        result = chain.invoke(inputs)
+    except PARSE_ERRORS as e:
+        logger.error("Structured output parsing failed in %s: %s", agent, e, exc_info=True)
+        result = None
+    parse_failures.record(agent, failed=result is None)
+    return result
+
+
+async def ainvoke_structured(agent: str, chain: Any, inputs: Dict[str, Any]) -> Optional[BaseModel]:
+    """Async variant of :func:`invoke_structured`."""
+    try:
+        result = await chain.ainvoke(inputs)
+    except PARSE_ERRORS as e:
+        logger.error("Structured output parsing failed in %s: %s", agent, e, exc_info=True)
+        result = None
+    parse_failures.record(agent, failed=result is None)
+    return result
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class AutomaticPromptEngineering(PromptAgent):
@@ -10,13 +10,10 @@ class AutomaticPromptEngineering(PromptAgent):
     
     def refine(self, user_input: str, optimization_goal: str = "clarity", **kwargs) -> str:
         """Refines the user input using Automatic Prompt Engineering prompting."""
-        ape_template = PromptTemplate(
-            input_variables=["user_input", "optimization_goal"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use automatic prompt engineering (APE): instruct the AI to iteratively evolve the prompt towards the optimization goal ({optimization_goal}), automating refinement for the best results.
+        ape_template = """Use automatic prompt engineering (APE): instruct the AI to iteratively evolve the prompt towards the optimization goal ({optimization_goal}), automating refinement for the best results.
 
 User Input: {user_input}"""
-        )
-        chain = ape_template | self.llm
+        chain = cached_chain("AutomaticPromptEngineering", self.llm, REFINER_PREFIX, ape_template)
         return chain.invoke({
             "user_input": user_input,
             "optimization_goal": optimization_goal
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Optional, Any
 
 class ChainOfThought(PromptAgent):
@@ -10,13 +10,10 @@ class ChainOfThought(PromptAgent):
     
     def refine(self, user_input: str, steps: Optional[int] = None, **kwargs) -> str:
         """Refines the user input using Chain of Thoughts prompting."""
-        cot_template = PromptTemplate(
-            input_variables=["user_input", "steps"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use chain-of-thought prompting: instruct the AI to think step by step, breaking down the task into {steps} logical steps for better reasoning and output quality. Ensure the steps are detailed and lead to a comprehensive response.
+        cot_template = """Use chain-of-thought prompting: instruct the AI to think step by step, breaking down the task into {steps} logical steps for better reasoning and output quality. Ensure the steps are detailed and lead to a comprehensive response.
 
 User Input: {user_input}"""
-        )
-        chain = cot_template | self.llm
+        chain = cached_chain("ChainOfThought", self.llm, REFINER_PREFIX, cot_template)
         return chain.invoke({
             "user_input": user_input,
             "steps": steps or 4
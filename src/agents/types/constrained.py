@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Optional, Any
 
 class Constrained(PromptAgent):
@@ -10,13 +10,10 @@ class Constrained(PromptAgent):
     
     def refine(self, user_input: str, max_words: Optional[int] = None, output_format: Optional[str] = None, **kwargs) -> str:
         """Refines the user input using Constrained prompting."""
-        constrained_template = PromptTemplate(
-            input_variables=["user_input", "max_words", "output_format"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use constrained prompting: enforce constraints like maximum {max_words} words and output format ({output_format}) to ensure structured, bounded responses.
+        constrained_template = """Use constrained prompting: enforce constraints like maximum {max_words} words and output format ({output_format}) to ensure structured, bounded responses.
 
 User Input: {user_input}"""
-        )
-        chain = constrained_template | self.llm
+        chain = cached_chain("Constrained", self.llm, REFINER_PREFIX, constrained_template)
         return chain.invoke({
             "user_input": user_input,
             "max_words": max_words or 100,
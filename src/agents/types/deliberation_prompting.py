@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class DeliberationPrompting(PromptAgent):
@@ -10,11 +10,8 @@ class DeliberationPrompting(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Deliberation Prompting."""
-        deliberation_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use Deliberation/Double-Pass Prompting: instruct the AI to first generate an initial, high-level "deliberation" or draft of its thought process. Then, in a second pass, it should use this deliberation as a guide to produce a more refined, detailed, and accurate final answer.
+        deliberation_template = """Use Deliberation/Double-Pass Prompting: instruct the AI to first generate an initial, high-level "deliberation" or draft of its thought process. Then, in a second pass, it should use this deliberation as a guide to produce a more refined, detailed, and accurate final answer.
 
 User Input: {user_input}"""
-        )
-        chain = deliberation_template | self.llm
+        chain = cached_chain("DeliberationPrompting", self.llm, REFINER_PREFIX, deliberation_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
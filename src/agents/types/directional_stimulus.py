@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Optional, Any
 
 class DirectionalStimulus(PromptAgent):
@@ -10,13 +10,10 @@ class DirectionalStimulus(PromptAgent):
     
     def refine(self, user_input: str, focus: Optional[str] = None, **kwargs) -> str:
         """Refines the user input using Directional Stimulus prompting."""
-        directional_stimulus_template = PromptTemplate(
-            input_variables=["user_input", "focus"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use directional stimulus prompting: guide the AI with directional cues to focus on a specific aspect ({focus}), ensuring targeted and relevant outputs.
+        directional_stimulus_template = """Use directional stimulus prompting: guide the AI with directional cues to focus on a specific aspect ({focus}), ensuring targeted and relevant outputs.
 
 User Input: {user_input}"""
-        )
-        chain = directional_stimulus_template | self.llm
+        chain = cached_chain("DirectionalStimulus", self.llm, REFINER_PREFIX, directional_stimulus_template)
         return chain.invoke({
             "user_input": user_input,
             "focus": focus or "practical applications"
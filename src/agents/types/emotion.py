@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class Emotion(PromptAgent):
@@ -10,13 +10,10 @@ class Emotion(PromptAgent):
     
     def refine(self, user_input: str, emotion: str = "excited", **kwargs) -> str:
         """Refines the user input using Emotion prompting."""
-        emotion_template = PromptTemplate(
-            input_variables=["user_input", "emotion"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use emotion prompting: infuse the prompt with the specified emotion ({emotion}) to elicit more engaging, empathetic, or motivated responses from the AI. Ensure the emotion enhances the prompt without compromising clarity.
+        emotion_template = """Use emotion prompting: infuse the prompt with the specified emotion ({emotion}) to elicit more engaging, empathetic, or motivated responses from the AI. Ensure the emotion enhances the prompt without compromising clarity.
 
 User Input: {user_input}"""
-        )
-        chain = emotion_template | self.llm
+        chain = cached_chain("Emotion", self.llm, REFINER_PREFIX, emotion_template)
         return chain.invoke({
             "user_input": user_input,
             "emotion": emotion
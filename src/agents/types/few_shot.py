@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import List, Optional, Any
 
 class FewShot(PromptAgent):
@@ -13,15 +13,12 @@ class FewShot(PromptAgent):
         examples = examples or [{"input": "Tell me about dogs.", "output": "Provide a detailed overview of dog breeds, including history, care tips, and common behaviors, structured in sections for readability."}]
         examples_str = "\n".join([f"Example Input: {ex['input']}\nExample Output: {ex['output']}" for ex in examples])
         
-        few_shot_template = PromptTemplate(
-            input_variables=["user_input", "examples_str"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use few-shot prompting: include the provided examples to demonstrate the desired style, format, and quality, helping the AI mimic high-quality outputs.
+        few_shot_template = """Use few-shot prompting: include the provided examples to demonstrate the desired style, format, and quality, helping the AI mimic high-quality outputs.
 
 {examples_str}
 
 User Input: {user_input}"""
-        )
-        chain = few_shot_template | self.llm
+        chain = cached_chain("FewShot", self.llm, REFINER_PREFIX, few_shot_template)
         return chain.invoke({
             "user_input": user_input,
             "examples_str": examples_str
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class GoalOrientedPrompting(PromptAgent):
@@ -10,11 +10,8 @@ class GoalOrientedPrompting(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Goal-Oriented Prompting."""
-        goal_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use Goal-Oriented Prompting: instruct the AI to frame its response around achieving a clearly stated goal. The prompt must include the primary objective, key success criteria, and any constraints, ensuring the AI's output is focused, measurable, and directly aligned with the desired outcome.
+        goal_template = """Use Goal-Oriented Prompting: instruct the AI to frame its response around achieving a clearly stated goal. The prompt must include the primary objective, key success criteria, and any constraints, ensuring the AI's output is focused, measurable, and directly aligned with the desired outcome.
 
 User Input: {user_input}"""
-        )
-        chain = goal_template | self.llm
+        chain = cached_chain("GoalOrientedPrompting", self.llm, REFINER_PREFIX, goal_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Optional, Any
 
 class InContext(PromptAgent):
@@ -10,15 +10,12 @@ class InContext(PromptAgent):
     
     def refine(self, user_input: str, context: Optional[str] = None, **kwargs) -> str:
         """Refines the user input using In-Context Learning prompting."""
-        in_context_template = PromptTemplate(
-            input_variables=["user_input", "context"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use in-context learning: incorporate the provided context to 'teach' the AI on-the-fly, ensuring the prompt builds on this background for better relevance and accuracy. If no context is provided, infer a suitable one based on the input.
+        in_context_template = """Use in-context learning: incorporate the provided context to 'teach' the AI on-the-fly, ensuring the prompt builds on this background for better relevance and accuracy. If no context is provided, infer a suitable one based on the input.
 
 Context: {context}
 
 User Input: {user_input}"""
-        )
-        chain = in_context_template | self.llm
+        chain = cached_chain("InContext", self.llm, REFINER_PREFIX, in_context_template)
         return chain.invoke({
             "user_input": user_input,
             "context": context or "Ensure responses are comprehensive and factually accurate."
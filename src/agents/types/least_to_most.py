@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import List, Optional, Any
 
 class LeastToMost(PromptAgent):
@@ -13,13 +13,10 @@ class LeastToMost(PromptAgent):
         sub_tasks = sub_tasks or ["Identify core intent", "Add basic details", "Enhance with advanced instructions"]
         sub_tasks_str = ", ".join(sub_tasks)
         
-        least_to_most_template = PromptTemplate(
-            input_variables=["user_input", "sub_tasks_str"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use least-to-most prompting: instruct the AI to break the task into sub-tasks ({sub_tasks_str}), solving from simplest to most complex for cumulative understanding.
+        least_to_most_template = """Use least-to-most prompting: instruct the AI to break the task into sub-tasks ({sub_tasks_str}), solving from simplest to most complex for cumulative understanding.
 
 User Input: {user_input}"""
-        )
-        chain = least_to_most_template | self.llm
+        chain = cached_chain("LeastToMost", self.llm, REFINER_PREFIX, least_to_most_template)
         return chain.invoke({
             "user_input": user_input,
             "sub_tasks_str": sub_tasks_str
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class MaieuticPrompting(PromptAgent):
@@ -10,11 +10,8 @@ class MaieuticPrompting(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Maieutic Prompting."""
-        maieutic_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use Maieutic (Socratic) Prompting: instruct the AI to ask clarifying questions to itself or the user to surface missing information and refine the problem space before providing a final, precise answer. This helps uncover hidden requirements.
+        maieutic_template = """Use Maieutic (Socratic) Prompting: instruct the AI to ask clarifying questions to itself or the user to surface missing information and refine the problem space before providing a final, precise answer. This helps uncover hidden requirements.
 
 User Input: {user_input}"""
-        )
-        chain = maieutic_template | self.llm
+        chain = cached_chain("MaieuticPrompting", self.llm, REFINER_PREFIX, maieutic_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class MetaPrompting(PromptAgent):
@@ -10,13 +10,10 @@ class MetaPrompting(PromptAgent):
     
     def refine(self, user_input: str, iterations: int = 2, **kwargs) -> str:
         """Refines the user input using Meta Prompting."""
-        meta_prompting_template = PromptTemplate(
-            input_variables=["user_input", "iterations"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use meta prompting: instruct the AI to generate and refine its own prompt over {iterations} iterations, creating a meta-layer for optimization.
+        meta_prompting_template = """Use meta prompting: instruct the AI to generate and refine its own prompt over {iterations} iterations, creating a meta-layer for optimization.
 
 User Input: {user_input}"""
-        )
-        chain = meta_prompting_template | self.llm
+        chain = cached_chain("MetaPrompting", self.llm, REFINER_PREFIX, meta_prompting_template)
         return chain.invoke({
             "user_input": user_input,
             "iterations": iterations
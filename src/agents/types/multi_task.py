@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import List, Optional, Any
 
 class MultiTask(PromptAgent):
@@ -13,13 +13,10 @@ class MultiTask(PromptAgent):
         tasks = tasks or ["Generate ideas", "Structure the response", "Provide examples"]
         tasks_str = ", ".join(tasks)
         
-        multi_task_template = PromptTemplate(
-            input_variables=["user_input", "tasks_str"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use multi-task prompting: instruct the AI to handle multiple related tasks ({tasks_str}) in one prompt, leveraging multitasking for efficiency and comprehensive outputs.
+        multi_task_template = """Use multi-task prompting: instruct the AI to handle multiple related tasks ({tasks_str}) in one prompt, leveraging multitasking for efficiency and comprehensive outputs.
 
 User Input: {user_input}"""
-        )
-        chain = multi_task_template | self.llm
+        chain = cached_chain("MultiTask", self.llm, REFINER_PREFIX, multi_task_template)
         return chain.invoke({
             "user_input": user_input,
             "tasks_str": tasks_str
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class PersonaSwitching(PromptAgent):
@@ -10,9 +10,6 @@ class PersonaSwitching(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Persona Switching prompting."""
-        persona_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use Persona Switching Prompting: instruct the AI to adopt and switch between multiple specified personas or roles within a single response. This allows it to capture different perspectives, tones, or areas of expertise to provide a multi-faceted and comprehensive answer.\n\nUser Input: {user_input}"""
-        )
-        chain = persona_template | self.llm
+        persona_template = """Use Persona Switching Prompting: instruct the AI to adopt and switch between multiple specified personas or roles within a single response. This allows it to capture different perspectives, tones, or areas of expertise to provide a multi-faceted and comprehensive answer.\n\nUser Input: {user_input}"""
+        chain = cached_chain("PersonaSwitching", self.llm, REFINER_PREFIX, persona_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class PlanAndSolve(PromptAgent):
@@ -10,11 +10,8 @@ class PlanAndSolve(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Plan-and-Solve prompting."""
-        ps_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use the Plan-and-Solve (PS) method: instruct the AI to first create a detailed, step-by-step plan to address the user's request, and then execute that plan to generate the final, coherent response. This two-phase approach ensures deliberate reasoning.
+        ps_template = """Use the Plan-and-Solve (PS) method: instruct the AI to first create a detailed, step-by-step plan to address the user's request, and then execute that plan to generate the final, coherent response. This two-phase approach ensures deliberate reasoning.
 
 User Input: {user_input}"""
-        )
-        chain = ps_template | self.llm
+        chain = cached_chain("PlanAndSolve", self.llm, REFINER_PREFIX, ps_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
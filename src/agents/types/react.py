@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class ReAct(PromptAgent):
@@ -10,13 +10,10 @@ class ReAct(PromptAgent):
     
     def refine(self, user_input: str, max_iterations: int = 3, **kwargs) -> str:
         """Refines the user input using ReAct prompting."""
-        react_template = PromptTemplate(
-            input_variables=["user_input", "max_iterations"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use ReAct prompting: instruct the AI to alternate between reasoning (think about the task) and acting (produce output), up to {max_iterations} iterations, to iteratively improve the response. Ensure the final output is polished and error-free.
+        react_template = """Use ReAct prompting: instruct the AI to alternate between reasoning (think about the task) and acting (produce output), up to {max_iterations} iterations, to iteratively improve the response. Ensure the final output is polished and error-free.
 
 User Input: {user_input}"""
-        )
-        chain = react_template | self.llm
+        chain = cached_chain("ReAct", self.llm, REFINER_PREFIX, react_template)
         return chain.invoke({
             "user_input": user_input,
             "max_iterations": max_iterations
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class Reflexion(PromptAgent):
@@ -10,11 +10,8 @@ class Reflexion(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Reflexion prompting."""
-        reflexion_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use the Reflexion/Self-Refine method: instruct the AI to generate an initial response, then critically reflect on its own answer to identify flaws, inconsistencies, or areas for improvement, and finally, use that self-critique to produce a revised, higher-quality final answer.
+        reflexion_template = """Use the Reflexion/Self-Refine method: instruct the AI to generate an initial response, then critically reflect on its own answer to identify flaws, inconsistencies, or areas for improvement, and finally, use that self-critique to produce a revised, higher-quality final answer.
 
 User Input: {user_input}"""
-        )
-        chain = reflexion_template | self.llm
+        chain = cached_chain("Reflexion", self.llm, REFINER_PREFIX, reflexion_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class RetrievalAugmentedPrompting(PromptAgent):
@@ -10,11 +10,8 @@ class RetrievalAugmentedPrompting(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Retrieval-Augmented Prompting."""
-        rap_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use Retrieval-Augmented Prompting (RAP): instruct the AI to first perform a retrieval step to gather fresh, relevant, or domain-specific information from an external knowledge source (e.g., a vector database or search engine). Then, it must use this retrieved context to generate a factually grounded and comprehensive answer, explicitly citing its sources.
+        rap_template = """Use Retrieval-Augmented Prompting (RAP): instruct the AI to first perform a retrieval step to gather fresh, relevant, or domain-specific information from an external knowledge source (e.g., a vector database or search engine). Then, it must use this retrieved context to generate a factually grounded and comprehensive answer, explicitly citing its sources.
 
 User Input: {user_input}"""
-        )
-        chain = rap_template | self.llm
+        chain = cached_chain("RetrievalAugmentedPrompting", self.llm, REFINER_PREFIX, rap_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class Role(PromptAgent):
@@ -10,13 +10,10 @@ class Role(PromptAgent):
     
     def refine(self, user_input: str, role_persona: str = "expert", **kwargs) -> str:
         """Refines the user input using Role prompting."""
-        role_template = PromptTemplate(
-            input_variables=["user_input", "role_persona"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use role prompting: assign the AI the persona of '{role_persona}' to specialize the response, enhancing relevance and expertise.
+        role_template = """Use role prompting: assign the AI the persona of '{role_persona}' to specialize the response, enhancing relevance and expertise.
 
 User Input: {user_input}"""
-        )
-        chain = role_template | self.llm
+        chain = cached_chain("Role", self.llm, REFINER_PREFIX, role_template)
         return chain.invoke({
             "user_input": user_input,
             "role_persona": role_persona
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class ScaffoldedPrompting(PromptAgent):
@@ -10,11 +10,8 @@ class ScaffoldedPrompting(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Scaffolded Prompting."""
-        scaffold_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use Scaffolded/Progressive Prompting: instruct the AI to break down a complex task into a series of small, incremental, and interconnected steps. Each step should build upon the last, providing a clear "scaffold" that guides the model to a reliable and complete solution, reducing cognitive load.
+        scaffold_template = """Use Scaffolded/Progressive Prompting: instruct the AI to break down a complex task into a series of small, incremental, and interconnected steps. Each step should build upon the last, providing a clear "scaffold" that guides the model to a reliable and complete solution, reducing cognitive load.
 
 User Input: {user_input}"""
-        )
-        chain = scaffold_template | self.llm
+        chain = cached_chain("ScaffoldedPrompting", self.llm, REFINER_PREFIX, scaffold_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
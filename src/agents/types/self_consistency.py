@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class SelfConsistency(PromptAgent):
@@ -10,13 +10,10 @@ class SelfConsistency(PromptAgent):
     
     def refine(self, user_input: str, samples: int = 3, **kwargs) -> str:
         """Refines the user input using Self-Consistency prompting."""
-        self_consistency_template = PromptTemplate(
-            input_variables=["user_input", "samples"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions. Use self-consistency prompting: instruct the AI to generate {samples} variations of the response and select the most consistent one to reduce hallucinations and improve reliability.
+        self_consistency_template = """Use self-consistency prompting: instruct the AI to generate {samples} variations of the response and select the most consistent one to reduce hallucinations and improve reliability.
 
 User Input: {user_input}"""
-        )
-        chain = self_consistency_template | self.llm
+        chain = cached_chain("SelfConsistency", self.llm, REFINER_PREFIX, self_consistency_template)
         return chain.invoke({
             "user_input": user_input,
             "samples": samples
@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class SkeletonOfThought(PromptAgent):
@@ -10,11 +10,8 @@ class SkeletonOfThought(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Skeleton-of-Thought prompting."""
-        sot_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following user input into a top-tier, expert-level prompt optimized for large language models. Use the Skeleton-of-Thought (SoT) method: instruct the AI to first generate a concise skeleton or outline of the answer, and then proceed to expand on each point of the skeleton in a structured and detailed manner. This forces planning before generation.
+        sot_template = """Use the Skeleton-of-Thought (SoT) method: instruct the AI to first generate a concise skeleton or outline of the answer, and then proceed to expand on each point of the skeleton in a structured and detailed manner. This forces planning before generation.
 
 User Input: {user_input}"""
-        )
-        chain = sot_template | self.llm
+        chain = cached_chain("SkeletonOfThought", self.llm, REFINER_PREFIX, sot_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
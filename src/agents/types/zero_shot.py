@@ -1,5 +1,5 @@
-from langchain_core.prompts import PromptTemplate
-from ..prompt_agent import PromptAgent
+from ..prompt_agent import PromptAgent, REFINER_PREFIX
+from src.prompt_cache import cached_chain
 from typing import Any
 
 class ZeroShot(PromptAgent):
@@ -10,11 +10,8 @@ class ZeroShot(PromptAgent):
     
     def refine(self, user_input: str, **kwargs) -> str:
         """Refines the user input using Zero-Shot prompting."""
-        zero_shot_template = PromptTemplate(
-            input_variables=["user_input"],
-            template="""You are an expert prompt engineer with 25+ years of experience. Transform the following raw, improper user input into a top-tier, expert-level prompt optimized for Gemini AI, OpenAI ChatGPT, or any large language model. The refined prompt should be clear, concise, specific, actionable, and structured with precise instructions for the AI to generate high-quality responses. Avoid ambiguity, include necessary details for context, and ensure it encourages detailed, accurate outputs. Do not add examples or additional reasoning paths—keep it zero-shot.
+        zero_shot_template = """Make it lead the AI to high-quality responses. Avoid ambiguity, include necessary details for context, and ensure it encourages detailed, accurate outputs. Do not add examples or additional reasoning paths—keep it zero-shot.
 
 User Input: {user_input}"""
-        )
-        chain = zero_shot_template | self.llm
+        chain = cached_chain("ZeroShot", self.llm, REFINER_PREFIX, zero_shot_template)
         return chain.invoke({"user_input": user_input}).content
\ No newline at end of file
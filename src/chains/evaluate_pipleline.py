@@ -1,25 +1,81 @@
 import asyncio
-from typing import Any
-from src.models.evaluateSchema import EvaluatePipelineInput, FullEvaluationResult
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
+from src.models.evaluateSchema import (
+    EvaluatePipelineInput, FullEvaluationResult, EvaluateBatchInput, BatchEvaluationItem, BatchRankingRow,
+)
 from src.agents.evaluate.llm_as_judge_agent import LLMAsJudgeAgent
 from src.agents.evaluate.t_rag_agent import TRAGAgent
 from src.agents.evaluate.mar_framework_agent import MARFrameworkAgent
 from src.agents.evaluate.final_evaluate_agent import FinalEvaluateAgent
-from src.logger import logger
+from src.agents.evaluate.fused_judge_agent import FusedJudgeAgent
+from src.agents.evaluate.score_aggregator import aggregate_scores
+from src.agents.evaluate.heuristic_scorer import heuristic_evaluation, heuristic_evaluations
+from src.agents.structured_output import supports_structured_output
+from src.config import (
+    EVALUATE_MODE, EVALUATE_NARRATIVE, EVALUATE_BATCH_CONCURRENCY, EVALUATE_BATCH_GROUP_SIZE, EVALUATE_BATCH_GROUP_CHARS,
+)
+from src.model_routing import ModelRouter
+from src.token_budget import check_input
+from src.logger import logger, log_payload
 
 class EvaluatePipeline:
     """A pipeline to evaluate a prompt using multiple frameworks concurrently."""
 
-    def __init__(self, llm: Any):
-        self.llm_as_judge_agent = LLMAsJudgeAgent(llm)
-        self.t_rag_agent = TRAGAgent(llm)
-        self.mar_framework_agent = MARFrameworkAgent(llm)
-        self.final_evaluate_agent = FinalEvaluateAgent(llm)
+    def __init__(self, llm: Any, mode: Optional[str] = None, router: Optional[ModelRouter] = None):
+        self.llm = llm
+        self.mode = mode or EVALUATE_MODE
+        router = router or ModelRouter(llm)
+        self.llm_as_judge_agent = LLMAsJudgeAgent(router.llm_for("LLMAsJudgeAgent"))
+        self.t_rag_agent = TRAGAgent(router.llm_for("TRAGAgent"))
+        self.mar_framework_agent = MARFrameworkAgent(router.llm_for("MARFrameworkAgent"))
+        self.final_evaluate_agent = FinalEvaluateAgent(router.llm_for("FinalEvaluateAgent"))
+        self.fused_judge_agent = FusedJudgeAgent(router.llm_for("FusedJudgeAgent"))
+        # Set by run_batch: one slot per judge call in flight.
+        self._judge_slots: Optional[asyncio.Semaphore] = None
+
+    async def _judge(self, call: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Awaits one judge call, holding a slot of the batch's concurrency limit when one is set."""
+        if self._judge_slots is None:
+            return await call(*args, **kwargs)
+        async with self._judge_slots:
+            return await call(*args, **kwargs)
 
     async def run(self, input_data: EvaluatePipelineInput) -> FullEvaluationResult:
         """
         Runs the full prompt evaluation pipeline asynchronously.
+
+        "heuristic" mode scores the prompt locally without any model call.
+        "fast" mode asks for all three rubrics (and the synthesis) in one call and
+        falls back to the thorough path if that response cannot be parsed. Unless
+        narrative output is requested, the final verdict is aggregated locally
+        from the judges' scores instead of by a model.
         """
+        mode = input_data.mode or self.mode
+        if mode == "heuristic":
+            logger.info("--- Heuristic Prompt Evaluation ---")
+            return heuristic_evaluation(input_data.prompt_to_evaluate, input_data.initial_prompt)
+        narrative = EVALUATE_NARRATIVE if input_data.narrative is None else input_data.narrative
+        check_input(self.llm, "EvaluatePipeline", input_data.prompt_to_evaluate, input_data.initial_prompt or "")
+        if mode == "fast":
+            logger.info("--- Starting Fast Prompt Evaluation ---")
+            result = await self._judge(
+                self.fused_judge_agent.evaluate,
+                input_data.prompt_to_evaluate, initial_prompt=input_data.initial_prompt, narrative=narrative,
+            )
+            if result is not None:
+                log_payload("Fused Evaluation Result: %s", result)
+                if narrative:
+                    return result
+                return FullEvaluationResult(
+                    llm_as_judge=result.llm_as_judge,
+                    t_rag=result.t_rag,
+                    mar_framework=result.mar_framework,
+                    final_evaluation=aggregate_scores(result.llm_as_judge, result.t_rag, result.mar_framework),
+                )
+            logger.warning("Fused evaluation could not be parsed, running the judges separately")
+        return await self._run_thorough(input_data, narrative)
+
+    async def _run_thorough(self, input_data: EvaluatePipelineInput, narrative: bool) -> FullEvaluationResult:
         prompt = input_data.prompt_to_evaluate
         initial_prompt = input_data.initial_prompt
 
@@ -27,9 +83,9 @@ class EvaluatePipeline:
 
         # Run evaluation agents concurrently
         evaluation_tasks = [
-            self.llm_as_judge_agent.evaluate(prompt),
-            self.t_rag_agent.evaluate(prompt, initial_prompt=initial_prompt),
-            self.mar_framework_agent.evaluate(prompt),
+            self._judge(self.llm_as_judge_agent.evaluate, prompt),
+            self._judge(self.t_rag_agent.evaluate, prompt, initial_prompt=initial_prompt),
+            self._judge(self.mar_framework_agent.evaluate, prompt),
         ]
 
         results = await asyncio.gather(*evaluation_tasks, return_exceptions=True)
@@ -38,25 +94,29 @@ class EvaluatePipeline:
         llm_as_judge_result, t_rag_result, mar_result = results
 
         if any(isinstance(res, Exception) for res in results):
-            logger.error(f"An error occurred during parallel evaluation: {results}")
+            logger.error("An error occurred during parallel evaluation: %s", results)
             # Handle or raise the exception as needed
             raise Exception("One or more evaluation agents failed.")
 
-        logger.info(f"LLM-as-a-Judge Result: {llm_as_judge_result}")
-        logger.info(f"T-RAG Result: {t_rag_result}")
-        logger.info(f"MAR Framework Result: {mar_result}")
+        log_payload("LLM-as-a-Judge Result: %s", llm_as_judge_result)
+        log_payload("T-RAG Result: %s", t_rag_result)
+        log_payload("MAR Framework Result: %s", mar_result)
 
-        logger.info("\n--- Individual Evaluations Complete. Synthesizing Final Report... ---")
-
-        final_evaluation = await self.final_evaluate_agent.evaluate(
-            prompt_to_evaluate=prompt,
-            llm_as_judge_result=llm_as_judge_result,
-            t_rag_result=t_rag_result,
-            mar_result=mar_result,
-        )
+        if narrative:
+            logger.info("\n--- Individual Evaluations Complete. Synthesizing Final Report... ---")
+            final_evaluation = await self._judge(
+                self.final_evaluate_agent.evaluate,
+                prompt_to_evaluate=prompt,
+                llm_as_judge_result=llm_as_judge_result,
+                t_rag_result=t_rag_result,
+                mar_result=mar_result,
+            )
+        else:
+            logger.info("\n--- Individual Evaluations Complete. Aggregating Scores... ---")
+            final_evaluation = aggregate_scores(llm_as_judge_result, t_rag_result, mar_result)
 
         logger.info("\n--- Pipeline Finished ---")
-        logger.info(f"Final Evaluation Result: {final_evaluation}")
+        log_payload("Final Evaluation Result: %s", final_evaluation)
 
         return FullEvaluationResult(
             llm_as_judge=llm_as_judge_result,
@@ -64,3 +124,120 @@ class EvaluatePipeline:
             mar_framework=mar_result,
             final_evaluation=final_evaluation,
         )
+
+    def _groups(self, prompts: List[str], mode: str, narrative: bool) -> List[List[int]]:
+        """
+        Splits the batch into judge calls.
+
+        In fast mode without narrative, prompts up to EVALUATE_BATCH_GROUP_CHARS
+        share a call, EVALUATE_BATCH_GROUP_SIZE at a time, when the provider
+        has native structured output; everything else is judged on its own.
+        """
+        if mode != "fast" or narrative or EVALUATE_BATCH_GROUP_SIZE < 2 or not supports_structured_output(self.llm):
+            return [[index] for index in range(len(prompts))]
+        small = [index for index, prompt in enumerate(prompts) if len(prompt) <= EVALUATE_BATCH_GROUP_CHARS]
+        large = [[index] for index, prompt in enumerate(prompts) if len(prompt) > EVALUATE_BATCH_GROUP_CHARS]
+        return [small[i:i + EVALUATE_BATCH_GROUP_SIZE] for i in range(0, len(small), EVALUATE_BATCH_GROUP_SIZE)] + large
+
+    async def _evaluate_one(self, batch: EvaluateBatchInput, index: int, mode: str, narrative: bool) -> BatchEvaluationItem:
+        label = batch.labels[index] if batch.labels else None
+        try:
+            evaluation = await self.run(EvaluatePipelineInput(
+                prompt_to_evaluate=batch.prompts[index],
+                initial_prompt=batch.initial_prompt,
+                mode=mode,
+                narrative=narrative,
+            ))
+            return BatchEvaluationItem(index=index, label=label, evaluation=evaluation)
+        except Exception as e:
+            logger.error("Batch evaluation of prompt %d failed: %s", index, e, exc_info=True)
+            return BatchEvaluationItem(index=index, label=label, error=str(e))
+
+    async def _evaluate_group(
+        self, batch: EvaluateBatchInput, group: List[int], mode: str, narrative: bool
+    ) -> List[BatchEvaluationItem]:
+        if len(group) == 1:
+            return [await self._evaluate_one(batch, group[0], mode, narrative)]
+        try:
+            scores = await self._judge(
+                self.fused_judge_agent.evaluate_group,
+                [batch.prompts[index] for index in group], initial_prompt=batch.initial_prompt,
+            )
+        except Exception as e:
+            # A rate limit, timeout or provider error on the shared call must not end the stream for the whole group.
+            logger.warning("Grouped judge call for %d prompts failed, judging them one by one: %r", len(group), e)
+            return list(await asyncio.gather(*(self._evaluate_one(batch, index, mode, narrative) for index in group)))
+        items = []
+        for position, index in enumerate(group):
+            if position not in scores:
+                continue
+            judged = scores[position]
+            items.append(BatchEvaluationItem(
+                index=index,
+                label=batch.labels[index] if batch.labels else None,
+                evaluation=FullEvaluationResult(
+                    llm_as_judge=judged.llm_as_judge,
+                    t_rag=judged.t_rag,
+                    mar_framework=judged.mar_framework,
+                    final_evaluation=aggregate_scores(judged.llm_as_judge, judged.t_rag, judged.mar_framework),
+                ),
+            ))
+        missing = [index for position, index in enumerate(group) if position not in scores]
+        if missing:
+            logger.warning("Grouped judge call left out %d of %d prompts, judging them one by one", len(missing), len(group))
+            items += await asyncio.gather(*(self._evaluate_one(batch, index, mode, narrative) for index in missing))
+        return items
+
+    async def run_batch(self, batch: EvaluateBatchInput) -> AsyncIterator[BatchEvaluationItem]:
+        """
+        Evaluates every prompt in ``batch``, yielding each result as soon as it is ready.
+
+        At most EVALUATE_BATCH_CONCURRENCY judge calls are in flight, counting
+        every call of a thorough evaluation and of the one-by-one fallback of
+        a group. The heuristic tier scores the whole batch locally without a
+        model.
+        """
+        mode = batch.mode or self.mode
+        narrative = EVALUATE_NARRATIVE if batch.narrative is None else batch.narrative
+        logger.info("--- Starting Batch Evaluation of %d prompts (mode: %s) ---", len(batch.prompts), mode)
+        if mode == "heuristic":
+            for index, evaluation in enumerate(heuristic_evaluations(batch.prompts, batch.initial_prompt)):
+                yield BatchEvaluationItem(
+                    index=index, label=batch.labels[index] if batch.labels else None, evaluation=evaluation,
+                )
+            return
+
+        self._judge_slots = asyncio.Semaphore(EVALUATE_BATCH_CONCURRENCY)
+        tasks = [
+            asyncio.create_task(self._evaluate_group(batch, group, mode, narrative))
+            for group in self._groups(batch.prompts, mode, narrative)
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                for item in await finished:
+                    yield item
+        finally:
+            # The client went away mid-stream: stop the judge calls still queued.
+            for task in tasks:
+                task.cancel()
+            self._judge_slots = None
+
+    @staticmethod
+    def rank(items: List[BatchEvaluationItem]) -> List[BatchRankingRow]:
+        """The evaluated candidates as a table, best final score first; failed items are left out."""
+        evaluated = sorted(
+            (item for item in items if item.evaluation is not None),
+            key=lambda item: (-item.evaluation.final_evaluation.final_score, item.index),
+        )
+        return [
+            BatchRankingRow(
+                rank=rank,
+                index=item.index,
+                label=item.label,
+                final_score=item.evaluation.final_evaluation.final_score,
+                llm_as_judge=item.evaluation.llm_as_judge.overall,
+                t_rag=item.evaluation.t_rag.overall,
+                mar_framework=item.evaluation.mar_framework.overall_score,
+            )
+            for rank, item in enumerate(evaluated, 1)
+        ]
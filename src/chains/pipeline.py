@@ -1,68 +1,16 @@
-from langgraph.graph import StateGraph, END
 from typing import TypedDict, Dict, List, Optional, Any
 from src.models.prompt_schema import PromptSchema
-from src.agents.types.zero_shot import ZeroShot
-from src.agents.types.one_shot import OneShot
-from src.agents.types.chain_of_thought import ChainOfThought
-from src.agents.types.tree_of_thought import TreeOfThought
-from src.agents.types.react import ReAct
-from src.agents.types.in_context import InContext
-from src.agents.types.emotion import Emotion
-from src.agents.types.role import Role
-from src.agents.types.few_shot import FewShot
-from src.agents.types.self_consistency import SelfConsistency
-from src.agents.types.meta_prompting import MetaPrompting
-from src.agents.types.least_to_most import LeastToMost
-from src.agents.types.multi_task import MultiTask
-from src.agents.types.task_decomposition import TaskDecomposition
-from src.agents.types.constrained import Constrained
-from src.agents.types.generated_knowledge import GeneratedKnowledge
-from src.agents.types.automatic_prompt_engineering import AutomaticPromptEngineering
-from src.agents.types.directional_stimulus import DirectionalStimulus
-from src.agents.types.chain_of_verification import ChainOfVerification
-from src.agents.types.skeleton_of_thought import SkeletonOfThought
-from src.agents.types.graph_of_thoughts import GraphOfThoughts
-from src.agents.types.plan_and_solve import PlanAndSolve
-from src.agents.types.maieutic_prompting import MaieuticPrompting
-from src.agents.types.reflexion import Reflexion as ReflexionType
-from src.agents.types.chain_of_density import ChainOfDensity
-from src.agents.types.active_prompt import ActivePrompt
-from src.agents.types.retrieval_augmented_prompting import RetrievalAugmentedPrompting
-from src.agents.types.multi_agent_debate import MultiAgentDebate
-from src.agents.types.persona_switching import PersonaSwitching
-from src.agents.types.scaffolded_prompting import ScaffoldedPrompting
-from src.agents.types.deliberation_prompting import DeliberationPrompting
-from src.agents.types.context_expansion import ContextExpansion
-from src.agents.types.goal_oriented_prompting import GoalOrientedPrompting
-from src.agents.frameworks.co_star import CoStar
-from src.agents.frameworks.tcef import Tcef
-from src.agents.frameworks.crispe import Crispe
-from src.agents.frameworks.rtf import Rtf
-from src.agents.frameworks.ice import Ice
-from src.agents.frameworks.craft import Craft
-from src.agents.frameworks.ape import Ape
-from src.agents.frameworks.pecra import Pecra
-from src.agents.frameworks.oscar import Oscar
-from src.agents.frameworks.rasce import Rasce
-from src.agents.frameworks.reflection import Reflection
-from src.agents.frameworks.flipped_interaction import FlippedInteraction
-from src.agents.frameworks.bab import Bab
-from src.agents.frameworks.prompt_framework import PromptFramework
-from src.agents.frameworks.soap import Soap
-from src.agents.frameworks.clear import Clear
-from src.agents.frameworks.prism import Prism
-from src.agents.frameworks.grips import Grips
-from src.agents.frameworks.app_framework import AppFramework
-from src.agents.frameworks.scope import Scope
-from src.agents.frameworks.tool_oriented_prompting import ToolOrientedPrompting
-from src.agents.frameworks.neuro_symbolic_prompting import NeuroSymbolicPrompting
-from src.agents.frameworks.dynamic_context_windows import DynamicContextWindows
-from src.agents.frameworks.meta_cognitive_prompting import MetaCognitivePrompting
-from src.agents.frameworks.prompt_ensembles import PromptEnsembles
+from src.agents.registry import AgentRegistry
 from src.agents.standard.self_correction import SelfCorrection
 from src.agents.standard.refine_agent import RefineAgent
 from src.agents.standard.final_prompt import FinalPrompt
-from src.logger import logger
+from src.agents.evaluate.heuristic_scorer import failure_summary, heuristic_gate
+from src.agents.payload import compact_json
+from src.chains.speculation import Speculation
+from src.model_routing import ModelRouter, parse_route
+from src.config import SPECULATIVE_INTEGRATE, STYLE_CASCADE
+from src.token_budget import check_input, count_tokens, model_key
+from src.logger import logger, log_payload
 import asyncio
 
 class PromptState(TypedDict):
@@ -73,77 +21,51 @@ class PromptState(TypedDict):
     refined_prompts: Dict[str, str]
     output_str: str
     iteration: int
+    speculation: Optional[Speculation]
 
 class PromptPipeline:
-    def __init__(self, llm: Any):
+    def __init__(self, llm: Any, router: Optional[ModelRouter] = None, speculative: bool = SPECULATIVE_INTEGRATE):
+        self.llm = llm
         self.max_iterations = 3
         self.score_threshold = 90
-        self.agents = {
-            "zero_shot": ZeroShot(llm=llm),
-            "one_shot": OneShot(llm=llm),
-            "cot": ChainOfThought(llm=llm),
-            "tot": TreeOfThought(llm=llm),
-            "react": ReAct(llm=llm),
-            "in_context": InContext(llm=llm),
-            "emotion": Emotion(llm=llm),
-            "role": Role(llm=llm),
-            "few_shot": FewShot(llm=llm),
-            "self_consistency": SelfConsistency(llm=llm),
-            "meta_prompting": MetaPrompting(llm=llm),
-            "least_to_most": LeastToMost(llm=llm),
-            "multi_task": MultiTask(llm=llm),
-            "task_decomposition": TaskDecomposition(llm=llm),
-            "constrained": Constrained(llm=llm),
-            "generated_knowledge": GeneratedKnowledge(llm=llm),
-            "automatic_prompt_engineering": AutomaticPromptEngineering(llm=llm),
-            "directional_stimulus": DirectionalStimulus(llm=llm),
-            "chain_of_verification": ChainOfVerification(llm=llm),
-            "skeleton_of_thought": SkeletonOfThought(llm=llm),
-            "graph_of_thoughts": GraphOfThoughts(llm=llm),
-            "plan_and_solve": PlanAndSolve(llm=llm),
-            "maieutic_prompting": MaieuticPrompting(llm=llm),
-            "reflexion_type": ReflexionType(llm=llm),
-            "chain_of_density": ChainOfDensity(llm=llm),
-            "active_prompt": ActivePrompt(llm=llm),
-            "retrieval_augmented_prompting": RetrievalAugmentedPrompting(llm=llm),
-            "multi_agent_debate": MultiAgentDebate(llm=llm),
-            "persona_switching": PersonaSwitching(llm=llm),
-            "scaffolded_prompting": ScaffoldedPrompting(llm=llm),
-            "deliberation_prompting": DeliberationPrompting(llm=llm),
-            "context_expansion": ContextExpansion(llm=llm),
-            "goal_oriented_prompting": GoalOrientedPrompting(llm=llm),
-            "co_star": CoStar(llm=llm),
-            "tcef": Tcef(llm=llm),
-            "crispe": Crispe(llm=llm),
-            "rtf": Rtf(llm=llm),
-            "ice": Ice(llm=llm),
-            "craft": Craft(llm=llm),
-            "ape": Ape(llm=llm),
-            "pecra": Pecra(llm=llm),
-            "oscar": Oscar(llm=llm),
-            "rasce": Rasce(llm=llm),
-            "reflection": Reflection(llm=llm),
-            "flipped_interaction": FlippedInteraction(llm=llm),
-            "bab": Bab(llm=llm),
-            "prompt": PromptFramework(llm=llm),
-            "soap": Soap(llm=llm),
-            "clear": Clear(llm=llm),
-            "prism": Prism(llm=llm),
-            "grips": Grips(llm=llm),
-            "app": AppFramework(llm=llm),
-            "scope": Scope(llm=llm),
-            "tool_oriented_prompting": ToolOrientedPrompting(llm=llm),
-            "neuro_symbolic_prompting": NeuroSymbolicPrompting(llm=llm),
-            "dynamic_context_windows": DynamicContextWindows(llm=llm),
-            "meta_cognitive_prompting": MetaCognitivePrompting(llm=llm),
-            "prompt_ensembles": PromptEnsembles(llm=llm)
-        }
-        self.self_correction = SelfCorrection(llm=llm)
-        self.refine_agent = RefineAgent(llm=llm)
-        self.final_prompt = FinalPrompt(llm=llm)
+        # Start FinalPrompt.integrate on the first-round prompts alongside their LLM evaluation.
+        self.speculative = speculative
+        # Each stage runs on the model its route assigns; see src/model_routing.py.
+        self.router = router or ModelRouter(llm)
+        # In cascade mode the style agents try the StyleCascade model first and escalate to the styles model,
+        # unless both stages resolve to the same model.
+        styles_llm = self.router.llm_for("styles")
+        fast_llm = self.router.llm_for("StyleCascade", default=parse_route("request:fast")) if STYLE_CASCADE != "off" else None
+        if fast_llm is not None and model_key(fast_llm) == model_key(styles_llm):
+            fast_llm = None
+        self.agents = AgentRegistry(styles_llm, fast_llm=fast_llm)
+        self.self_correction = SelfCorrection(llm=self.router.llm_for("SelfCorrection"))
+        self.refine_agent = RefineAgent(llm=self.router.llm_for("RefineAgent"))
+        self.final_prompt = FinalPrompt(llm=self.router.llm_for("FinalPrompt"))
         self.graph = self._build_graph()
 
+    def _integrate(self, state: PromptState, prompts: Dict[str, str]):
+        all_prompts = {state["prompt_input"].framework: state["framework_output"], **prompts}
+        log_payload("Passing prompts to FinalPrompt.integrate: %s", all_prompts)
+        return self.final_prompt.integrate(
+            refined_responses=all_prompts,
+            type_prompts=state["type_prompts"],
+            user_input=state["prompt_input"].user_input,
+            framework=state["prompt_input"].framework
+        )
+
+    def _speculate(self, state: PromptState) -> Speculation:
+        llm = self.final_prompt.llm
+        sent = count_tokens(llm, state["framework_output"] + compact_json(state["type_prompts"]) + state["prompt_input"].user_input)
+        return Speculation(
+            lambda: self._integrate(state, state["type_prompts"]),
+            estimate=lambda result: sent + count_tokens(llm, compact_json(result) if result else ""),
+        )
+
     def _build_graph(self):
+        # langgraph is the largest import on the startup path; load it with the first pipeline instead.
+        from langgraph.graph import StateGraph, END
+
         workflow = StateGraph(PromptState)
 
         async def framework_node(state: PromptState) -> PromptState:
@@ -152,10 +74,10 @@ class PromptPipeline:
                 framework_output = await asyncio.to_thread(
                     self.agents[framework].refine, state["prompt_input"].user_input
                 )
-                logger.info(f"Framework '{framework}' output: {framework_output}")
+                log_payload("Framework '%s' output: %s", framework, framework_output)
                 return {"framework_output": framework_output}
             else:
-                logger.warning(f"Framework '{framework}' not found, using user input directly.")
+                logger.warning("Framework '%s' not found, using user input directly.", framework)
                 return {"framework_output": state["prompt_input"].user_input}
 
         async def type_refine_node(state: PromptState) -> PromptState:
@@ -169,45 +91,72 @@ class PromptPipeline:
                 style: (result if isinstance(result, str) else str(result))
                 for style, result in zip(state["prompt_input"].style, results)
             }
-            logger.info(f"Type prompts generated: {type_prompts}")
+            log_payload("Type prompts generated: %s", type_prompts)
             return {"type_prompts": type_prompts, "refined_prompts": {}} # Clear refined prompts
 
         async def evaluate_node(state: PromptState) -> PromptState:
             prompts_to_evaluate = state["refined_prompts"] if state["refined_prompts"] else state["type_prompts"]
+            verdict, scores = heuristic_gate(list(prompts_to_evaluate.values()), state["prompt_input"].user_input)
+            if verdict is not None:
+                logger.info("Heuristic gate: prompts clearly %s (scores %s), skipping LLM evaluation", verdict, scores.tolist())
+                evaluation = {
+                    "status": "yes" if verdict == "pass" else "no",
+                    "agents": {name: int(score) for name, score in zip(prompts_to_evaluate, scores)},
+                    "summary": failure_summary(prompts_to_evaluate, scores) if verdict == "fail" else None,
+                    "source": "heuristic",
+                }
+                return {"evaluation": evaluation, "iteration": state["iteration"] + 1}
+            # First-round prompts are integrated while the judge runs; most requests pass or hit the iteration cap.
+            speculation = self._speculate(state) if self.speculative and state["iteration"] == 0 else None
             combined_prompt = "\n".join(prompts_to_evaluate.values())
-            evaluation = await asyncio.to_thread(
-                self.self_correction.evaluate,
-                combined_prompt,
-                state["prompt_input"].user_input,
-                list(prompts_to_evaluate.keys()),
-            )
-            logger.info(f"Evaluation result: {evaluation}")
-            return {"evaluation": evaluation, "iteration": state["iteration"] + 1}
+            try:
+                evaluation = await asyncio.to_thread(
+                    self.self_correction.evaluate,
+                    combined_prompt,
+                    state["prompt_input"].user_input,
+                    list(prompts_to_evaluate.keys()),
+                )
+            except Exception:
+                if speculation is not None:
+                    speculation.discard()
+                raise
+            if speculation is not None:
+                speculation.decided()
+            log_payload("Evaluation result: %s", evaluation)
+            return {"evaluation": evaluation, "iteration": state["iteration"] + 1, "speculation": speculation}
 
         async def refine_node(state: PromptState) -> PromptState:
             if state["evaluation"]["status"] == "yes":
                 return {"refined_prompts": state["refined_prompts"] or state["type_prompts"]}
-            logger.info(f"Passing evaluation to RefineAgent: {state['evaluation']}")
+            if state["speculation"] is not None:
+                # The first-round prompts are being refined, so their integration is never used.
+                state["speculation"].discard()
+            log_payload("Passing evaluation to RefineAgent: %s", state['evaluation'])
             refined_prompts = await self.refine_agent.refine_based_on_feedback(
                 state["prompt_input"].user_input,
                 state["evaluation"],
                 state["type_prompts"],  # Pass the actual prompts
                 list(state["type_prompts"].keys()),
             )
-            logger.info(f"Refined prompts: {refined_prompts}")
-            return {"refined_prompts": refined_prompts}
+            log_payload("Refined prompts: %s", refined_prompts)
+            return {"refined_prompts": refined_prompts, "speculation": None}
 
         async def integrate_node(state: PromptState) -> PromptState:
             prompts = state["refined_prompts"] if state["refined_prompts"] and all(state["refined_prompts"].values()) else state["type_prompts"]
-            all_prompts = {state["prompt_input"].framework: state["framework_output"], **prompts}
-            logger.info(f"Passing prompts to FinalPrompt.integrate: {all_prompts}")
-            output_str = await self.final_prompt.integrate(
-                refined_responses=all_prompts,
-                type_prompts=state["type_prompts"],
-                user_input=state["prompt_input"].user_input,
-                framework=state["prompt_input"].framework
-            )
-            logger.info(f"Final output: {output_str}")
+            speculation = state["speculation"]
+            output_str = None
+            if speculation is not None and prompts is state["type_prompts"]:
+                try:
+                    output_str = await speculation.result()
+                    logger.info("Using the speculative integration of the first-round prompts")
+                except Exception as e:
+                    logger.warning("Speculative integration failed, integrating again: %s", e)
+                    speculation.discard()
+            elif speculation is not None:
+                speculation.discard()
+            if output_str is None:
+                output_str = await self._integrate(state, prompts)
+            log_payload("Final output: %s", output_str)
             return {"output_str": output_str}
 
         def should_continue(state: PromptState) -> str:
@@ -236,7 +185,9 @@ class PromptPipeline:
         return workflow.compile()
 
     async def run(self, prompt_input: PromptSchema) -> PromptSchema:
-        logger.info(f"Running pipeline for input: {prompt_input.user_input[:50]}... with styles: {prompt_input.style}, framework: {prompt_input.framework}")
+        logger.info("Running pipeline for input: %.50s... with styles: %s, framework: %s", prompt_input.user_input, prompt_input.style, prompt_input.framework)
+        # The input is fanned out to every style; reject it before any of those calls if it cannot fit.
+        check_input(self.llm, "PromptPipeline", prompt_input.user_input)
         initial_state = {
             "prompt_input": prompt_input,
             "framework_output": "",
@@ -244,7 +195,8 @@ class PromptPipeline:
             "evaluation": {},
             "refined_prompts": {},
             "output_str": "",
-            "iteration": 0
+            "iteration": 0,
+            "speculation": None,
         }
         state = await self.graph.ainvoke(initial_state)
         prompt_input.output_str = state["output_str"]
@@ -1,5 +1,4 @@
 from typing import Any, Dict, List, TypedDict, Optional, Literal
-from langgraph.graph import StateGraph, END
 import re
 import asyncio
 
@@ -11,7 +10,12 @@ from src.agents.project_mania.composers.autogen_template_composer import Autogen
 from src.agents.project_mania.refine.analyze_agent import AnalyzeAgent
 from src.agents.project_mania.refine.refine_agent import RefineAgent
 from src.agents.project_mania.refine.evaluate_agent import EvaluateAgent
-from src.logger import logger
+from src.agents.project_mania.adapt_agent import TemplateAdaptAgent
+from src.config import PROJECT_MANIA_REVIEW_MODE, TEMPLATE_LIBRARY_ADAPT, TEMPLATE_LIBRARY_ENABLED
+from src.model_routing import ModelRouter
+from src.template_library import TemplateLibrary, template_library
+from src.logger import logger, log_payload
+from src.token_budget import check_input
 
 class ProjectManiaState(TypedDict):
     intent: str
@@ -21,41 +25,55 @@ class ProjectManiaState(TypedDict):
     plan: Dict
     current_template: str
     analysis: Dict
+    analysis_current: bool  # Whether `analysis` was made for `current_template`.
     evaluation: Dict
     iteration: int
     metadata: List[Dict]
+    calls: Dict[str, int]
     final_output: str
 
 class ProjectManiaPipeline:
     """
     Main orchestration pipeline for Project Mania using LangGraph.
-    Flow: Router -> Composer -> Analyze -> Refine -> Evaluate -> Clean Output
+    Flow: Router -> Composer -> Review -> (Analyze -> Refine -> Review)* -> Clean Output
+
+    Every template, the draft included, is evaluated before it is refined, so a
+    draft that already passes skips analysis and refinement entirely. Requests
+    that match a template in the library skip the graph altogether.
     """
-    def __init__(self, llm: Any):
+    def __init__(self, llm: Any, review_mode: Optional[str] = None, library: Optional[TemplateLibrary] = None,
+                 model_router: Optional[ModelRouter] = None):
         self.llm = llm
-        self.router = RouterAgent(llm)
+        self.review_mode = review_mode or PROJECT_MANIA_REVIEW_MODE
+        self.library = library if library is not None else (template_library if TEMPLATE_LIBRARY_ENABLED else None)
+        # Stage names follow the agent classes; the refine-loop agents are prefixed with "Template" to keep them
+        # apart from the prompt pipeline's RefineAgent in the routing table.
+        model_router = model_router or ModelRouter(llm)
+        self.router = RouterAgent(model_router.llm_for("RouterAgent"))
         self.composers = {
-            "general": GenericTemplateComposer(llm),
-            "crewai": CrewAITemplateComposer(llm),
-            "autogen": AutogenTemplateComposer(llm)
+            "general": GenericTemplateComposer(model_router.llm_for("GenericTemplateComposer")),
+            "crewai": CrewAITemplateComposer(model_router.llm_for("CrewAITemplateComposer")),
+            "autogen": AutogenTemplateComposer(model_router.llm_for("AutogenTemplateComposer"))
         }
-        self.analyze_agent = AnalyzeAgent(llm)
-        self.refine_agent = RefineAgent(llm)
-        self.evaluate_agent = EvaluateAgent(llm)
+        self.analyze_agent = AnalyzeAgent(model_router.llm_for("TemplateAnalyzeAgent"))
+        self.refine_agent = RefineAgent(model_router.llm_for("TemplateRefineAgent"))
+        self.evaluate_agent = EvaluateAgent(model_router.llm_for("TemplateEvaluateAgent"))
+        self.adapt_agent = TemplateAdaptAgent(model_router.llm_for("TemplateAdaptAgent"))
         self.max_iterations = 3
         self.graph = self._build_graph()
 
     def _build_graph(self):
+        # langgraph is the largest import on the startup path; load it with the first pipeline instead.
+        from langgraph.graph import StateGraph, END
+
         workflow = StateGraph(ProjectManiaState)
 
         # --- Nodes ---
 
         async def route_node(state: ProjectManiaState) -> ProjectManiaState:
-            logger.info(f"Routing intent: {state['intent']}")
-            plan = await asyncio.to_thread(
-                self.router.route, state['intent'], state['template_type'], state['variables']
-            )
-            logger.info(f"Router Plan: {plan}")
+            log_payload("Routing intent: %s", state['intent'])
+            plan = await self.router.aroute(state['intent'], state['template_type'], state['variables'])
+            log_payload("Router Plan: %s", plan)
             return {"plan": plan}
 
         async def compose_node(state: ProjectManiaState) -> ProjectManiaState:
@@ -64,56 +82,65 @@ class ProjectManiaPipeline:
             if not composer:
                 raise ValueError(f"Unknown template type: {state['template_type']}")
             
-            draft_template = await asyncio.to_thread(
-                composer.compose, state['intent'], state['variables'], state['plan'], state.get('prompt_length', 'medium')
+            draft_template = await composer.acompose(
+                state['intent'], state['variables'], state['plan'], state.get('prompt_length', 'medium')
             )
             logger.info("Draft template composed.")
             return {"current_template": draft_template, "iteration": 0}
 
-        async def analyze_node(state: ProjectManiaState) -> ProjectManiaState:
-            iteration = state['iteration'] + 1
-            logger.info(f"Refinement Iteration {iteration}/{self.max_iterations} - Analyzing...")
-            analysis = await asyncio.to_thread(
-                self.analyze_agent.analyze, state['current_template'], state['intent']
-            )
-            logger.info(f"Analysis: {analysis}")
-            return {"analysis": analysis, "iteration": iteration}
+        def count(state: ProjectManiaState, *agents: str) -> Dict[str, int]:
+            calls = dict(state["calls"])
+            for agent in agents:
+                calls[agent] = calls.get(agent, 0) + 1
+            return calls
 
-        async def refine_node(state: ProjectManiaState) -> ProjectManiaState:
-            logger.info("Refining template based on analysis...")
-            current_template = state['current_template']
-            if state['analysis'].get("suggestions"):
-                current_template = await asyncio.to_thread(
-                    self.refine_agent.apply_changes, current_template, state['analysis']["suggestions"]
+        async def review_node(state: ProjectManiaState) -> ProjectManiaState:
+            logger.info("Evaluating template (after %d refinements)...", state['iteration'])
+            # Analyze alongside the evaluation only if a failure could still lead to another refinement.
+            concurrent = self.review_mode == "concurrent" and state['iteration'] < self.max_iterations
+            if concurrent:
+                evaluation, analysis = await asyncio.gather(
+                    self.evaluate_agent.aevaluate(state['current_template'], state['intent']),
+                    self.analyze_agent.aanalyze(state['current_template'], state['intent']),
                 )
-            return {"current_template": current_template}
+                update = {"analysis": analysis, "analysis_current": True, "calls": count(state, "evaluate", "analyze")}
+            else:
+                evaluation = await self.evaluate_agent.aevaluate(state['current_template'], state['intent'])
+                update = {"calls": count(state, "evaluate")}
+            log_payload("Evaluation: %s", evaluation)
 
-        async def evaluate_node(state: ProjectManiaState) -> ProjectManiaState:
-            logger.info("Evaluating template...")
-            evaluation = await asyncio.to_thread(
-                self.evaluate_agent.evaluate, state['current_template'], state['intent']
-            )
-            logger.info(f"Evaluation: {evaluation}")
-            
-            # Update metadata history
             new_metadata_entry = {
                 "iteration": state['iteration'],
-                "analysis": state['analysis'],
+                "analysis": update.get("analysis", state['analysis']),
                 "evaluation": evaluation
             }
-            current_metadata = state.get('metadata', [])
-            return {"evaluation": evaluation, "metadata": current_metadata + [new_metadata_entry]}
+            return {**update, "evaluation": evaluation, "metadata": state.get('metadata', []) + [new_metadata_entry]}
+
+        async def analyze_node(state: ProjectManiaState) -> ProjectManiaState:
+            logger.info("Refinement Iteration %d/%d - Analyzing...", state['iteration'] + 1, self.max_iterations)
+            analysis = await self.analyze_agent.aanalyze(state['current_template'], state['intent'])
+            log_payload("Analysis: %s", analysis)
+            return {"analysis": analysis, "analysis_current": True, "calls": count(state, "analyze")}
+
+        async def refine_node(state: ProjectManiaState) -> ProjectManiaState:
+            logger.info("Refinement Iteration %d/%d - Refining template based on analysis...", state['iteration'] + 1, self.max_iterations)
+            current_template = state['current_template']
+            calls = state["calls"]
+            if state['analysis'].get("suggestions"):
+                current_template = await self.refine_agent.aapply_changes(
+                    current_template, state['analysis']["suggestions"]
+                )
+                calls = count(state, "refine")
+            return {
+                "current_template": current_template,
+                "analysis_current": False,
+                "iteration": state['iteration'] + 1,
+                "calls": calls,
+            }
 
         async def clean_output_node(state: ProjectManiaState) -> ProjectManiaState:
             logger.info("Cleaning final output...")
-            raw_output = state['current_template']
-            
-            # Remove markdown fences like ```python, ```jinja, ```
-            cleaned_output = re.sub(r'^```\w*\n', '', raw_output) # Remove start fence
-            cleaned_output = re.sub(r'\n```$', '', cleaned_output) # Remove end fence
-            cleaned_output = cleaned_output.strip()
-            
-            return {"final_output": cleaned_output}
+            return {"final_output": self._clean(state['current_template'])}
 
         # --- Edges ---
 
@@ -122,37 +149,89 @@ class ProjectManiaPipeline:
                 return "clean_output"
             if state['iteration'] >= self.max_iterations:
                 return "clean_output"
-            return "analyze"
+            return "refine" if state['analysis_current'] else "analyze"
 
         workflow.add_node("route", route_node)
         workflow.add_node("compose", compose_node)
+        workflow.add_node("review", review_node)
         workflow.add_node("analyze", analyze_node)
         workflow.add_node("refine", refine_node)
-        workflow.add_node("evaluate", evaluate_node)
         workflow.add_node("clean_output", clean_output_node)
 
         workflow.set_entry_point("route")
         workflow.add_edge("route", "compose")
-        workflow.add_edge("compose", "analyze")
+        workflow.add_edge("compose", "review")
         workflow.add_edge("analyze", "refine")
-        workflow.add_edge("refine", "evaluate")
-        
+        workflow.add_edge("refine", "review")
+
         workflow.add_conditional_edges(
-            "evaluate",
+            "review",
             should_continue,
             {
                 "analyze": "analyze",
+                "refine": "refine",
                 "clean_output": "clean_output"
             }
         )
-        
+
         workflow.add_edge("clean_output", END)
 
         return workflow.compile()
 
+    @staticmethod
+    def _clean(raw_output: str) -> str:
+        # Remove markdown fences like ```python, ```jinja, ```
+        cleaned_output = re.sub(r'^```\w*\n', '', raw_output) # Remove start fence
+        cleaned_output = re.sub(r'\n```$', '', cleaned_output) # Remove end fence
+        return cleaned_output.strip()
+
+    async def _from_library(self, input_data: ProjectManiaSchema) -> Optional[ProjectManiaResponse]:
+        """Serves or adapts a matching library template; None when the full graph has to run."""
+        match = await asyncio.to_thread(
+            self.library.lookup, input_data.intent, input_data.template_type, input_data.prompt_length, input_data.variables
+        )
+        if match is None or not (match.exact or TEMPLATE_LIBRARY_ADAPT):
+            self.library.record("misses")
+            return None
+        final_template, calls = match.final_template, {}
+        if not match.exact:
+            try:
+                adapted = await self.adapt_agent.aadapt(
+                    match.final_template, match.intent, input_data.intent, input_data.variables
+                )
+            except Exception as e:
+                logger.warning("Adapting library template %d failed: %s", match.entry_id, e)
+                adapted = ""
+            final_template, calls = self._clean(adapted), {"adapt": 1}
+            if not final_template:
+                self.library.record("adapt_failures")
+                return None
+        outcome = "served" if match.exact else "adapted"
+        self.library.record(outcome, match)
+        logger.info("Project Mania template %s from library entry %d (similarity %.2f)",
+                    outcome, match.entry_id, match.similarity)
+        return ProjectManiaResponse(
+            final_template=final_template,
+            metadata={
+                "plan": {},
+                "refinement_history": [],
+                "template_type": input_data.template_type,
+                "refinement_calls": calls,
+                # Against the fixed route -> compose -> analyze -> refine -> evaluate flow.
+                "calls_avoided": 5 - len(calls),
+                "library": {"match": outcome, **match.describe()},
+            }
+        )
+
     async def run(self, input_data: ProjectManiaSchema) -> ProjectManiaResponse:
-        logger.info(f"Starting Project Mania generation for intent: {input_data.intent}")
-        
+        logger.info("Starting Project Mania generation (template_type=%s)", input_data.template_type)
+        log_payload("Project Mania intent: %s", input_data.intent)
+        check_input(self.llm, "ProjectManiaPipeline", input_data.intent, "\n".join(input_data.variables))
+        if self.library is not None and input_data.use_template_library:
+            response = await self._from_library(input_data)
+            if response is not None:
+                return response
+
         initial_state = {
             "intent": input_data.intent,
             "variables": input_data.variables,
@@ -161,19 +240,38 @@ class ProjectManiaPipeline:
             "plan": {},
             "current_template": "",
             "analysis": {},
+            "analysis_current": False,
             "evaluation": {},
             "iteration": 0,
             "metadata": [],
+            "calls": {},
             "final_output": ""
         }
 
         final_state = await self.graph.ainvoke(initial_state)
-        
+        calls = final_state["calls"]
+        # The old fixed flow always ran analyze, refine and evaluate at least once before checking the result.
+        passed_draft = final_state["iteration"] == 0 and final_state["evaluation"].get("success", False)
+        calls_avoided = (2 - calls.get("analyze", 0)) if passed_draft else 0
+        logger.info("Project Mania finished after %d refinements with %d LLM calls (%d avoided)",
+                    final_state["iteration"], 2 + sum(calls.values()), calls_avoided)
+        # Only templates the gatekeeper approved are worth reusing.
+        if self.library is not None and final_state["evaluation"].get("success", False):
+            try:
+                await asyncio.to_thread(
+                    self.library.store, input_data.intent, input_data.template_type, input_data.prompt_length,
+                    input_data.variables, final_state["final_output"]
+                )
+            except Exception as e:
+                logger.warning("Could not store the template in the library: %s", e)
+
         return ProjectManiaResponse(
             final_template=final_state["final_output"],
             metadata={
                 "plan": final_state["plan"],
                 "refinement_history": final_state["metadata"],
-                "template_type": final_state["template_type"]
+                "template_type": final_state["template_type"],
+                "refinement_calls": calls,
+                "calls_avoided": calls_avoided,
             }
         )
@@ -2,7 +2,7 @@ from typing import Any, Dict, List
 from src.agents.project_mania.refine.analyze_agent import AnalyzeAgent
 from src.agents.project_mania.refine.refine_agent import RefineAgent
 from src.agents.project_mania.refine.evaluate_agent import EvaluateAgent
-from src.logger import logger
+from src.logger import logger, log_payload
 
 class ProjectManiaRefinementPipeline:
     """
@@ -19,19 +19,19 @@ class ProjectManiaRefinementPipeline:
         iteration_metadata = []
 
         for i in range(self.max_iterations):
-            logger.info(f"Refinement Iteration {i+1}/{self.max_iterations}")
+            logger.info("Refinement Iteration %d/%d", i + 1, self.max_iterations)
 
             # 1. Analyze
-            analysis = self.analyze_agent.analyze(current_template, intent)
-            logger.info(f"Analysis: {analysis}")
+            analysis = await self.analyze_agent.aanalyze(current_template, intent)
+            log_payload("Analysis: %s", analysis)
 
             # 2. Refine
             if analysis.get("suggestions"):
-                current_template = self.refine_agent.apply_changes(current_template, analysis["suggestions"])
+                current_template = await self.refine_agent.aapply_changes(current_template, analysis["suggestions"])
             
             # 3. Evaluate
-            evaluation = self.evaluate_agent.evaluate(current_template, intent)
-            logger.info(f"Evaluation: {evaluation}")
+            evaluation = await self.evaluate_agent.aevaluate(current_template, intent)
+            log_payload("Evaluation: %s", evaluation)
 
             iteration_metadata.append({
                 "iteration": i + 1,
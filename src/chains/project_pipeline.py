@@ -1,8 +1,11 @@
-from langgraph.graph import StateGraph, END
-from typing import TypedDict, Any, Dict
-from src.logger import logger
+from typing import TypedDict, Any, Dict, List, Optional
+from langchain_core.callbacks import get_usage_metadata_callback
+from src.logger import logger, log_payload
+from src.token_budget import check_input
+import logging
 import re
 import json
+from src.agents.project.blueprint_validation import validate_blueprint
 from src.agents.project import (
     IdeaGenerationAgent,
     PlannerAgent,
@@ -20,13 +23,18 @@ class BrainstormState(TypedDict):
     plan: str
     architecture: str
     json_prompt: str
+    generation_metrics: Dict
     evaluation: Dict
     iteration: int
+    changed_sections: Optional[List[str]]
+    refinement_metrics: List[Dict]
+    validation_metrics: Dict
 
 class ProjectPipeline:
     """A pipeline to generate a structured JSON prompt from a simple user idea."""
 
     def __init__(self, llm: Any):
+        self.llm = llm
         if "mistral" in getattr(llm, 'model_name', '').lower():
             self.max_iterations = 1
         else:
@@ -40,18 +48,21 @@ class ProjectPipeline:
         self.graph = self._build_graph()
 
     def _build_graph(self):
+        # langgraph is the largest import on the startup path; load it with the first pipeline instead.
+        from langgraph.graph import StateGraph, END
+
         workflow = StateGraph(BrainstormState)
 
         async def idea_generation_node(state: BrainstormState) -> Dict:
             logger.info("Node: Generating ideas...")
             ideas = await self.idea_agent.refine(state["user_input"])
-            logger.info(f"Generated ideas: {ideas}")
+            log_payload("Generated ideas: %s", ideas)
             return {"ideas": ideas}
 
         async def planner_node(state: BrainstormState) -> Dict:
             logger.info("Node: Planning structure...")
             plan = await self.planner_agent.refine(state["user_input"], ideas=state["ideas"])
-            logger.info(f"Generated plan: {plan}")
+            log_payload("Generated plan: %s", plan)
             return {"plan": plan}
 
         async def architect_node(state: BrainstormState) -> Dict:
@@ -59,28 +70,45 @@ class ProjectPipeline:
             architecture = await self.architect_agent.refine(
                 state["user_input"], ideas=state["ideas"], plan=state["plan"]
             )
-            logger.info(f"Generated architecture: {architecture}")
+            log_payload("Generated architecture: %s", architecture)
             return {"architecture": architecture}
 
         async def generate_json_node(state: BrainstormState) -> Dict:
             logger.info("Node: Generating JSON prompt...")
-            # The agent returns a dictionary: {"json": "..."}
+            # The agent returns a dictionary: {"json": "...", "metrics": {...}}
             json_prompt_dict = await self.generator_agent.refine(
                 state["user_input"],
                 ideas=state["ideas"],
                 plan=state["plan"],
                 architecture=state["architecture"],
             )
-            logger.info(f"Generated JSON prompt: {json_prompt_dict.get('json')}")
-            return {"json_prompt": json_prompt_dict.get("json")}
+            log_payload("Generated JSON prompt: %s", json_prompt_dict.get('json'))
+            logger.info("Blueprint generation metrics: %s", json_prompt_dict.get("metrics"))
+            return {"json_prompt": json_prompt_dict.get("json"), "generation_metrics": json_prompt_dict.get("metrics", {})}
 
         async def evaluate_node(state: BrainstormState) -> Dict:
-            logger.info(f"Node: Evaluating JSON prompt (Iteration {state['iteration']})...")
+            logger.info("Node: Evaluating JSON prompt (Iteration %d)...", state['iteration'])
+            metrics = dict(state["validation_metrics"])
+            # Structural problems go straight back to the refiner; the LLM only reviews valid blueprints.
+            structural_issues = validate_blueprint(state["json_prompt"], state["user_input"])
+            if structural_issues:
+                metrics["local_rejections"] += 1
+                logger.info("Local validation rejected the blueprint: %s", structural_issues)
+                evaluation = {"status": "failure", "issues": structural_issues, "source": "validation"}
+                return {"evaluation": evaluation, "iteration": state["iteration"] + 1, "validation_metrics": metrics}
+
+            metrics["llm_evaluations"] += 1
+            # Once the blueprint has had a full review, only sections rewritten since are reviewed again.
             evaluation = await self.evaluator_agent.refine(
-                state["user_input"], json_prompt=state["json_prompt"]
+                state["user_input"], json_prompt=state["json_prompt"], sections=state["changed_sections"]
             )
-            logger.info(f"Evaluation result: {evaluation}")
-            return {"evaluation": evaluation, "iteration": state["iteration"] + 1}
+            log_payload("Evaluation result: %s", evaluation)
+            return {
+                "evaluation": evaluation,
+                "iteration": state["iteration"] + 1,
+                "validation_metrics": metrics,
+                "changed_sections": [],
+            }
 
         async def refine_node(state: BrainstormState) -> Dict:
             logger.info("Node: Refining JSON prompt...")
@@ -89,15 +117,34 @@ class ProjectPipeline:
                 logger.info("No issues found to refine. Ending refinement.")
                 return {} # No changes to state if no issues
 
-            refined_prompt = await self.refiner_agent.refine(
-                state["user_input"], json_prompt=state["json_prompt"], issues=issues
-            )
-            logger.info(f"Refined JSON prompt: {refined_prompt}")
-            return {"json_prompt": refined_prompt}
+            with get_usage_metadata_callback() as usage:
+                refined = await self.refiner_agent.refine_sections(
+                    state["user_input"], json_prompt=state["json_prompt"], issues=issues
+                )
+            regenerated, reused = refined["regenerated"], refined["reused"]
+            total = len(regenerated) + len(reused)
+            metrics = {
+                "iteration": state["iteration"],
+                "sections_regenerated": regenerated,
+                "sections_reused": reused,
+                "reuse_share": round(len(reused) / total, 3) if total else 0.0,
+                "output_tokens": sum(item.get("output_tokens", 0) for item in usage.usage_metadata.values()),
+            }
+            logger.info("Refinement metrics: %s", metrics)
+            log_payload("Refined JSON prompt: %s", refined["json"])
+            return {
+                "json_prompt": refined["json"],
+                # None means the next LLM review has to cover the whole blueprint.
+                "changed_sections": (
+                    sorted(set(state["changed_sections"]) | set(regenerated))
+                    if reused and state["changed_sections"] is not None else None
+                ),
+                "refinement_metrics": state["refinement_metrics"] + [metrics],
+            }
 
         def should_continue(state: BrainstormState) -> str:
             logger.info("Conditional Edge: Checking 'should_continue'...")
-            if state["evaluation"].get("status") == "yes":
+            if state["evaluation"].get("status") in ("yes", "success"):
                 logger.info("Decision: Evaluation successful. Ending workflow.")
                 return "end"
             if state["iteration"] >= self.max_iterations:
@@ -148,22 +195,30 @@ class ProjectPipeline:
 
         return workflow.compile()
 
-    async def run(self, user_input: str) -> Dict:
-        """Executes the brainstorming and JSON generation workflow."""
+    async def run(self, user_input: Any) -> Dict:
+        """Executes the brainstorming and JSON generation workflow for an idea given as text or as a ``PromptSchema``."""
         logger.info("Starting brainstorming pipeline...")
+        # The agents and the local validation work on the idea text, not on the request model it arrived in.
+        user_input = str(getattr(user_input, "user_input", user_input))
+        # Every stage re-sends the input with the growing blueprint; reject it before any call if it alone cannot fit.
+        check_input(self.llm, "ProjectPipeline", user_input)
         initial_state: BrainstormState = {
             "user_input": user_input,
             "ideas": "",
             "plan": "",
             "architecture": "",
             "json_prompt": "",
+            "generation_metrics": {},
             "evaluation": {},
             "iteration": 0,
+            "changed_sections": None,
+            "refinement_metrics": [],
+            "validation_metrics": {"local_rejections": 0, "llm_evaluations": 0},
         }
         try:
             final_state = await self.graph.ainvoke(initial_state)
             logger.info("Brainstorming pipeline finished.")
-            logger.debug(f"Final state: {final_state}")
+            log_payload("Final state: %s", final_state, level=logging.DEBUG)
 
             json_string = final_state.get("json_prompt", "{}") or "{}"
             
@@ -178,11 +233,11 @@ class ProjectPipeline:
 
                 final_state["json_prompt"] = json.loads(cleaned_json_string)
             except (json.JSONDecodeError, AttributeError):
-                logger.error(f"Final JSON prompt is not valid JSON. Content: {json_string}", exc_info=True)
+                logger.error("Final JSON prompt is not valid JSON. Content: %s", json_string, exc_info=True)
                 final_state["json_prompt"] = {"error": "The generated content was not valid JSON.", "raw_content": json_string}
             return final_state
         except Exception as e:
-            logger.error(f"An error occurred during pipeline execution: {e}", exc_info=True)
+            logger.error("An error occurred during pipeline execution: %s", e, exc_info=True)
             # Return the initial state but with an error message to maintain a consistent structure for the frontend.
             return {
                 "error": f"An error occurred during pipeline execution: {str(e)}",
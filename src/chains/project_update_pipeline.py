@@ -1,11 +1,11 @@
-from langgraph.graph import StateGraph, END
 from typing import TypedDict, Optional, Dict, Any
 from src.agents.project_refine.project_feedback_analyzer import ProjectFeedbackAnalyzerAgent, ReviewSuggestions
 from src.agents.project_refine.project_updater_agent import ProjectUpdaterAgent
 from src.agents.project_refine.project_evaluator_agent import ProjectEvaluatorAgent
-from src.logger import logger
+from src.agents.payload import compact_json
+from src.token_budget import check_input
+from src.logger import logger, log_payload
 import asyncio
-import json
 
 class ProjectUpdateState(TypedDict):
     """Represents the state of the project update workflow."""
@@ -19,6 +19,7 @@ class ProjectUpdateState(TypedDict):
 class ProjectUpdatePipeline:
     """A pipeline to update project artifacts based on user feedback using a graph-based approach."""
     def __init__(self, llm: Any):
+        self.llm = llm
         self.max_iterations = 3
         self.review_agent = ProjectFeedbackAnalyzerAgent(llm=llm)
         self.refiner_agent = ProjectUpdaterAgent(llm=llm)
@@ -26,6 +27,9 @@ class ProjectUpdatePipeline:
         self.graph = self._build_graph()
 
     def _build_graph(self):
+        # langgraph is the largest import on the startup path; load it with the first pipeline instead.
+        from langgraph.graph import StateGraph, END
+
         workflow = StateGraph(ProjectUpdateState)
 
         async def analyze_feedback_node(state: ProjectUpdateState) -> Dict:
@@ -36,11 +40,11 @@ class ProjectUpdatePipeline:
                 state["project_artifacts"],
                 state["user_feedback"],
             )
-            logger.info(f"Generated project suggestions: {suggestions.dict()}")
+            log_payload("Generated project suggestions: %s", suggestions)
             return {"suggestions": suggestions}
 
         async def update_project_node(state: ProjectUpdateState) -> Dict:
-            logger.info(f"Node: Updating project artifacts (Iteration {state['iteration']})...")
+            logger.info("Node: Updating project artifacts (Iteration %d)...", state['iteration'])
             suggestions_to_use = {}
             if state['iteration'] == 0:
                 if state.get("suggestions"):
@@ -61,14 +65,14 @@ class ProjectUpdatePipeline:
 
             updated_artifacts = await asyncio.to_thread(
                 self.refiner_agent.update,
-                json.dumps(state["project_artifacts"]),
+                compact_json(state["project_artifacts"]),
                 suggestions_to_use,
             )
             logger.info("Generated updated project artifacts for this iteration.")
             return {"project_artifacts": updated_artifacts}
 
         async def evaluate_update_node(state: ProjectUpdateState) -> Dict:
-            logger.info(f"Node: Evaluating updated project artifacts (Iteration {state['iteration']})...")
+            logger.info("Node: Evaluating updated project artifacts (Iteration %d)...", state['iteration'])
             suggestions_dict = state["suggestions"].dict() if state.get("suggestions") else {}
             evaluation = await asyncio.to_thread(
                 self.evaluator_agent.evaluate,
@@ -76,7 +80,7 @@ class ProjectUpdatePipeline:
                 state["project_artifacts"],
                 suggestions_dict,
             )
-            logger.info(f"Project evaluation result: {evaluation}")
+            log_payload("Project evaluation result: %s", evaluation)
             return {"evaluation": evaluation, "iteration": state["iteration"] + 1}
 
         def should_continue(state: ProjectUpdateState) -> str:
@@ -115,6 +119,8 @@ class ProjectUpdatePipeline:
         Executes the feedback analysis and project artifact refinement workflow.
         """
         logger.info("Starting project update pipeline...")
+        # Artifacts are JSON and cannot be cut, so an update that cannot fit is rejected before the first call.
+        check_input(self.llm, "ProjectUpdaterAgent", original_user_prompt, compact_json(project_artifacts), user_feedback)
         initial_state: ProjectUpdateState = {
             "original_user_prompt": original_user_prompt,
             "project_artifacts": project_artifacts,
@@ -124,5 +130,6 @@ class ProjectUpdatePipeline:
             "iteration": 0,
         }
         final_state = await self.graph.ainvoke(initial_state)
-        logger.info(f"Project update pipeline finished. Final artifacts: {final_state['project_artifacts']}")
+        logger.info("Project update pipeline finished.")
+        log_payload("Final artifacts: %s", final_state['project_artifacts'])
         return final_state['project_artifacts']
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from langchain_core.callbacks import get_usage_metadata_callback
+
+from src.logger import logger
+
+
+class SpeculationStats:
+    """Thread-safe tally of speculative integrations: how many were used or discarded, latency saved and tokens wasted."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = 0
+        self._used = 0
+        self._discarded = 0
+        self._saved_latency = 0.0
+        self._wasted_tokens = 0
+
+    def record_used(self, saved_latency: float) -> None:
+        with self._lock:
+            self._started += 1
+            self._used += 1
+            self._saved_latency += saved_latency
+
+    def record_discarded(self, wasted_tokens: int) -> None:
+        with self._lock:
+            self._started += 1
+            self._discarded += 1
+            self._wasted_tokens += wasted_tokens
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns speculations started, used and discarded, the hit rate, latency saved and tokens wasted so far."""
+        with self._lock:
+            return {
+                "speculations": self._started,
+                "used": self._used,
+                "discarded": self._discarded,
+                "hit_rate": round(self._used / self._started, 4) if self._started else 0.0,
+                "saved_latency_ms": round(1000 * self._saved_latency, 1),
+                "mean_saved_latency_ms": round(1000 * self._saved_latency / self._used, 1) if self._used else None,
+                "wasted_tokens": self._wasted_tokens,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._started = self._used = self._discarded = self._wasted_tokens = 0
+            self._saved_latency = 0.0
+
+
+speculation_stats = SpeculationStats()
+
+
+class Speculation:
+    """
+    A call started before the step that decides whether its result is needed.
+
+    ``call`` starts at once as a task on the running loop. :meth:`result`
+    awaits it and records the latency saved, i.e. the part of the call that
+    overlapped the deciding step (``decided`` marks its end);
+    :meth:`discard` cancels it and records the tokens it spent. Tokens come
+    from the provider's usage metadata, or from ``estimate(result)`` when
+    the provider reports none.
+    """
+
+    def __init__(self, call: Callable[[], Awaitable[Any]], estimate: Callable[[Optional[Any]], int]):
+        self.estimate = estimate
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.decided_at: Optional[float] = None
+        # The usage callback is context-scoped; the task copies the context, so it sees only this call's usage.
+        with get_usage_metadata_callback() as usage:
+            self.task = asyncio.create_task(call())
+        self.usage = usage
+        self.task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task) -> None:
+        self.finished = time.perf_counter()
+
+    def decided(self) -> None:
+        if self.decided_at is None:
+            self.decided_at = time.perf_counter()
+
+    async def result(self) -> Any:
+        """The call's result; raises what the call raised, after which the caller should :meth:`discard` it."""
+        result = await self.task
+        decided_at = self.decided_at or self.finished
+        speculation_stats.record_used(max(0.0, min(decided_at, self.finished) - self.started))
+        return result
+
+    def discard(self) -> None:
+        result = None
+        if self.task.done():
+            if not self.task.cancelled() and self.task.exception() is None:
+                result = self.task.result()
+        else:
+            self.task.cancel()
+        reported = sum(item.get("total_tokens", 0) for item in self.usage.usage_metadata.values())
+        wasted = reported or self.estimate(result)
+        speculation_stats.record_discarded(wasted)
+        logger.info("Discarded speculative result (about %d tokens spent)", wasted)
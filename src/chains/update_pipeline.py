@@ -1,9 +1,11 @@
-from langgraph.graph import StateGraph, END
 from typing import TypedDict, Optional, Dict, List, Any
 from src.agents.refine.feedback_analyzer_agent import FeedbackAnalyzerAgent, ReviewSuggestions
 from src.agents.refine.prompt_updater_agent import PromptUpdaterAgent
 from src.agents.refine.update_evaluator import UpdateEvaluator
-from src.logger import logger
+from src.agents.refine.prompt_edits import prompt_diff
+from src.agents.evaluate.heuristic_scorer import failure_summary, heuristic_gate
+from src.token_budget import check_input
+from src.logger import logger, log_payload
 import asyncio
 
 class UpdateState(TypedDict):
@@ -15,11 +17,13 @@ class UpdateState(TypedDict):
     framework: Optional[str]
     suggestions: Optional[ReviewSuggestions]
     evaluation: Optional[Dict]
+    last_diff: str
     iteration: int
 
 class UpdatePipeline:
     """A pipeline to update a prompt based on user feedback using a graph-based approach."""
     def __init__(self, llm: Any):
+        self.llm = llm
         self.max_iterations = 3
         self.review_agent = FeedbackAnalyzerAgent(llm=llm)
         self.refiner_agent = PromptUpdaterAgent(llm=llm)
@@ -27,6 +31,9 @@ class UpdatePipeline:
         self.graph = self._build_graph()
 
     def _build_graph(self):
+        # langgraph is the largest import on the startup path; load it with the first pipeline instead.
+        from langgraph.graph import StateGraph, END
+
         workflow = StateGraph(UpdateState)
 
         async def analyze_feedback_node(state: UpdateState) -> Dict:
@@ -39,11 +46,11 @@ class UpdatePipeline:
                 state["style"],
                 state["framework"],
             )
-            logger.info(f"Generated suggestions: {suggestions.dict()}")
+            log_payload("Generated suggestions: %s", suggestions)
             return {"suggestions": suggestions}
 
         async def update_prompt_node(state: UpdateState) -> Dict:
-            logger.info(f"Node: Updating prompt (Iteration {state['iteration']})...")
+            logger.info("Node: Updating prompt (Iteration %d)...", state['iteration'])
             suggestions_to_use = {}
             # On the first iteration, use the initial suggestions from the feedback analyzer.
             if state['iteration'] == 0:
@@ -63,7 +70,7 @@ class UpdatePipeline:
 
             if not suggestions_to_use:
                 logger.warning("No suggestions found to update prompt. Returning current prompt.")
-                return {"final_prompt": state["final_prompt"]}
+                return {"final_prompt": state["final_prompt"], "last_diff": ""}
 
             updated_prompt = await asyncio.to_thread(
                 self.refiner_agent.update,
@@ -72,11 +79,21 @@ class UpdatePipeline:
                 state["style"],
                 state["framework"],
             )
-            logger.info(f"Generated updated prompt for this iteration: {updated_prompt}")
-            return {"final_prompt": updated_prompt}
+            log_payload("Generated updated prompt for this iteration: %s", updated_prompt)
+            return {"final_prompt": updated_prompt, "last_diff": prompt_diff(state["final_prompt"], updated_prompt)}
 
         async def evaluate_update_node(state: UpdateState) -> Dict:
-            logger.info(f"Node: Evaluating updated prompt (Iteration {state['iteration']})...")
+            logger.info("Node: Evaluating updated prompt (Iteration %d)...", state['iteration'])
+            verdict, scores = heuristic_gate([state["final_prompt"]], state["original_prompt"])
+            # A clear pass only counts if this round actually changed the prompt.
+            if verdict == "fail" or (verdict == "pass" and state["last_diff"]):
+                logger.info("Heuristic gate: updated prompt clearly %s (score %s), skipping LLM evaluation", verdict, scores[0])
+                evaluation = {
+                    "status": "yes" if verdict == "pass" else "no",
+                    "summary": failure_summary({"updated prompt": state["final_prompt"]}, scores) if verdict == "fail" else None,
+                    "source": "heuristic",
+                }
+                return {"evaluation": evaluation, "iteration": state["iteration"] + 1}
             suggestions_dict = state["suggestions"].dict() if state.get("suggestions") else {}
             evaluation = await asyncio.to_thread(
                 self.evaluator_agent.evaluate,
@@ -85,8 +102,9 @@ class UpdatePipeline:
                 suggestions_dict,
                 state["style"],
                 state["framework"],
+                state["last_diff"],
             )
-            logger.info(f"Evaluation result: {evaluation}")
+            log_payload("Evaluation result: %s", evaluation)
             return {"evaluation": evaluation, "iteration": state["iteration"] + 1}
 
         def should_continue(state: UpdateState) -> str:
@@ -127,6 +145,7 @@ class UpdatePipeline:
         Executes the feedback analysis and prompt refinement workflow.
         """
         logger.info("Starting prompt update pipeline...")
+        check_input(self.llm, "UpdatePipeline", original_prompt, final_prompt, user_feedback)
         initial_state: UpdateState = {
             "original_prompt": original_prompt,
             "final_prompt": final_prompt,
@@ -135,8 +154,10 @@ class UpdatePipeline:
             "framework": framework,
             "suggestions": None,
             "evaluation": None,
+            "last_diff": "",
             "iteration": 0,
         }
         final_state = await self.graph.ainvoke(initial_state)
-        logger.info(f"Update pipeline finished. Final prompt: {final_state['final_prompt']}")
+        logger.info("Update pipeline finished.")
+        log_payload("Final prompt: %s", final_state['final_prompt'])
         return final_state['final_prompt']
\ No newline at end of file
@@ -5,4 +5,134 @@ load_dotenv()
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
\ No newline at end of file
+MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY")
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+# Upper bound on any single logged string field (message, argument, traceback).
+LOG_FIELD_MAX_CHARS = int(os.getenv("LOG_FIELD_MAX_CHARS", "2000"))
+# Fraction of payload logs (full prompts, state dicts) that are actually emitted.
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.1"))
+
+
+def _usable_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS or Windows.
+        return os.cpu_count() or 1
+
+
+# Production server (server.py); PORT and WEB_CONCURRENCY follow the usual PaaS conventions. Without WEB_CONCURRENCY,
+# one worker per CPU this process may run on (os.cpu_count() reports the host's in a container), at most 4: every
+# worker holds its own copy of the app, and the work is mostly waiting on model APIs.
+SERVER_HOST = os.getenv("HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("PORT", "8000"))
+SERVER_WORKERS = int(os.getenv("WEB_CONCURRENCY", str(min(_usable_cpus(), 4))))
+SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", "5"))
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+
+# Server-key chat models kept by the pool (src/llm_clients.py), one per provider and Groq model; the least recently
+# used is dropped beyond this.
+LLM_POOL_MAX_MODELS = int(os.getenv("LLM_POOL_MAX_MODELS", "8"))
+
+# Startup warmup (src/warmup.py): per-provider connection timeout and the Groq model to pre-connect. Pooled Groq
+# models are per model name, so this should be the model most requests select (the frontend's default).
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "10"))
+WARMUP_GROQ_MODEL = os.getenv("WARMUP_GROQ_MODEL", "llama-3.1-8b-instant")
+
+# Blueprint generation in ProjectPipeline: "sectioned" builds each top-level section concurrently, "single" in one call.
+PROJECT_JSON_MODE = os.getenv("PROJECT_JSON_MODE", "sectioned")
+
+# ProjectUpdaterAgent: "patch" asks for RFC 6902 operations and applies them locally, "full" rewrites the artifacts.
+PROJECT_UPDATE_MODE = os.getenv("PROJECT_UPDATE_MODE", "patch")
+PROJECT_PATCH_MAX_RETRIES = int(os.getenv("PROJECT_PATCH_MAX_RETRIES", "2"))
+
+# PromptUpdaterAgent: "edits" asks for an anchored edit script and applies it locally, "full" rewrites the prompt.
+PROMPT_UPDATE_MODE = os.getenv("PROMPT_UPDATE_MODE", "edits")
+PROMPT_EDIT_MAX_RETRIES = int(os.getenv("PROMPT_EDIT_MAX_RETRIES", "1"))
+
+# Server-side session store (src/session_store.py) for the update endpoints.
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", os.path.join("data", "sessions.sqlite3"))
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(24 * 60 * 60)))
+SESSION_ZSTD_LEVEL = int(os.getenv("SESSION_ZSTD_LEVEL", "3"))
+
+# EvaluatePipeline default: "thorough" runs the three judges and the synthesis separately, "fast" fuses them into one call.
+EVALUATE_MODE = os.getenv("EVALUATE_MODE", "thorough")
+# The final verdict is aggregated locally unless narrative output is requested (or EVALUATE_NARRATIVE is set).
+EVALUATE_NARRATIVE = os.getenv("EVALUATE_NARRATIVE", "false").lower() in ("1", "true", "yes")
+# Judge weights ("judge=weight,...") and raw:calibrated 0-100 knots for the local aggregator.
+EVALUATE_SCORE_WEIGHTS = os.getenv("EVALUATE_SCORE_WEIGHTS", "llm_as_judge=1,t_rag=1,mar_framework=1")
+EVALUATE_SCORE_CALIBRATION = os.getenv("EVALUATE_SCORE_CALIBRATION", "0:0,100:100")
+
+# Heuristic pre-scorer gate in PromptPipeline/UpdatePipeline: skip the LLM evaluation when every prompt
+# scores at least HEURISTIC_PASS_SCORE and keeps at least HEURISTIC_PASS_COVERAGE (0-1) of the user's request's content
+# words, or when any scores at most HEURISTIC_FAIL_SCORE (0-100).
+HEURISTIC_GATE = os.getenv("HEURISTIC_GATE", "true").lower() in ("1", "true", "yes")
+HEURISTIC_PASS_SCORE = float(os.getenv("HEURISTIC_PASS_SCORE", "80"))
+HEURISTIC_PASS_COVERAGE = float(os.getenv("HEURISTIC_PASS_COVERAGE", "0.5"))
+HEURISTIC_FAIL_SCORE = float(os.getenv("HEURISTIC_FAIL_SCORE", "25"))
+
+# /evaluate/batch: prompts per request, judge calls in flight, and how small prompts are grouped into one fast-mode call.
+EVALUATE_BATCH_MAX_PROMPTS = int(os.getenv("EVALUATE_BATCH_MAX_PROMPTS", "100"))
+EVALUATE_BATCH_CONCURRENCY = int(os.getenv("EVALUATE_BATCH_CONCURRENCY", "4"))
+EVALUATE_BATCH_GROUP_SIZE = int(os.getenv("EVALUATE_BATCH_GROUP_SIZE", "5"))
+EVALUATE_BATCH_GROUP_CHARS = int(os.getenv("EVALUATE_BATCH_GROUP_CHARS", "2000"))
+
+# ProjectManiaPipeline review: "evaluate_first" evaluates each template before analyzing it, so passing drafts skip
+# analyze/refine; "concurrent" runs evaluate and analyze together, trading a wasted analyze on a pass for one fewer round trip.
+PROJECT_MANIA_REVIEW_MODE = os.getenv("PROJECT_MANIA_REVIEW_MODE", "evaluate_first")
+
+# Project Mania template library (src/template_library.py): finished templates are reused by later requests with the same
+# template type and length. Matches scoring SERVE_SIMILARITY on the intent with the same variables are served as-is; matches
+# scoring ADAPT_SIMILARITY overall get one adaptation call instead of the full graph (if TEMPLATE_LIBRARY_ADAPT is on).
+# The library is shared by every caller, so one user's templates can be served to another; it is off unless enabled
+# for a deployment whose users may see each other's templates.
+TEMPLATE_LIBRARY_ENABLED = os.getenv("TEMPLATE_LIBRARY_ENABLED", "false").lower() in ("1", "true", "yes")
+TEMPLATE_LIBRARY_DB_PATH = os.getenv("TEMPLATE_LIBRARY_DB_PATH", "data/template_library.sqlite3")
+TEMPLATE_LIBRARY_MAX_ENTRIES = int(os.getenv("TEMPLATE_LIBRARY_MAX_ENTRIES", "2000"))
+TEMPLATE_LIBRARY_MAX_TEMPLATE_CHARS = int(os.getenv("TEMPLATE_LIBRARY_MAX_TEMPLATE_CHARS", "20000"))
+TEMPLATE_LIBRARY_SERVE_SIMILARITY = float(os.getenv("TEMPLATE_LIBRARY_SERVE_SIMILARITY", "0.9"))
+TEMPLATE_LIBRARY_ADAPT_SIMILARITY = float(os.getenv("TEMPLATE_LIBRARY_ADAPT_SIMILARITY", "0.6"))
+TEMPLATE_LIBRARY_ADAPT = os.getenv("TEMPLATE_LIBRARY_ADAPT", "true").lower() in ("1", "true", "yes")
+
+# Token budgets (src/token_budget.py): output tokens reserved per call, per-agent overrides ("Agent=tokens,...", keyed by
+# agent class name; every agent's model is capped, so agents that write whole prompts, plans or blueprints get more),
+# extra output tokens for models whose thinking counts toward the output limit, and the share of the remaining context
+# window kept free to absorb token-estimate error.
+TOKEN_BUDGET_ENABLED = os.getenv("TOKEN_BUDGET_ENABLED", "true").lower() in ("1", "true", "yes")
+TOKEN_BUDGET_OUTPUT_TOKENS = int(os.getenv("TOKEN_BUDGET_OUTPUT_TOKENS", "4096"))
+TOKEN_BUDGET_AGENT_OUTPUT = os.getenv(
+    "TOKEN_BUDGET_AGENT_OUTPUT",
+    "RefineAgent=8192,FinalPrompt=8192,PromptUpdaterAgent=8192,PlannerAgent=8192,ArchitectAgent=8192,"
+    "JSONGeneratorAgent=16384,RefinementAgent=16384,ProjectUpdaterAgent=16384,GenericTemplateComposer=8192,"
+    "CrewAITemplateComposer=8192,AutogenTemplateComposer=8192,TemplateAdaptAgent=8192",
+)
+TOKEN_BUDGET_THINKING_TOKENS = int(os.getenv("TOKEN_BUDGET_THINKING_TOKENS", "8192"))
+TOKEN_BUDGET_SAFETY_MARGIN = float(os.getenv("TOKEN_BUDGET_SAFETY_MARGIN", "0.1"))
+
+# Context caching (src/prompt_cache.py) of the static prefix shared by the style/framework and evaluator templates: "off"
+# relies on the providers' implicit prefix caching, "local" simulates a provider cache in process (hit and latency
+# reporting without a provider), "gemini" creates Gemini cached content for prefixes of at least MIN_TOKENS tokens.
+PROMPT_CACHE_BACKEND = os.getenv("PROMPT_CACHE_BACKEND", "off")
+PROMPT_CACHE_TTL_SECONDS = int(os.getenv("PROMPT_CACHE_TTL_SECONDS", "3600"))
+PROMPT_CACHE_MIN_TOKENS = int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "1024"))
+
+# Per-stage model routing (src/model_routing.py): "stage=provider:model@temperature,..." by agent stage or group ("judges",
+# "pickers"). provider may be "request" (the request's provider), model "fast" (the provider's fast model) or "request";
+# stages without a route run on the request's model. Routes to another provider use the server keys and are skipped for
+# requests that bring their own key. PromptSchema.model_routes overrides entries per request; on the server keys an
+# override may only name "request", "fast", a model routed in MODEL_ROUTES or one listed in MODEL_ROUTE_OVERRIDE_MODELS.
+MODEL_ROUTING_ENABLED = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() in ("1", "true", "yes")
+MODEL_ROUTES = os.getenv("MODEL_ROUTES", "judges=request:fast@0,pickers=request:fast@0")
+MODEL_ROUTE_OVERRIDE_MODELS = os.getenv("MODEL_ROUTE_OVERRIDE_MODELS", "")
+
+# Style/framework agent cascade in PromptPipeline: "heuristic" or "judge" runs each agent on the "StyleCascade" stage model
+# (the request provider's fast model unless routed) and scores its prompt locally or with a one-number judge call on the
+# same model; prompts scoring below STYLE_CASCADE_THRESHOLD (0-100) are regenerated on the request's model. "off" disables it.
+STYLE_CASCADE = os.getenv("STYLE_CASCADE", "off")
+STYLE_CASCADE_THRESHOLD = float(os.getenv("STYLE_CASCADE_THRESHOLD", "70"))
+
+# Start FinalPrompt.integrate on PromptPipeline's first-round prompts while SelfCorrection evaluates them; the result
+# is used when they pass (or the iteration cap is reached) and discarded when they go to refinement.
+SPECULATIVE_INTEGRATE = os.getenv("SPECULATIVE_INTEGRATE", "false").lower() in ("1", "true", "yes")
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from src.config import GOOGLE_API_KEY, GROQ_API_KEY, MISTRAL_API_KEY, LLM_POOL_MAX_MODELS
+
+GEMINI_MODEL = "gemini-2.5-flash"
+MISTRAL_MODEL = "mistral-large-latest"
+# Small, fast model of each provider, for stages routed to "fast" (src/model_routing.py).
+FAST_MODELS = {"gemini": "gemini-2.5-flash-lite", "groq": "llama-3.1-8b-instant", "mistral": "mistral-small-latest"}
+TEMPERATURE = 0.7
+PROVIDERS = ("gemini", "groq", "mistral")
+SERVER_KEYS = {"gemini": GOOGLE_API_KEY, "groq": GROQ_API_KEY, "mistral": MISTRAL_API_KEY}
+
+
+def build_llm(provider: str, api_key: Optional[str], groq_model: Optional[str] = None) -> Any:
+    """Builds a chat model for ``provider``; the SDKs are imported on first use."""
+    if provider == "gemini":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(model=GEMINI_MODEL, google_api_key=api_key, temperature=TEMPERATURE)
+    if provider == "groq":
+        from langchain_groq import ChatGroq
+        return ChatGroq(model_name=groq_model, api_key=api_key, temperature=TEMPERATURE)
+    if provider == "mistral":
+        from langchain_mistralai import ChatMistralAI
+        return ChatMistralAI(model=MISTRAL_MODEL, api_key=api_key, temperature=TEMPERATURE)
+    raise ValueError(f"Unknown model provider: {provider}")
+
+
+async def _ping_gemini(llm: Any) -> None:
+    # Touching async_client inside the loop builds the asyncio gRPC channel;
+    # count_tokens is a free call that connects the sync channel.
+    llm.async_client
+    await asyncio.to_thread(llm.get_num_tokens, "ping")
+
+
+async def _ping_groq(llm: Any) -> None:
+    await asyncio.gather(
+        llm.async_client._client.models.list(),
+        asyncio.to_thread(llm.client._client.models.list),
+    )
+
+
+async def _ping_mistral(llm: Any) -> None:
+    responses = await asyncio.gather(
+        llm.async_client.get("/models"),
+        asyncio.to_thread(llm.client.get, "/models"),
+    )
+    for response in responses:
+        response.raise_for_status()
+
+
+_PINGS = {"gemini": _ping_gemini, "groq": _ping_groq, "mistral": _ping_mistral}
+
+
+class LLMPool:
+    """
+    Chat models built with the server keys, one per provider and model.
+
+    The models are stateless between calls, so every request that runs on the
+    server keys shares one instance and, with it, the SDK's connection pool.
+    Requests that bring their own key still get a fresh model. Groq model
+    names come from requests, so at most ``max_models`` are kept and the
+    least recently used is dropped first.
+    """
+
+    def __init__(self, max_models: int = LLM_POOL_MAX_MODELS):
+        self._lock = threading.Lock()
+        self.max_models = max(1, max_models)
+        self._llms: OrderedDict[Tuple[str, Optional[str]], Any] = OrderedDict()
+
+    def get(self, provider: str, groq_model: Optional[str] = None) -> Any:
+        key = (provider, groq_model if provider == "groq" else None)
+        with self._lock:
+            llm = self._llms.get(key)
+            if llm is None:
+                llm = self._llms[key] = build_llm(provider, SERVER_KEYS.get(provider), groq_model)
+                while len(self._llms) > self.max_models:
+                    self._llms.popitem(last=False)
+            else:
+                self._llms.move_to_end(key)
+        return llm
+
+    async def connect(self, provider: str, groq_model: Optional[str] = None) -> None:
+        """Builds the pooled model and opens its connections with a cheap metadata call."""
+        await _PINGS[provider](self.get(provider, groq_model))
+
+
+llm_pool = LLMPool()
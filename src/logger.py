@@ -1,30 +1,97 @@
 import os
 import sys
+import json
+import atexit
+import queue
+import random
 import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from src.config import (
+    LOG_LEVEL,
+    LOG_MAX_BYTES,
+    LOG_BACKUP_COUNT,
+    LOG_FIELD_MAX_CHARS,
+    LOG_PAYLOAD_SAMPLE_RATE,
+)
 
 logging_str = "[%(asctime)s: %(levelname)s: %(module)s: %(message)s]"
 log_dir = "logs"
 log_filepath = os.path.join(log_dir, "running_logs.log")
 os.makedirs(log_dir, exist_ok=True)
 
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def truncate(value, limit: int = LOG_FIELD_MAX_CHARS) -> str:
+    """Returns ``str(value)`` capped at ``limit`` characters."""
+    text = value if isinstance(value, str) else str(value)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}...[truncated {len(text) - limit} chars]"
+
+
+def _cap(arg):
+    # Only strings are capped here; other types keep their own formatting (%r, %d, %.2f, ...).
+    # The merged message is capped as a whole afterwards.
+    return truncate(arg) if isinstance(arg, str) else arg
+
+
+class TruncatingQueueHandler(QueueHandler):
+    """
+    Hands records to a background listener thread.
+
+    Only the message merge happens on the calling thread, with string
+    arguments capped first and the merged message after, so a single
+    oversized payload cannot flood the log.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if isinstance(record.args, dict):
+            record.args = {key: _cap(value) for key, value in record.args.items()}
+        elif record.args:
+            record.args = tuple(_cap(arg) for arg in record.args)
+        record = super().prepare(record)
+        record.msg = truncate(record.msg)
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects with capped field sizes."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "module": record.module,
+            "func": record.funcName,
+            "line": record.lineno,
+            "msg": truncate(record.getMessage()),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and key not in entry:
+                entry[key] = value if isinstance(value, (bool, int, float)) else truncate(value)
+        return json.dumps(entry, ensure_ascii=False)
+
+
 # Get the root logger
 logger = logging.getLogger("NextStep-AI Logger")
-logger.setLevel(logging.INFO)
+logger.setLevel(LOG_LEVEL)
 
 # Prevent adding handlers multiple times
-if not logger.handlers:
-    # Create a formatter
-    formatter = logging.Formatter(logging_str)
+def _file_handler(path: str) -> RotatingFileHandler:
+    # Rotating file handler with one JSON record per line, UTF-8 encoded
+    handler = RotatingFileHandler(path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+    handler.setFormatter(JsonFormatter())
+    return handler
+
 
-    # File handler with UTF-8 encoding
-    file_handler = logging.FileHandler(log_filepath, encoding='utf-8')
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+if not logger.handlers:
+    file_handler = _file_handler(log_filepath)
 
     # Console stream handler with error replacement
     # This is a robust way to handle potential encoding issues on Windows
     stream_handler = logging.StreamHandler(sys.stdout)
-    stream_handler.setFormatter(formatter)
+    stream_handler.setFormatter(logging.Formatter(logging_str))
     if sys.platform == "win32":
         try:
             sys.stdout.reconfigure(encoding='utf-8')
@@ -32,4 +99,45 @@ if not logger.handlers:
             # In some environments (like certain IDEs), reconfigure might not be available.
             # The default error handler will be used.
             pass
-    logger.addHandler(stream_handler)
+
+    # Disk and console writes happen on the listener thread, never on the event loop.
+    queue_handler = TruncatingQueueHandler(queue.SimpleQueue())
+    listener = QueueListener(queue_handler.queue, file_handler, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(lambda: flush_logs())
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    def _restart_listener():
+        # A forked worker inherits the queue but not the listener thread. It also writes to a file of its
+        # own (running_logs.<pid>.log): RotatingFileHandler rollover is not safe across processes.
+        global listener, file_handler
+        inherited = file_handler
+        file_handler = _file_handler(os.path.join(log_dir, f"running_logs.{os.getpid()}.log"))
+        inherited.close()
+        handlers = [file_handler if handler is inherited else handler for handler in listener.handlers]
+        queue_handler.queue = queue.SimpleQueue()
+        listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        listener.start()
+
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_restart_listener)
+
+
+def flush_logs() -> None:
+    """Drains queued records and stops the listener thread; for processes exiting via ``os._exit``. Safe to call twice."""
+    if listener._thread is not None:
+        listener.stop()
+
+
+def log_payload(msg: str, *args, level: int = logging.INFO) -> None:
+    """
+    Logs a large payload (prompt text, state dict) lazily.
+
+    Nothing is formatted unless the level is enabled and the record survives
+    sampling at ``LOG_PAYLOAD_SAMPLE_RATE``; arguments are truncated before they
+    are queued.
+    """
+    if not logger.isEnabledFor(level) or random.random() >= LOG_PAYLOAD_SAMPLE_RATE:
+        return
+    logger.log(level, msg, *args, extra={"payload": True}, stacklevel=2)
@@ -0,0 +1,238 @@
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.config import MODEL_ROUTE_OVERRIDE_MODELS, MODEL_ROUTES, MODEL_ROUTING_ENABLED
+from src.llm_clients import FAST_MODELS, PROVIDERS, SERVER_KEYS, llm_pool
+from src.logger import logger
+from src.token_budget import model_key, token_counter
+
+# Group of each stage that has one; a route for the group applies to every stage in it without a route of its own.
+STAGE_GROUPS = {
+    "SelfCorrection": "judges",
+    "LLMAsJudgeAgent": "judges",
+    "TRAGAgent": "judges",
+    "MARFrameworkAgent": "judges",
+    "FusedJudgeAgent": "judges",
+    "TemplateEvaluateAgent": "judges",
+    "PickAgent": "pickers",
+    "RouterAgent": "pickers",
+    "GenericTemplateComposer": "composers",
+    "CrewAITemplateComposer": "composers",
+    "AutogenTemplateComposer": "composers",
+}
+
+# Model-name field of each provider's chat model.
+MODEL_FIELDS = {"gemini": "model", "groq": "model_name", "mistral": "model"}
+
+# Estimated list price in USD per million (input, output) tokens, by model-name prefix; the longest matching prefix wins.
+# Models without an entry are reported without a cost.
+PRICES = {
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "llama-3.1-8b": (0.05, 0.08),
+    "llama3-8b": (0.05, 0.08),
+    "llama-3.3-70b": (0.59, 0.79),
+    "llama3-70b": (0.59, 0.79),
+    "meta-llama/llama-4-scout": (0.11, 0.34),
+    "meta-llama/llama-4-maverick": (0.20, 0.60),
+    "gemma2-9b": (0.20, 0.20),
+    "openai/gpt-oss-20b": (0.10, 0.50),
+    "openai/gpt-oss-120b": (0.15, 0.75),
+    "mistral-small": (0.10, 0.30),
+    "mistral-medium": (0.40, 2.00),
+    "mistral-large": (2.00, 6.00),
+}
+
+
+class Route(NamedTuple):
+    """Where a stage runs: ``provider`` and ``model`` may be "request"; ``model`` may also be "fast"."""
+
+    provider: str
+    model: str
+    temperature: Optional[float]
+
+
+def parse_route(spec: str) -> Route:
+    """Parses ``"groq:llama-3.1-8b-instant@0.2"``, ``"request:fast"`` or ``"request"`` into a :class:`Route`."""
+    spec, _, temperature = spec.strip().partition("@")
+    provider, _, model = spec.partition(":")
+    provider, model = provider.strip() or "request", model.strip() or "request"
+    if provider != "request" and provider not in PROVIDERS:
+        raise ValueError(f"Unknown provider in model route: {provider}")
+    return Route(provider, model, float(temperature) if temperature.strip() else None)
+
+
+def parse_routes(spec: str) -> Dict[str, Route]:
+    """Parses ``"judges=request:fast@0,FinalPrompt=gemini:gemini-2.5-pro"`` into routes per stage or group."""
+    routes = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        stage, _, route = item.partition("=")
+        routes[stage.strip()] = parse_route(route)
+    return routes
+
+
+ROUTES = parse_routes(MODEL_ROUTES)
+
+# Models a per-request override may name when the request runs on the server keys: the fast models, the ones the
+# server already routes to and MODEL_ROUTE_OVERRIDE_MODELS. "request" and "fast" are always allowed.
+OVERRIDE_MODELS = (
+    set(FAST_MODELS.values())
+    | {route.model for route in ROUTES.values()}
+    | {model.strip() for model in MODEL_ROUTE_OVERRIDE_MODELS.split(",") if model.strip()}
+) - {"request", "fast"}
+
+
+def parse_override(spec: str, server_keys: bool) -> Route:
+    """Parses a per-request route; on the server keys its model must be "request", "fast" or in :data:`OVERRIDE_MODELS`."""
+    route = parse_route(spec)
+    model = route.model.replace("models/", "", 1)
+    if server_keys and model not in ("request", "fast") and model not in OVERRIDE_MODELS:
+        raise ValueError(
+            f"Model {route.model} cannot be routed to without your own API key; "
+            f"use \"request\", \"fast\" or one of: {', '.join(sorted(OVERRIDE_MODELS))}"
+        )
+    return route
+
+
+def price(model: str) -> Optional[tuple]:
+    matches = [prefix for prefix in PRICES if model.lower().startswith(prefix)]
+    return PRICES[max(matches, key=len)] if matches else None
+
+
+class StageStats:
+    """Thread-safe tally, per stage and model, of model calls, latency, tokens and estimated cost."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # calls, latency, input tokens, output tokens, cost (None once a call had no known price)
+        self._totals: Dict[str, Dict[str, List]] = {}
+
+    def record(self, stage: str, model: str, latency: float, input_tokens: int, output_tokens: int) -> None:
+        rates = price(model)
+        cost = (input_tokens * rates[0] + output_tokens * rates[1]) / 1_000_000 if rates else None
+        with self._lock:
+            totals = self._totals.setdefault(stage, {}).setdefault(model, [0, 0.0, 0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += latency
+            totals[2] += input_tokens
+            totals[3] += output_tokens
+            totals[4] = totals[4] + cost if cost is not None and totals[4] is not None else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Returns calls, mean latency, tokens and estimated cost in USD for every stage and model seen so far."""
+        with self._lock:
+            return {
+                stage: {
+                    model: {
+                        "calls": calls,
+                        "mean_latency_ms": round(1000 * latency / calls, 1),
+                        "input_tokens": input_tokens,
+                        "output_tokens": output_tokens,
+                        "estimated_cost_usd": round(cost, 6) if cost is not None else None,
+                    }
+                    for model, (calls, latency, input_tokens, output_tokens, cost) in sorted(models.items())
+                }
+                for stage, models in sorted(self._totals.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+stage_stats = StageStats()
+
+
+class StageRecorder(BaseCallbackHandler):
+    """Records every call of a routed model in :data:`stage_stats`; token counts are estimated when the provider omits them."""
+
+    run_inline = True
+
+    def __init__(self, stage: str, provider: str, model: str):
+        self.stage = stage
+        self.model = model
+        self.count = token_counter(provider, model)
+        self._started: Dict[UUID, tuple] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any) -> None:
+        text = "\n".join(str(message.content) for batch in messages for message in batch)
+        self._started[run_id] = (time.perf_counter(), text)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        started, prompt = self._started.pop(run_id, (None, ""))
+        if started is None:
+            return
+        generation = response.generations[0][0] if response.generations and response.generations[0] else None
+        message = getattr(generation, "message", None)
+        usage = getattr(message, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens") or self.count(prompt)
+        output_tokens = usage.get("output_tokens") or self.count(generation.text if generation else "")
+        stage_stats.record(self.stage, self.model, time.perf_counter() - started, input_tokens, output_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started.pop(run_id, None)
+
+
+class ModelRouter:
+    """
+    Chat model for each stage of a request.
+
+    Routes come from MODEL_ROUTES, with ``overrides`` (stage or group to
+    route spec) on top; a stage without a route, or with one that cannot be
+    served, runs on the request's model. Routes within the request's provider
+    are copies of its model, sharing its key and connections. Routes to
+    another provider use the pooled server-key models, and only when
+    ``server_keys`` is True, so a request that brings its own key is never
+    billed to the server's; overrides on the server keys are limited to
+    :data:`OVERRIDE_MODELS` (see :func:`parse_override`). Every stage model
+    records its calls in :data:`stage_stats`.
+    """
+
+    def __init__(self, llm: Any, overrides: Optional[Dict[str, str]] = None, server_keys: bool = False):
+        self.llm = llm
+        self.provider = model_key(llm)[0]
+        self.server_keys = server_keys
+        self.routes = dict(ROUTES) if MODEL_ROUTING_ENABLED else {}
+        self.routes.update({stage: parse_override(spec, server_keys) for stage, spec in (overrides or {}).items()})
+        self._models: Dict[str, Any] = {}
+
+    def route(self, stage: str) -> Optional[Route]:
+        return self.routes.get(stage) or self.routes.get(STAGE_GROUPS.get(stage, ""))
+
+    def llm_for(self, stage: str, default: Optional[Route] = None) -> Any:
+        """The model for ``stage``; ``default`` is its route when neither the stage nor its group has one."""
+        if self.llm is None:
+            return None
+        llm = self._models.get(stage)
+        if llm is None:
+            llm = self._models[stage] = self._build(stage, self.route(stage) or default)
+        return llm
+
+    def _build(self, stage: str, route: Optional[Route]) -> Any:
+        base, provider, update = self.llm, self.provider, {}
+        if route is not None:
+            if route.provider not in ("request", self.provider):
+                if not self.server_keys or not SERVER_KEYS.get(route.provider):
+                    logger.info("%s: route to %s skipped, no server key applies to this request", stage, route.provider)
+                    route = None
+                else:
+                    provider = route.provider
+                    # Pooled Groq models are per model name; the others are re-pointed below.
+                    groq_model = FAST_MODELS["groq"] if route.model in ("request", "fast") else route.model
+                    base = llm_pool.get(provider, groq_model if provider == "groq" else None)
+        if route is not None:
+            model = FAST_MODELS.get(provider) if route.model == "fast" else None if route.model == "request" else route.model
+            field = MODEL_FIELDS.get(provider)
+            fields = getattr(type(base), "model_fields", {})
+            if model and field in fields:
+                update[field] = f"models/{model}" if provider == "gemini" and not model.startswith("models/") else model
+            if route.temperature is not None and "temperature" in fields:
+                update["temperature"] = route.temperature
+        model_name = str(update.get(MODEL_FIELDS.get(provider), "") or model_key(base)[1] or provider).replace("models/", "", 1)
+        update["callbacks"] = [StageRecorder(stage, provider, model_name)]
+        return base.model_copy(update=update)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from pydantic import BaseModel, Field, validator
+from typing import List, Optional, Literal
 
 
 class EvaluatePipelineInput(BaseModel):
@@ -19,6 +19,14 @@ class EvaluatePipelineInput(BaseModel):
     api_key: Optional[str] = Field(None, description="User's encrypted API key for the LLM.")
     password: Optional[str] = Field(None, description="Password to decrypt the user's API key."
     )
+    mode: Optional[Literal["heuristic", "fast", "thorough"]] = Field(
+        None,
+        description="'heuristic' scores locally without a model, 'fast' scores all rubrics in one call, 'thorough' runs each judge separately. Defaults to EVALUATE_MODE."
+    )
+    narrative: Optional[bool] = Field(
+        None,
+        description="Ask a model to write the final verdict instead of aggregating the judges' scores locally. Defaults to EVALUATE_NARRATIVE."
+    )
 
 
 class LLMAsJudgeOutput(BaseModel):
@@ -67,6 +75,29 @@ class FinalEvaluationOutput(BaseModel):
     report: str = Field(..., description="A detailed breakdown of the scores from each evaluation framework.")
 
 
+class JudgeScores(BaseModel):
+    """
+    The three judges' results, as returned by the fused judge when the verdict is aggregated locally.
+    """
+    llm_as_judge: LLMAsJudgeOutput
+    t_rag: TRAGOutput
+    mar_framework: MARFrameworkOutput
+
+
+class GroupedJudgeItem(JudgeScores):
+    """
+    One candidate's scores in a grouped judge call.
+    """
+    id: int = Field(..., description="The candidate number the scores belong to.")
+
+
+class GroupedJudgeScores(BaseModel):
+    """
+    The judges' scores for every candidate of a grouped judge call.
+    """
+    items: List[GroupedJudgeItem]
+
+
 class FullEvaluationResult(BaseModel):
     """
     A comprehensive model holding all intermediate and final results.
@@ -75,3 +106,53 @@ class FullEvaluationResult(BaseModel):
     t_rag: TRAGOutput
     mar_framework: MARFrameworkOutput
     final_evaluation: FinalEvaluationOutput
+
+
+class EvaluateBatchInput(BaseModel):
+    """
+    Input for evaluating many candidate prompts against the same goal.
+    """
+    prompts: List[str] = Field(..., min_length=1, description="The candidate prompts to evaluate and rank.")
+    labels: Optional[List[str]] = Field(
+        None,
+        description="Optional: a label per prompt (e.g. the style/framework combination that produced it)."
+    )
+    initial_prompt: Optional[str] = Field(
+        None,
+        description="Optional: The original, un-refined prompt shared by all candidates."
+    )
+    mode: Optional[Literal["heuristic", "fast", "thorough"]] = Field(None, description="Evaluation mode for every candidate. Defaults to EVALUATE_MODE.")
+    narrative: Optional[bool] = Field(None, description="Ask a model to write each final verdict. Defaults to EVALUATE_NARRATIVE.")
+    selected_model: Optional[Literal["gemini", "mistral", "groq"]] = Field('gemini', description="The selected model provider.")
+    selected_groq_model: Optional[str] = Field(None, description="The selected Groq model, if applicable.")
+    api_key: Optional[str] = Field(None, description="User's encrypted API key for the LLM.")
+    password: Optional[str] = Field(None, description="Password to decrypt the user's API key.")
+
+    @validator("labels")
+    def labels_match_prompts(cls, v, values):
+        if v is not None and len(v) != len(values.get("prompts") or []):
+            raise ValueError("labels must have one entry per prompt.")
+        return v
+
+
+class BatchEvaluationItem(BaseModel):
+    """
+    The evaluation of one candidate in a batch, or the error that prevented it.
+    """
+    index: int = Field(..., description="Position of the prompt in the request.")
+    label: Optional[str] = None
+    evaluation: Optional[FullEvaluationResult] = None
+    error: Optional[str] = None
+
+
+class BatchRankingRow(BaseModel):
+    """
+    One row of the ranked batch table, best candidate first.
+    """
+    rank: int
+    index: int
+    label: Optional[str] = None
+    final_score: float
+    llm_as_judge: float = Field(..., description="LLM-as-a-Judge overall score (1-10).")
+    t_rag: float = Field(..., description="T-RAG overall score (1-10).")
+    mar_framework: float = Field(..., description="MAR overall score (1-10).")
@@ -7,6 +7,7 @@ class ProjectManiaSchema(BaseModel):
     variables: List[str] = Field(..., description="List of variables to include in the template.")
     template_type: Literal["general", "crewai", "autogen"] = Field(..., description="The type of template to generate.")
     prompt_length: Literal["low", "medium", "high"] = Field("medium", description="Desired length/verbosity of the generated template.")
+    use_template_library: bool = Field(True, description="Reuse or adapt a matching template from the library instead of generating one, when the server has TEMPLATE_LIBRARY_ENABLED.")
     api_key: Optional[str] = Field(None, description="User's API key.")
     password: Optional[str] = Field(None, description="Password to decrypt the API key.")
     selected_model: Optional[str] = Field("gemini", description="Selected LLM provider.")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import Any, List, Optional, Literal
 
 
 class ProjectManagerInput(BaseModel):
@@ -8,7 +8,7 @@ class ProjectManagerInput(BaseModel):
     api_key: Optional[str] = Field(None, description="API key for the selected model provider.")
     password: Optional[str] = Field(None, description="Password for decrypting the API key.")
     selected_model: Optional[str] = Field("gemini", description="The model provider to use (e.g., 'gemini', 'groq', 'mistral').")
-    selected_groq_model: Optional[str] = Field("llama3-8b-8192", description="The specific Groq model to use.")
+    selected_groq_model: Optional[str] = Field("llama-3.1-8b-instant", description="The specific Groq model to use.")
     
     user_input: str = Field(..., description="The user's core idea or problem statement for the project.")
     objective: Optional[str] = Field(None, description="The goal of the project.")
@@ -27,4 +27,14 @@ class ProjectManagerInput(BaseModel):
     milestones: Optional[str] = Field(None, description="Key milestones or phases in the project.")
     requirements: Optional[str] = Field(None, description="Specific requirements or specifications for the project.")
     team: Optional[str] = Field(None, description="The team members involved and their roles.")
-    context: Optional[str] = Field(None, description="Optional background context for the task.")
\ No newline at end of file
+    context: Optional[str] = Field(None, description="Optional background context for the task.")
+
+class ProjectBlueprint(BaseModel):
+    """The project blueprint produced by the JSON generator and refinement agents."""
+    appName: str = Field(..., description="A suitable name for the application.")
+    description: str = Field(..., description="A detailed description of the application's purpose and functionality.")
+    userRoles: List[Any] = Field(..., description="The user roles with brief descriptions.")
+
+    class Config:
+        # Scope-dependent sections (techStack, features, uiDesign, ...) are kept as-is.
+        extra = "allow"
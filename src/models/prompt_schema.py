@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, validator, root_validator
 from typing import List, Literal, Optional, Dict, Any
 import json
+from src.model_routing import parse_override
 
 class PromptSchema(BaseModel):
     """Pydantic model for prompt refinement input and output."""
@@ -27,6 +28,16 @@ class PromptSchema(BaseModel):
     examples: Optional[List[Dict[str, str]]] = Field([], description="List of example input-output pairs.")
     selected_model: Literal["gemini", "mistral", "groq"] = Field(..., description="The selected model provider.")
     selected_groq_model: Optional[str] = Field(None, description="The selected Groq model, if applicable.")
+    session_id: Optional[str] = Field(None, description="Session the refined prompt was stored under; returned by /refine.")
+    version: Optional[int] = Field(None, description="Version of the stored prompt within the session.")
+    model_routes: Optional[Dict[str, str]] = Field(None, description="Per-stage model routes for this request, e.g. {\"judges\": \"request:fast@0\", \"FinalPrompt\": \"gemini:gemini-2.5-pro\"}; added to MODEL_ROUTES. Without api_key, only \"request\", \"fast\" and the server's allowed models may be named.")
+
+    @validator("model_routes")
+    def validate_model_routes(cls, v, values):
+        # Without an API key of its own the request runs on the server keys, which only serve the allowed models.
+        for spec in (v or {}).values():
+            parse_override(spec, server_keys=not values.get("api_key"))
+        return v
 
     class Config:
         json_encoders = {
@@ -35,8 +46,8 @@ class PromptSchema(BaseModel):
 
 class UpdatePromptSchema(BaseModel):
     """Pydantic model for the prompt update request."""
-    original_prompt: str = Field(..., description="The initial user prompt text.")
-    final_prompt: str = Field(..., description="The prompt generated by the LLM that the user wants to refine.")
+    original_prompt: Optional[str] = Field(None, description="The initial user prompt text. May be omitted when session_id is given.")
+    final_prompt: Optional[str] = Field(None, description="The prompt generated by the LLM that the user wants to refine. May be omitted when session_id is given.")
     user_feedback: str = Field(..., description="The user's free-text feedback for improvement.")
     style: Optional[List[str]] = Field(None, description="List of prompt refinement styles to apply.")
     framework: Optional[str] = Field(None, description="The single prompt refinement framework to apply.")
@@ -44,17 +55,27 @@ class UpdatePromptSchema(BaseModel):
     password: Optional[str] = Field(None, description="Password to decrypt the user's API key.")
     selected_model: Optional[Literal["gemini", "mistral", "groq"]] = Field('gemini', description="The selected model provider.")
     selected_groq_model: Optional[str] = Field(None, description="The selected Groq model, if applicable.")
+    session_id: Optional[str] = Field(None, description="Session returned by /refine or a previous update; omitted fields are loaded from it.")
+    version: Optional[int] = Field(None, description="Version within the session to start from; defaults to the latest.")
+
+    @root_validator(skip_on_failure=True)
+    def require_prompts_or_session(cls, values):
+        if not values.get("session_id") and (values.get("original_prompt") is None or values.get("final_prompt") is None):
+            raise ValueError("original_prompt and final_prompt are required unless session_id is given.")
+        return values
 
 
 class UpdateProjectSchema(BaseModel):
     """Pydantic model for the project update request."""
-    original_user_prompt: str = Field(..., description="The initial high-level user requirement.")
-    project_artifacts: Dict[str, Any] = Field(..., description="The JSON object containing the current project architecture and plan.")
+    original_user_prompt: Optional[str] = Field(None, description="The initial high-level user requirement. May be omitted when session_id is given.")
+    project_artifacts: Optional[Dict[str, Any]] = Field(None, description="The JSON object containing the current project architecture and plan. May be omitted when session_id is given.")
     user_feedback: str = Field(..., description="The user's free-text feedback for improvement.")
     api_key: Optional[str] = Field(None, description="User's encrypted API key for the LLM.")
     password: Optional[str] = Field(None, description="Password to decrypt the user's API key.")
     selected_model: Optional[Literal["gemini", "mistral", "groq"]] = Field('gemini', description="The selected model provider.")
     selected_groq_model: Optional[str] = Field(None, description="The selected Groq model, if applicable.")
+    session_id: Optional[str] = Field(None, description="Session returned by /project or a previous update; omitted fields are loaded from it.")
+    version: Optional[int] = Field(None, description="Version within the session to start from; defaults to the latest.")
 
     @validator('project_artifacts', pre=True)
     def parse_project_artifacts(cls, v):
@@ -65,6 +86,12 @@ class UpdateProjectSchema(BaseModel):
                 raise ValueError("project_artifacts must be a valid JSON string or a dictionary.")
         return v
 
+    @root_validator(skip_on_failure=True)
+    def require_artifacts_or_session(cls, values):
+        if not values.get("session_id") and (values.get("original_user_prompt") is None or values.get("project_artifacts") is None):
+            raise ValueError("original_user_prompt and project_artifacts are required unless session_id is given.")
+        return values
+
 class PickAgentSchema(BaseModel):
     """Pydantic model for the /pick_agent endpoint."""
     user_input: str
@@ -0,0 +1,256 @@
+import hashlib
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import HumanMessage
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import Runnable, RunnableLambda
+
+from src.config import PROMPT_CACHE_BACKEND, PROMPT_CACHE_MIN_TOKENS, PROMPT_CACHE_TTL_SECONDS
+from src.logger import logger
+from src.token_budget import count_tokens, model_key
+
+# A cache entry is recreated this long before it expires, so no request is sent with an expiring handle.
+REFRESH_MARGIN_SECONDS = 60
+# After a failed cache creation the prefix is sent inline for this long before creation is tried again.
+FAILURE_BACKOFF_SECONDS = 300
+
+
+def _digest(prefix: str) -> str:
+    return hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+
+
+class ContextCache:
+    """No explicit caching: every prompt is sent whole and the provider's implicit prefix cache, if any, applies."""
+
+    name = "off"
+
+    def resolve(self, llm: Any, prefix: str) -> Tuple[Optional[str], int]:
+        """
+        ``(handle, simulated_cached_tokens)`` for sending ``prefix`` to ``llm``.
+
+        A handle names provider-side cached content that replaces the prefix
+        in the request; None means the prefix is sent inline.
+        """
+        return None, 0
+
+    def invalidate(self, llm: Any, prefix: str) -> None:
+        pass
+
+
+class LocalContextCache(ContextCache):
+    """
+    In-process stand-in for a provider context cache.
+
+    Prompts are still sent whole, but a prefix sent to the same model within
+    ``ttl`` seconds is reported as a cache hit of its full length, so hit
+    rates and the reporting can be exercised without a provider cache.
+    """
+
+    name = "local"
+
+    def __init__(self, ttl: int = PROMPT_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._expiry: Dict[Tuple[str, str, str], float] = {}
+
+    def resolve(self, llm: Any, prefix: str) -> Tuple[Optional[str], int]:
+        key = (*model_key(llm), _digest(prefix))
+        now = time.time()
+        with self._lock:
+            hit = self._expiry.get(key, 0) > now
+            self._expiry[key] = now + self.ttl
+        return None, count_tokens(llm, prefix) if hit else 0
+
+    def invalidate(self, llm: Any, prefix: str) -> None:
+        with self._lock:
+            self._expiry.pop((*model_key(llm), _digest(prefix)), None)
+
+
+class GeminiContextCache(ContextCache):
+    """
+    Gemini cached content holding the static prefix as the system instruction.
+
+    Created on first use per model and prefix and reused until shortly
+    before it expires. Prefixes under ``min_tokens`` (the API's minimum
+    cacheable size) and other providers' models are sent inline.
+    """
+
+    name = "gemini"
+
+    def __init__(self, ttl: int = PROMPT_CACHE_TTL_SECONDS, min_tokens: int = PROMPT_CACHE_MIN_TOKENS):
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], Tuple[Optional[str], float]] = {}
+        self._clients: Dict[str, Any] = {}
+
+    def resolve(self, llm: Any, prefix: str) -> Tuple[Optional[str], int]:
+        provider, model = model_key(llm)
+        if provider != "gemini" or count_tokens(llm, prefix) < self.min_tokens:
+            return None, 0
+        key = (model, _digest(prefix))
+        with self._lock:
+            name, expires = self._entries.get(key, (None, 0))
+            if expires - REFRESH_MARGIN_SECONDS > time.time():
+                return name, 0
+            try:
+                name, expires = self._create(llm, model, prefix, key[1]), time.time() + self.ttl
+                logger.info("Created Gemini cached content %s for a %d-character prefix", name, len(prefix))
+            except Exception as e:
+                logger.warning("Gemini cached content creation failed, sending the prefix inline: %s", e)
+                name, expires = None, time.time() + FAILURE_BACKOFF_SECONDS
+            self._entries[key] = (name, expires)
+        return name, 0
+
+    def _create(self, llm: Any, model: str, prefix: str, digest: str) -> str:
+        from google.ai import generativelanguage_v1beta as genai
+
+        api_key = llm.google_api_key.get_secret_value()
+        client = self._clients.get(api_key)
+        if client is None:
+            client = self._clients[api_key] = genai.CacheServiceClient(client_options={"api_key": api_key})
+        cached = client.create_cached_content(cached_content=genai.CachedContent(
+            model=f"models/{model}",
+            display_name=f"promptnova-{digest[:16]}",
+            system_instruction=genai.Content(parts=[genai.Part(text=prefix)]),
+            ttl=timedelta(seconds=self.ttl),
+        ))
+        return cached.name
+
+    def invalidate(self, llm: Any, prefix: str) -> None:
+        with self._lock:
+            self._entries.pop((model_key(llm)[1], _digest(prefix)), None)
+
+
+BACKENDS = {"off": ContextCache, "local": LocalContextCache, "gemini": GeminiContextCache}
+
+
+def build_context_cache(backend: str) -> ContextCache:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PROMPT_CACHE_BACKEND: {backend} (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[backend]()
+
+
+context_cache = build_context_cache(PROMPT_CACHE_BACKEND)
+
+
+class CacheStats:
+    """Thread-safe tally, per agent, of prompt tokens served from a cache and of call latency on hits and misses."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # calls, hits, prompt tokens, cached tokens, hit latency, miss latency
+        self._totals: Dict[str, List[float]] = {}
+
+    def record(self, agent: str, prompt_tokens: int, cached_tokens: int, latency: float) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(agent, [0, 0, 0, 0, 0.0, 0.0])
+            totals[0] += 1
+            totals[2] += prompt_tokens
+            totals[3] += cached_tokens
+            if cached_tokens:
+                totals[1] += 1
+                totals[4] += latency
+            else:
+                totals[5] += latency
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Returns calls, cache hits, cached token share and mean latency on hits and misses for every agent seen so far."""
+        with self._lock:
+            return {
+                agent: {
+                    "calls": calls,
+                    "hits": hits,
+                    "hit_rate": round(hits / calls, 4) if calls else 0.0,
+                    "prompt_tokens": prompt_tokens,
+                    "cached_tokens": cached_tokens,
+                    "cached_ratio": round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0,
+                    "mean_latency_ms": round(1000 * (hit_latency + miss_latency) / calls, 1) if calls else 0.0,
+                    "mean_hit_latency_ms": round(1000 * hit_latency / hits, 1) if hits else None,
+                    "mean_miss_latency_ms": round(1000 * miss_latency / (calls - hits), 1) if calls > hits else None,
+                }
+                for agent, (calls, hits, prompt_tokens, cached_tokens, hit_latency, miss_latency)
+                in sorted(self._totals.items())
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+cache_stats = CacheStats()
+
+
+def _cached_tokens(message: Any) -> int:
+    # LangChain's normalized usage first, then Groq's raw prompt_tokens_details.
+    usage = getattr(message, "usage_metadata", None) or {}
+    cached = (usage.get("input_token_details") or {}).get("cache_read")
+    if cached:
+        return cached
+    token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+    return (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+
+
+class _CachedCall:
+    def __init__(self, agent: str, llm: Any, prefix: str, suffix: PromptTemplate):
+        self.agent = agent
+        self.llm = llm
+        self.prefix = prefix
+        self.suffix = suffix
+
+    def _prepare(self, values: Dict[str, Any]) -> Tuple[Any, Any, str, Optional[str], int]:
+        text = self.suffix.format(**values)
+        handle, simulated = context_cache.resolve(self.llm, self.prefix)
+        if handle is not None:
+            return self.llm.bind(cached_content=handle), [HumanMessage(content=text)], text, handle, simulated
+        return self.llm, self.prefix + text, text, None, simulated
+
+    def _record(self, message: Any, text: str, simulated: int, started: float) -> Any:
+        latency = time.perf_counter() - started
+        usage = getattr(message, "usage_metadata", None) or {}
+        prompt_tokens = usage.get("input_tokens") or count_tokens(self.llm, self.prefix + text)
+        cache_stats.record(self.agent, prompt_tokens, max(_cached_tokens(message), simulated), latency)
+        return message
+
+    def invoke(self, values: Dict[str, Any]) -> Any:
+        model, prompt, text, handle, simulated = self._prepare(values)
+        started = time.perf_counter()
+        try:
+            message = model.invoke(prompt)
+        except Exception as e:
+            if handle is None:
+                raise
+            logger.warning("%s: cached content %s was rejected, retrying inline: %s", self.agent, handle, e)
+            context_cache.invalidate(self.llm, self.prefix)
+            message = self.llm.invoke(self.prefix + text)
+        return self._record(message, text, simulated, started)
+
+    async def ainvoke(self, values: Dict[str, Any]) -> Any:
+        model, prompt, text, handle, simulated = self._prepare(values)
+        started = time.perf_counter()
+        try:
+            message = await model.ainvoke(prompt)
+        except Exception as e:
+            if handle is None:
+                raise
+            logger.warning("%s: cached content %s was rejected, retrying inline: %s", self.agent, handle, e)
+            context_cache.invalidate(self.llm, self.prefix)
+            message = await self.llm.ainvoke(self.prefix + text)
+        return self._record(message, text, simulated, started)
+
+
+def cached_chain(agent: str, llm: Any, prefix: str, suffix: str, **partial_variables: Any) -> Runnable:
+    """
+    ``prompt | llm`` for a template split into a static ``prefix`` and a dynamic ``suffix``.
+
+    ``prefix`` is sent verbatim and must be identical on every call, so that
+    provider prefix caches and the configured context cache can reuse it;
+    ``suffix`` is a template formatted with the input values. The runnable
+    returns the model's message and records cache hits and latency under
+    ``agent`` in :data:`cache_stats`.
+    """
+    call = _CachedCall(agent, llm, prefix, PromptTemplate.from_template(suffix, partial_variables=partial_variables))
+    return RunnableLambda(call.invoke, afunc=call.ainvoke, name=agent)
@@ -0,0 +1,279 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from src.config import SESSION_DB_PATH, SESSION_TTL_SECONDS, SESSION_ZSTD_LEVEL
+from src.logger import logger
+
+try:
+    import zstandard
+except ImportError:  # Blobs fall back to zlib; both codecs can be read back.
+    zstandard = None
+
+# How often (seconds) a write also sweeps expired sessions.
+EVICT_INTERVAL = 300
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    data BLOB NOT NULL,
+    raw_size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS version_fields (
+    session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    version INTEGER NOT NULL,
+    field TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES blobs(hash),
+    PRIMARY KEY (session_id, version, field)
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_last_access ON sessions(last_access);
+CREATE INDEX IF NOT EXISTS idx_version_fields_hash ON version_fields(hash);
+"""
+
+
+class SessionNotFound(KeyError):
+    """The session or version does not exist or has expired."""
+
+
+class SessionKindMismatch(ValueError):
+    """The session holds a different kind of payload (a prompt session sent to a project endpoint or vice versa)."""
+
+
+class SessionStore:
+    """
+    Version history of request payloads, kept server-side so clients can refer to it.
+
+    Every version is a dict of fields (prompts, artifacts, ...). Each field is
+    stored once per distinct content in a content-addressed, compressed blob
+    table, so unchanged fields are shared between versions and sessions.
+    Sessions expire ``ttl_seconds`` after their last use.
+    """
+
+    def __init__(self, path: str = SESSION_DB_PATH, ttl_seconds: int = SESSION_TTL_SECONDS,
+                 level: int = SESSION_ZSTD_LEVEL):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.level = level
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._last_eviction = 0.0
+        # Bytes that requests did not have to send because they referenced a session.
+        self.bytes_not_uploaded = 0
+        self.resolved_requests = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened lazily and per process: SQLite handles must not cross a fork.
+        if self._conn is None or self._pid != os.getpid():
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            self._pid = os.getpid()
+        return self._conn
+
+    def _compress(self, raw: bytes) -> Tuple[str, bytes]:
+        if zstandard is not None:
+            return "zstd", zstandard.ZstdCompressor(level=self.level).compress(raw)
+        return "zlib", zlib.compress(raw, 6)
+
+    @staticmethod
+    def _decompress(codec: str, data: bytes) -> bytes:
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read this session")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return zlib.decompress(data)
+
+    def _put_blob(self, conn: sqlite3.Connection, value: Any) -> str:
+        raw = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.blake2b(raw, digest_size=20).hexdigest()
+        if conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone() is None:
+            codec, data = self._compress(raw)
+            conn.execute(
+                "INSERT OR IGNORE INTO blobs (hash, codec, data, raw_size, stored_size) VALUES (?, ?, ?, ?, ?)",
+                (digest, codec, data, len(raw), len(data)),
+            )
+        return digest
+
+    def _write_version(self, conn: sqlite3.Connection, session_id: str, version: int, payload: Dict[str, Any]) -> None:
+        for field, value in payload.items():
+            conn.execute(
+                "INSERT INTO version_fields (session_id, version, field, hash) VALUES (?, ?, ?, ?)",
+                (session_id, version, field, self._put_blob(conn, value)),
+            )
+
+    def create(self, kind: str, payload: Dict[str, Any]) -> Tuple[str, int]:
+        """Starts a session with ``payload`` as version 1; returns ``(session_id, version)``."""
+        session_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("INSERT INTO sessions (id, kind, created_at, last_access) VALUES (?, ?, ?, ?)",
+                             (session_id, kind, now, now))
+                self._write_version(conn, session_id, 1, payload)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._maybe_evict(conn, now)
+        return session_id, 1
+
+    def append(self, session_id: str, payload: Dict[str, Any]) -> int:
+        """
+        Adds a version to a session and returns its number.
+
+        Fields missing from ``payload`` are carried over from the latest version.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                latest = self._latest_version(conn, session_id, now)
+                inherited = conn.execute(
+                    "SELECT field, hash FROM version_fields WHERE session_id = ? AND version = ?",
+                    (session_id, latest),
+                ).fetchall()
+                version = latest + 1
+                for field, digest in inherited:
+                    if field not in payload:
+                        conn.execute(
+                            "INSERT INTO version_fields (session_id, version, field, hash) VALUES (?, ?, ?, ?)",
+                            (session_id, version, field, digest),
+                        )
+                self._write_version(conn, session_id, version, payload)
+                conn.execute("UPDATE sessions SET last_access = ? WHERE id = ?", (now, session_id))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._maybe_evict(conn, now)
+        return version
+
+    def load(self, session_id: str, version: Optional[int] = None) -> Tuple[Dict[str, Any], int]:
+        """Returns ``(payload, version)`` for ``version``, or the latest one."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            if version is None:
+                version = self._latest_version(conn, session_id, now)
+            rows = conn.execute(
+                "SELECT f.field, b.codec, b.data FROM version_fields f JOIN blobs b ON b.hash = f.hash "
+                "WHERE f.session_id = ? AND f.version = ?",
+                (session_id, version),
+            ).fetchall()
+            if not rows or not self._is_live(conn, session_id, now):
+                raise SessionNotFound(f"{session_id} v{version}")
+            conn.execute("UPDATE sessions SET last_access = ? WHERE id = ?", (now, session_id))
+        payload = {field: json.loads(self._decompress(codec, data)) for field, codec, data in rows}
+        return payload, version
+
+    def kind(self, session_id: str) -> str:
+        """The kind the session was created with."""
+        with self._lock:
+            row = self._connection().execute("SELECT kind FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None:
+            raise SessionNotFound(session_id)
+        return row[0]
+
+    def resolve(self, session_id: str, version: Optional[int], provided: Dict[str, Any],
+                kind: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+        """
+        Fills the fields a request left out (None) from a stored version.
+
+        Returns the merged payload and the version it was based on; the size of
+        the fields taken from the store is counted as upload saved. Raises
+        :class:`SessionKindMismatch` when ``kind`` is given and the session
+        was created with another.
+        """
+        if kind is not None:
+            stored_kind = self.kind(session_id)
+            if stored_kind != kind:
+                raise SessionKindMismatch(f"{session_id} is a {stored_kind} session, not a {kind} session")
+        stored, version = self.load(session_id, version)
+        sent = {field: value for field, value in provided.items() if value is not None}
+        reused = {field: value for field, value in stored.items() if field not in sent}
+        self.record_resolved(len(json.dumps(reused, ensure_ascii=False)) if reused else 0)
+        return {**stored, **sent}, version
+
+    def _is_live(self, conn: sqlite3.Connection, session_id: str, now: float) -> bool:
+        row = conn.execute("SELECT last_access FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return row is not None and row[0] >= now - self.ttl_seconds
+
+    def _latest_version(self, conn: sqlite3.Connection, session_id: str, now: float) -> int:
+        if not self._is_live(conn, session_id, now):
+            raise SessionNotFound(session_id)
+        row = conn.execute("SELECT MAX(version) FROM version_fields WHERE session_id = ?", (session_id,)).fetchone()
+        if row[0] is None:
+            raise SessionNotFound(session_id)
+        return row[0]
+
+    def _maybe_evict(self, conn: sqlite3.Connection, now: float) -> None:
+        if now - self._last_eviction >= EVICT_INTERVAL:
+            self._last_eviction = now
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        cursor = conn.execute("DELETE FROM sessions WHERE last_access < ?", (now - self.ttl_seconds,))
+        if cursor.rowcount:
+            conn.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT hash FROM version_fields)")
+            logger.info("Evicted %d expired sessions", cursor.rowcount)
+        return cursor.rowcount
+
+    def evict_expired(self) -> int:
+        """Deletes expired sessions and the blobs only they used; returns the number of sessions removed."""
+        with self._lock:
+            return self._evict(self._connection(), time.time())
+
+    def record_resolved(self, size: int) -> None:
+        """Counts ``size`` bytes a request referenced by session instead of sending."""
+        with self._lock:
+            self.bytes_not_uploaded += size
+            self.resolved_requests += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            conn = self._connection()
+            sessions = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            versions, field_refs, logical = conn.execute(
+                "SELECT COUNT(DISTINCT f.session_id || ':' || f.version), COUNT(*), COALESCE(SUM(b.raw_size), 0) "
+                "FROM version_fields f JOIN blobs b ON b.hash = f.hash"
+            ).fetchone()
+            blobs, raw, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(stored_size), 0) FROM blobs"
+            ).fetchone()
+            return {
+                "sessions": sessions,
+                "versions": versions,
+                "blobs": blobs,
+                "field_references": field_refs,
+                # Size of every version written out in full vs. what is actually on disk.
+                "logical_bytes": logical,
+                "unique_bytes": raw,
+                "stored_bytes": stored,
+                "storage_ratio": round(logical / stored, 2) if stored else 0.0,
+                "resolved_requests": self.resolved_requests,
+                "bytes_not_uploaded": self.bytes_not_uploaded,
+            }
+
+
+session_store = SessionStore()
@@ -0,0 +1,136 @@
+import hashlib
+import mimetypes
+import os
+import re
+from pathlib import Path
+from typing import Dict, NamedTuple
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+
+from src.logger import logger
+
+# Next.js puts content-hashed build output under _next/static; other bundlers
+# append a hex digest to the file name.
+FINGERPRINT_PATTERN = re.compile(r"(^|/)_next/static/|[.-][0-9a-f]{8,}\.[a-z0-9]+$")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+DEFAULT_CACHE = "public, max-age=3600"
+
+
+class EncodedVariant(NamedTuple):
+    path: str
+    stat_result: os.stat_result
+    etag: str
+
+
+class StaticAsset(NamedTuple):
+    media_type: str
+    cache_control: str
+    # "identity" plus any of "br" / "gzip" that were built next to the file.
+    variants: Dict[str, EncodedVariant]
+
+
+def _etag(data: bytes, encoding: str) -> str:
+    digest = hashlib.blake2b(data, digest_size=12).hexdigest()
+    return f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+
+
+def _accepted_encodings(scope) -> set:
+    accepted = set()
+    for part in Headers(scope=scope).get("accept-encoding", "").split(","):
+        token, _, params = part.strip().partition(";")
+        if token and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(token.lower())
+    return accepted
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+class SPAStaticFiles(StaticFiles):
+    """
+    Serves the exported Next.js frontend as a single-page app.
+
+    Every file is indexed once at startup, so lookups are dictionary hits and
+    unknown deep links fall back to the in-memory ``index.html`` without going
+    through a 404 exception. ``.br`` / ``.gz`` siblings built by
+    ``precompress.py`` at build time are served when the client accepts them,
+    fingerprinted assets are cached immutably and ``If-None-Match`` is answered
+    with 304s. Nothing is written to ``directory``.
+    """
+
+    def __init__(self, directory, **kwargs):
+        super().__init__(directory=directory, html=True, **kwargs)
+        root = Path(directory)
+        self.routes: Dict[str, StaticAsset] = {}
+        self.index_bodies: Dict[str, bytes] = {}
+        self._index_routes(root)
+        if not any(len(asset.variants) > 1 for asset in self.routes.values()):
+            logger.info("No precompressed static assets in %s; run `python precompress.py %s` after the build", root, root)
+
+    def _index_routes(self, root: Path) -> None:
+        for source in root.rglob("*"):
+            if not source.is_file() or source.suffix in (".gz", ".br"):
+                continue
+            relative = source.relative_to(root).as_posix()
+            asset = self._load_asset(source, relative)
+            self.routes[relative] = asset
+            # Next.js exports /about as about.html and nested routes as dir/index.html.
+            if relative == "index.html":
+                self.routes["."] = asset
+                for encoding, variant in asset.variants.items():
+                    self.index_bodies[encoding] = Path(variant.path).read_bytes()
+            elif relative.endswith("/index.html"):
+                self.routes.setdefault(relative[: -len("/index.html")], asset)
+            elif relative.endswith(".html"):
+                self.routes.setdefault(relative[: -len(".html")], asset)
+
+    def _load_asset(self, source: Path, relative: str) -> StaticAsset:
+        media_type = mimetypes.guess_type(source.name)[0] or "application/octet-stream"
+        if FINGERPRINT_PATTERN.search(relative):
+            cache_control = IMMUTABLE_CACHE
+        elif source.suffix == ".html":
+            cache_control = REVALIDATE_CACHE
+        else:
+            cache_control = DEFAULT_CACHE
+        variants = {}
+        for encoding, suffix in (("identity", ""), ("br", ".br"), ("gzip", ".gz")):
+            path = source.with_name(source.name + suffix)
+            if path.is_file():
+                variants[encoding] = EncodedVariant(str(path), path.stat(), _etag(path.read_bytes(), encoding))
+        return StaticAsset(media_type, cache_control, variants)
+
+    async def get_response(self, path: str, scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+
+        asset = self.routes.get(path) or self.routes.get(".")
+        if asset is None:
+            raise HTTPException(status_code=404)
+
+        accepted = _accepted_encodings(scope)
+        encoding = next((enc for enc in ("br", "gzip") if enc in asset.variants and enc in accepted), "identity")
+        variant = asset.variants[encoding]
+
+        headers = {"cache-control": asset.cache_control, "etag": variant.etag}
+        if len(asset.variants) > 1:
+            headers["vary"] = "Accept-Encoding"
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match and _matches(if_none_match, variant.etag):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["content-encoding"] = encoding
+
+        if asset is self.routes.get(".") and encoding in self.index_bodies:
+            return Response(self.index_bodies[encoding], media_type=asset.media_type, headers=headers)
+        return FileResponse(variant.path, stat_result=variant.stat_result, media_type=asset.media_type, headers=headers)
+
@@ -0,0 +1,224 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from src.config import (
+    TEMPLATE_LIBRARY_ADAPT_SIMILARITY,
+    TEMPLATE_LIBRARY_DB_PATH,
+    TEMPLATE_LIBRARY_MAX_ENTRIES,
+    TEMPLATE_LIBRARY_MAX_TEMPLATE_CHARS,
+    TEMPLATE_LIBRARY_SERVE_SIMILARITY,
+)
+from src.logger import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS templates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    template_type TEXT NOT NULL,
+    prompt_length TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    variables TEXT NOT NULL,
+    intent TEXT NOT NULL,
+    final_template TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (template_type, prompt_length, signature, variables)
+);
+CREATE INDEX IF NOT EXISTS idx_templates_kind ON templates(template_type, prompt_length);
+CREATE INDEX IF NOT EXISTS idx_templates_last_used ON templates(last_used);
+"""
+
+STOPWORDS = frozenset((
+    "a", "an", "the", "and", "or", "of", "for", "to", "in", "on", "with", "by", "from", "about", "into", "that",
+    "this", "these", "those", "is", "are", "be", "it", "its", "as", "at", "i", "me", "my", "we", "our", "you",
+    "your", "want", "need", "please", "can", "could", "would", "should", "will", "some", "any", "which", "who",
+    "create", "make", "build", "generate", "write", "template", "prompt",
+))
+_WORD = re.compile(r"[a-z0-9]+")
+_SUFFIXES = ("ing", "ies", "ed", "es", "s")
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[: -len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def intent_tokens(intent: str) -> FrozenSet[str]:
+    """Content words of ``intent``, lower-cased and crudely stemmed, without stopwords."""
+    return frozenset(_stem(word) for word in _WORD.findall(intent.lower()) if word not in STOPWORDS)
+
+
+def intent_signature(intent: str) -> str:
+    """Order- and phrasing-insensitive key for an intent: its sorted content words."""
+    return " ".join(sorted(intent_tokens(intent)))
+
+
+def normalize_variables(variables: Iterable[str]) -> Tuple[str, ...]:
+    """``["User Name", "{topic}"]`` -> ``("topic", "user_name")``."""
+    names = (re.sub(r"[^a-z0-9]+", "_", variable.strip().strip("{}").lower()).strip("_") for variable in variables)
+    return tuple(sorted({name for name in names if name}))
+
+
+def jaccard(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+class TemplateMatch:
+    """A library entry close enough to a request to be reused."""
+
+    def __init__(self, entry_id: int, intent: str, final_template: str, variables: Tuple[str, ...],
+                 similarity: float, exact: bool):
+        self.entry_id = entry_id
+        self.intent = intent
+        self.final_template = final_template
+        self.variables = variables
+        self.similarity = similarity
+        # Same variables and an intent within the serve threshold: usable without any model call.
+        self.exact = exact
+
+    def describe(self) -> Dict[str, Any]:
+        return {"entry_id": self.entry_id, "similarity": round(self.similarity, 3), "source_intent": self.intent}
+
+
+class TemplateLibrary:
+    """
+    Finished Project Mania templates, reusable by later requests that ask for the same thing.
+
+    Entries are keyed by template type, prompt length, the normalized intent
+    signature and the variable set. A lookup scores the entries of the same
+    type and length by word overlap of the intents and of the variables: a
+    match at or above ``serve_similarity`` with identical variables is served
+    as-is, one at or above ``adapt_similarity`` is worth a single adaptation
+    call. The library holds at most ``max_entries`` templates and evicts the
+    least recently used ones beyond that.
+    """
+
+    def __init__(self, path: str = TEMPLATE_LIBRARY_DB_PATH, max_entries: int = TEMPLATE_LIBRARY_MAX_ENTRIES,
+                 serve_similarity: float = TEMPLATE_LIBRARY_SERVE_SIMILARITY,
+                 adapt_similarity: float = TEMPLATE_LIBRARY_ADAPT_SIMILARITY,
+                 max_template_chars: int = TEMPLATE_LIBRARY_MAX_TEMPLATE_CHARS):
+        self.path = path
+        self.max_entries = max_entries
+        self.serve_similarity = serve_similarity
+        self.adapt_similarity = adapt_similarity
+        self.max_template_chars = max_template_chars
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self.counters = {"lookups": 0, "served": 0, "adapted": 0, "adapt_failures": 0, "misses": 0,
+                         "stored": 0, "evicted": 0}
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened lazily and per process: SQLite handles must not cross a fork.
+        if self._conn is None or self._pid != os.getpid():
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._pid = os.getpid()
+        return self._conn
+
+    def lookup(self, intent: str, template_type: str, prompt_length: str, variables: List[str]) -> Optional[TemplateMatch]:
+        """
+        Best reusable entry for a request, or None.
+
+        The similarity is 0.7 x intent overlap + 0.3 x variable overlap; the
+        returned match is ``exact`` when it can be served without adaptation.
+        """
+        tokens = intent_tokens(intent)
+        wanted = normalize_variables(variables)
+        best: Optional[TemplateMatch] = None
+        with self._lock:
+            self.counters["lookups"] += 1
+            conn = self._connection()
+            rows = conn.execute(
+                "SELECT id, signature, variables, intent, final_template FROM templates "
+                "WHERE template_type = ? AND prompt_length = ?",
+                (template_type, prompt_length),
+            ).fetchall()
+            for entry_id, signature, stored_variables, stored_intent, final_template in rows:
+                stored = tuple(json.loads(stored_variables))
+                intent_similarity = jaccard(tokens, frozenset(signature.split()))
+                similarity = 0.7 * intent_similarity + 0.3 * jaccard(frozenset(wanted), frozenset(stored))
+                if similarity < self.adapt_similarity or (best is not None and similarity <= best.similarity):
+                    continue
+                exact = stored == wanted and intent_similarity >= self.serve_similarity
+                best = TemplateMatch(entry_id, stored_intent, final_template, stored, similarity, exact)
+        return best
+
+    def record(self, outcome: str, match: Optional[TemplateMatch] = None) -> None:
+        """
+        Counts how a lookup was used: "served", "adapted", "adapt_failures" or "misses".
+
+        A reused ``match`` is marked as recently used, which keeps it from eviction.
+        """
+        with self._lock:
+            self.counters[outcome] += 1
+            if match is not None and outcome in ("served", "adapted"):
+                self._connection().execute("UPDATE templates SET last_used = ?, hits = hits + 1 WHERE id = ?",
+                                           (time.time(), match.entry_id))
+
+    def store(self, intent: str, template_type: str, prompt_length: str, variables: List[str],
+              final_template: str) -> bool:
+        """Adds or replaces the entry for a finished template; returns False if it is too large to keep."""
+        if not final_template or len(final_template) > self.max_template_chars:
+            return False
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT INTO templates (template_type, prompt_length, signature, variables, intent, final_template, "
+                    "created_at, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (template_type, prompt_length, signature, variables) DO UPDATE SET "
+                    "intent = excluded.intent, final_template = excluded.final_template, last_used = excluded.last_used",
+                    (template_type, prompt_length, intent_signature(intent), json.dumps(normalize_variables(variables)),
+                     intent, final_template, now, now),
+                )
+                evicted = self._evict(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self.counters["stored"] += 1
+            self.counters["evicted"] += evicted
+        if evicted:
+            logger.info("Evicted %d least recently used library templates", evicted)
+        return True
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        cursor = conn.execute(
+            "DELETE FROM templates WHERE id IN (SELECT id FROM templates ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        return max(cursor.rowcount, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, stored_chars, hits = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(final_template)), 0), COALESCE(SUM(hits), 0) FROM templates"
+            ).fetchone()
+            counters = dict(self.counters)
+        reused = counters["served"] + counters["adapted"]
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "stored_chars": stored_chars,
+            "entry_hits": hits,
+            **counters,
+            "hit_rate": round(reused / counters["lookups"], 3) if counters["lookups"] else 0.0,
+        }
+
+
+template_library = TemplateLibrary()
@@ -0,0 +1,292 @@
+import functools
+import math
+import re
+from typing import Any, Callable, Dict, List, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.config import (
+    TOKEN_BUDGET_AGENT_OUTPUT,
+    TOKEN_BUDGET_ENABLED,
+    TOKEN_BUDGET_OUTPUT_TOKENS,
+    TOKEN_BUDGET_SAFETY_MARGIN,
+    TOKEN_BUDGET_THINKING_TOKENS,
+)
+from src.logger import logger
+
+try:
+    import tiktoken
+except ImportError:  # Token counts fall back to the character-ratio estimate.
+    tiktoken = None
+
+PROVIDER_TYPES = {"chat-google-generative-ai": "gemini", "groq-chat": "groq", "mistralai-chat": "mistral"}
+
+# Context window (input + output tokens) by model-name prefix; the longest matching prefix wins.
+CONTEXT_WINDOWS = {
+    "gemini-": 1_048_576,
+    "mistral-large": 131_072,
+    "mistral-medium": 131_072,
+    "mistral-small": 32_768,
+    "open-mistral": 32_768,
+    "llama-3.1": 131_072,
+    "llama-3.3": 131_072,
+    "llama3-": 8_192,
+    "meta-llama/llama-4": 131_072,
+    "gemma2": 8_192,
+    "mixtral-8x7b": 32_768,
+    "qwen": 131_072,
+    "deepseek-r1": 131_072,
+    "openai/gpt-oss": 131_072,
+}
+DEFAULT_CONTEXT_WINDOW = 8_192
+
+# Whether a model's reasoning ("thinking") tokens count toward its output limit, by model-name prefix; the longest
+# matching prefix wins. Their output cap gets TOKEN_BUDGET_THINKING_TOKENS on top of the agent's budget.
+THINKING_MODELS = {
+    "gemini-2.5-pro": True,
+    "gemini-2.5-flash": True,
+    "gemini-2.5-flash-lite": False,  # thinks only when given a thinking budget
+    "deepseek-r1": True,
+    "qwen/qwen3": True,
+    "openai/gpt-oss": True,
+}
+
+# Characters per token of each provider's tokenizer on English prose and markdown; non-ASCII
+# characters are counted as a token each, which over- rather than under-estimates most scripts.
+CHARS_PER_TOKEN = {"gemini": 4.0, "groq": 3.8, "mistral": 3.3}
+DEFAULT_CHARS_PER_TOKEN = 3.3
+
+# Output-length field of each provider's chat model.
+OUTPUT_FIELDS = {"gemini": "max_output_tokens", "groq": "max_tokens", "mistral": "max_tokens"}
+
+# Finish reasons (lower-cased) with which the providers report a response cut off at the output limit.
+LENGTH_FINISH_REASONS = ("length", "max_tokens")
+
+TRUNCATION_MARKER = "\n[... truncated ...]\n"
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+_HEADING = re.compile(r"^\s*(?:#{1,6}\s|\*\*[^*\n]{1,80}\*\*|[A-Z][\w /&-]{0,40}:\s*$)")
+_LIST_ITEM = re.compile(r"^\s*(?:[-*•]|\d{1,2}[.)])\s")
+
+
+class TokenBudgetExceeded(ValueError):
+    """A request cannot fit the model's context window, even after the allowed truncation."""
+
+    def __init__(self, agent: str, model: str, tokens: int, limit: int, what: str = "input"):
+        self.agent = agent
+        self.model = model
+        self.tokens = tokens
+        self.limit = limit
+        super().__init__(
+            f"{agent}: the {what} needs about {tokens} tokens but {model} allows {limit}. "
+            f"Shorten the request or choose a model with a larger context window."
+        )
+
+
+def parse_agent_budgets(spec: str) -> Dict[str, int]:
+    """Parses ``"RefineAgent=8192,FinalPrompt=8192"`` into output token budgets per agent."""
+    budgets = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        agent, _, value = item.partition("=")
+        budgets[agent.strip()] = int(value)
+    return budgets
+
+
+AGENT_OUTPUT = parse_agent_budgets(TOKEN_BUDGET_AGENT_OUTPUT)
+
+
+def model_key(llm: Any) -> Tuple[str, str]:
+    """``(provider, model)`` of a chat model, e.g. ``("groq", "llama-3.1-8b-instant")``."""
+    llm_type = getattr(llm, "_llm_type", "")
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or ""
+    return PROVIDER_TYPES.get(llm_type, llm_type), str(model).replace("models/", "", 1)
+
+
+def context_window(model: str) -> int:
+    matches = [prefix for prefix in CONTEXT_WINDOWS if model.lower().startswith(prefix)]
+    return CONTEXT_WINDOWS[max(matches, key=len)] if matches else DEFAULT_CONTEXT_WINDOW
+
+
+@functools.lru_cache(maxsize=None)
+def token_counter(provider: str, model: str) -> Callable[[str], int]:
+    """
+    Token counter for a model, built once per model.
+
+    Groq's Llama 3 models use a tiktoken-derived vocabulary, so cl100k_base
+    counts them closely when tiktoken is installed. Everything else, and Groq
+    without tiktoken, uses the provider's characters-per-token ratio.
+    """
+    if tiktoken is not None and provider == "groq" and "llama" in model.lower():
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    ratio = CHARS_PER_TOKEN.get(provider, DEFAULT_CHARS_PER_TOKEN)
+
+    def estimate(text: str) -> int:
+        non_ascii = len(_NON_ASCII.findall(text))
+        return math.ceil((len(text) - non_ascii) / ratio) + non_ascii
+
+    return estimate
+
+
+def count_tokens(llm: Any, text: str) -> int:
+    return token_counter(*model_key(llm))(text or "")
+
+
+def thinking_tokens(model: str) -> int:
+    """Output tokens set aside for the model's thinking; 0 for models whose thinking is not counted as output."""
+    matches = [prefix for prefix in THINKING_MODELS if model.lower().startswith(prefix)]
+    return TOKEN_BUDGET_THINKING_TOKENS if matches and THINKING_MODELS[max(matches, key=len)] else 0
+
+
+def output_budget(llm: Any, agent: str) -> int:
+    """``agent``'s configured output tokens, but never more than half the model's context window."""
+    return min(AGENT_OUTPUT.get(agent, TOKEN_BUDGET_OUTPUT_TOKENS), context_window(model_key(llm)[1]) // 2)
+
+
+def output_limit(llm: Any, agent: str) -> int:
+    """The output cap set on ``agent``'s model: its output budget plus room for the model's thinking."""
+    _, model = model_key(llm)
+    return min(output_budget(llm, agent) + thinking_tokens(model), context_window(model) // 2)
+
+
+def input_budget(llm: Any, agent: str) -> int:
+    """Tokens ``agent`` may send: the context window minus its output limit, less the safety margin."""
+    _, model = model_key(llm)
+    return int((context_window(model) - output_limit(llm, agent)) * (1 - TOKEN_BUDGET_SAFETY_MARGIN))
+
+
+class TruncationWarning(BaseCallbackHandler):
+    """Logs a warning when a capped model stops at its output limit instead of finishing its answer."""
+
+    run_inline = True
+
+    def __init__(self, agent: str, limit: int):
+        self.agent = agent
+        self.limit = limit
+
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        for generation in (generation for batch in response.generations for generation in batch):
+            metadata = getattr(getattr(generation, "message", None), "response_metadata", None) or {}
+            reason = (generation.generation_info or {}).get("finish_reason") or metadata.get("finish_reason")
+            if str(reason or "").lower() in LENGTH_FINISH_REASONS:
+                logger.warning("%s: response stopped at its %d-token output limit and is likely truncated; "
+                               "raise its budget in TOKEN_BUDGET_AGENT_OUTPUT", self.agent, self.limit)
+                return
+
+
+def cap_output(llm: Any, agent: str) -> Any:
+    """
+    A copy of ``llm`` that generates at most ``agent``'s output limit.
+
+    The copy shares the original's clients and connection pool, and warns
+    when a response is cut off at the limit. Models from other providers,
+    and everything when TOKEN_BUDGET_ENABLED is off, are returned unchanged.
+    """
+    field = OUTPUT_FIELDS.get(model_key(llm)[0])
+    if not TOKEN_BUDGET_ENABLED or field is None or field not in getattr(type(llm), "model_fields", {}):
+        return llm
+    current = getattr(llm, field, None)
+    limit = output_limit(llm, agent)
+    if current is not None and current <= limit:
+        return llm
+    callbacks = llm.callbacks
+    if callbacks is None or isinstance(callbacks, list):
+        # Kept alongside the router's StageRecorder; a callback manager is left as it is.
+        callbacks = [*(callbacks or []), TruncationWarning(agent, limit)]
+    return llm.model_copy(update={field: limit, "callbacks": callbacks})
+
+
+def check_input(llm: Any, agent: str, *texts: str) -> int:
+    """Raises :class:`TokenBudgetExceeded` if ``texts`` cannot fit ``agent``'s input budget; returns their tokens."""
+    tokens = sum(count_tokens(llm, text) for text in texts)
+    if TOKEN_BUDGET_ENABLED and tokens > input_budget(llm, agent):
+        raise TokenBudgetExceeded(agent, model_key(llm)[1] or model_key(llm)[0], tokens, input_budget(llm, agent))
+    return tokens
+
+
+def check_output(llm: Any, agent: str, expected_tokens: int) -> None:
+    """Raises :class:`TokenBudgetExceeded` if a response of ``expected_tokens`` cannot fit ``agent``'s output budget."""
+    if TOKEN_BUDGET_ENABLED and expected_tokens > output_budget(llm, agent):
+        raise TokenBudgetExceeded(agent, model_key(llm)[1] or model_key(llm)[0], expected_tokens,
+                                  output_budget(llm, agent), what="output")
+
+
+def truncate(text: str, max_tokens: int, count: Callable[[str], int]) -> str:
+    """Keeps the head and tail of ``text`` (two thirds / one third) so it fits ``max_tokens``."""
+    tokens = count(text)
+    if tokens <= max_tokens:
+        return text
+    chars = max(0, int(len(text) * max_tokens / tokens) - len(TRUNCATION_MARKER))
+    while True:
+        head = chars * 2 // 3
+        result = text[:head] + TRUNCATION_MARKER + text[len(text) - (chars - head):] if chars else TRUNCATION_MARKER.strip()
+        if chars == 0 or count(result) <= max_tokens:
+            return result
+        chars = int(chars * 0.9)
+
+
+def summarize(text: str, max_tokens: int, count: Callable[[str], int]) -> str:
+    """
+    Extractive summary of ``text`` in ``max_tokens``, without a model call.
+
+    Keeps lines in their original order, preferring headings, then the first
+    line of each paragraph, then list items; anything still too long is
+    truncated.
+    """
+    if count(text) <= max_tokens:
+        return text
+    lines = text.splitlines()
+    ranked: List[Tuple[int, int]] = []
+    previous_blank = True
+    for index, line in enumerate(lines):
+        if not line.strip():
+            previous_blank = True
+            continue
+        heading = bool(_HEADING.match(line))
+        rank = 0 if heading else 1 if previous_blank else 2 if _LIST_ITEM.match(line) else 3
+        ranked.append((rank, index))
+        # The line under a heading opens a paragraph too.
+        previous_blank = heading
+    kept, used = set(), 0
+    for rank, index in sorted(ranked):
+        cost = count(lines[index]) + 1
+        if used + cost > max_tokens:
+            continue
+        kept.add(index)
+        used += cost
+    summary = "\n".join(lines[index] for index in sorted(kept))
+    return truncate(summary or text, max_tokens, count)
+
+
+POLICIES = {"truncate": truncate, "summarize": summarize}
+
+
+def fit_inputs(llm: Any, agent: str, fixed: str, fields: Dict[str, str], policy: str = "truncate") -> Dict[str, str]:
+    """
+    Shrinks ``fields`` so that they and the ``fixed`` text fit ``agent``'s input budget.
+
+    ``fixed`` (the prompt template and any input that must be sent whole) is
+    never cut; if it alone exceeds the budget the request is impossible and
+    :class:`TokenBudgetExceeded` is raised. Otherwise each field gets a share
+    of the remaining tokens proportional to its size and is cut with
+    ``policy`` ("truncate" or "summarize"). Fields that already fit are
+    returned unchanged.
+    """
+    if not TOKEN_BUDGET_ENABLED:
+        return fields
+    count = token_counter(*model_key(llm))
+    budget = input_budget(llm, agent)
+    fixed_tokens = check_input(llm, agent, fixed)
+    sizes = {name: count(value or "") for name, value in fields.items()}
+    total = sum(sizes.values())
+    available = budget - fixed_tokens
+    if total <= available:
+        return fields
+    shrink = POLICIES[policy]
+    fitted = {
+        name: shrink(value, max(1, available * sizes[name] // total), count) if sizes[name] else value
+        for name, value in fields.items()
+    }
+    logger.warning("%s input over budget: %d field tokens cut to %d (policy %s, budget %d)",
+                   agent, total, sum(count(value or "") for value in fitted.values()), policy, budget)
+    return fitted
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from typing import Any, Dict
+
+from src.config import WARMUP_TIMEOUT_SECONDS, WARMUP_GROQ_MODEL
+from src.llm_clients import PROVIDERS, SERVER_KEYS, llm_pool
+from src.logger import logger
+
+
+class Readiness:
+    """Startup state reported by ``/ready``; flips once warmup has finished."""
+
+    def __init__(self):
+        self.ready = False
+        self.steps: Dict[str, Any] = {}
+
+    def report(self) -> Dict[str, Any]:
+        return {"status": "ready" if self.ready else "warming", "steps": self.steps}
+
+
+readiness = Readiness()
+
+
+def _load_agent_classes() -> int:
+    from src.agents.registry import AGENT_SPECS, load_agent_class
+    import langgraph.graph  # noqa: F401  (the pipelines import it when they build their graphs)
+
+    # Agents are built per request around its model; what carries over is the imported (and cached) class.
+    for name in AGENT_SPECS:
+        load_agent_class(name)
+    return len(AGENT_SPECS)
+
+
+def _build_format_instructions() -> int:
+    from src.agents.evaluate.evaluate_agent import format_instructions
+    from src.models.evaluateSchema import LLMAsJudgeOutput, TRAGOutput, MARFrameworkOutput, FinalEvaluationOutput
+
+    schemas = (LLMAsJudgeOutput, TRAGOutput, MARFrameworkOutput, FinalEvaluationOutput)
+    for schema in schemas:
+        format_instructions(schema)
+    return len(schemas)
+
+
+async def _connect(provider: str) -> str:
+    if not SERVER_KEYS.get(provider):
+        return "skipped: no server key"
+    try:
+        await asyncio.wait_for(llm_pool.connect(provider, WARMUP_GROQ_MODEL), WARMUP_TIMEOUT_SECONDS)
+        return "connected"
+    except Exception as e:
+        # A provider that is down must not keep the instance out of rotation;
+        # its first request will connect instead.
+        logger.warning("Warmup could not connect to %s: %r", provider, e)
+        return f"failed: {type(e).__name__}"
+
+
+async def warm_up(state: Readiness = readiness) -> None:
+    """
+    Imports the agent classes, builds the evaluators' format instructions and
+    connects the server-key models, which the first requests would otherwise
+    pay for, then marks the app ready.
+    """
+    started = time.perf_counter()
+
+    step = time.perf_counter()
+    count = await asyncio.to_thread(_load_agent_classes)
+    state.steps["agent_classes"] = {"imported": count, "ms": round((time.perf_counter() - step) * 1000, 1)}
+
+    step = time.perf_counter()
+    count = _build_format_instructions()
+    state.steps["format_instructions"] = {"built": count, "ms": round((time.perf_counter() - step) * 1000, 1)}
+
+    step = time.perf_counter()
+    results = await asyncio.gather(*(_connect(provider) for provider in PROVIDERS))
+    state.steps["connections"] = dict(zip(PROVIDERS, results))
+    state.steps["connections"]["ms"] = round((time.perf_counter() - step) * 1000, 1)
+
+    state.ready = True
+    logger.info("Warmup finished in %.1f ms: %s", (time.perf_counter() - started) * 1000, state.steps)
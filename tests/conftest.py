@@ -0,0 +1,19 @@
+import os
+import sys
+from pathlib import Path
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Keep the tests independent of anything a previous request left in the process-wide library.
+os.environ.setdefault("TEMPLATE_LIBRARY_ENABLED", "false")
+
+
+class FakeGroq(FakeListChatModel):
+    """A canned chat model that reports itself as Groq, so token budgets and output caps apply to it."""
+
+    responses: list = [""]
+
+    @property
+    def _llm_type(self) -> str:
+        return "groq-chat"
@@ -0,0 +1,34 @@
+import asyncio
+
+from src.agents.evaluate.heuristic_scorer import heuristic_evaluation
+from src.chains.evaluate_pipleline import EvaluatePipeline
+from src.models.evaluateSchema import EvaluateBatchInput
+
+from conftest import FakeGroq
+
+
+def test_failed_group_call_falls_back_to_one_by_one():
+    pipeline = EvaluatePipeline(FakeGroq(), mode="fast")
+    judged = []
+
+    async def rate_limited(prompts, initial_prompt=None):
+        raise RuntimeError("429 Too Many Requests")
+
+    async def run(input_data):
+        judged.append(input_data.prompt_to_evaluate)
+        return heuristic_evaluation(input_data.prompt_to_evaluate, input_data.initial_prompt)
+
+    pipeline.fused_judge_agent.evaluate_group = rate_limited
+    pipeline.run = run
+    batch = EvaluateBatchInput(prompts=["Summarize the report.", "List three risks.", "Write a haiku."], mode="fast")
+
+    async def collect():
+        return [item async for item in pipeline.run_batch(batch)]
+
+    items = asyncio.run(collect())
+
+    assert pipeline._groups(batch.prompts, "fast", False) == [[0, 1, 2]]
+    assert sorted(item.index for item in items) == [0, 1, 2]
+    assert all(item.evaluation is not None and item.error is None for item in items)
+    assert sorted(judged) == sorted(batch.prompts)
+    assert len(EvaluatePipeline.rank(items)) == 3
@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+from src.chains.project_pipeline import ProjectPipeline
+from src.models.prompt_schema import PromptSchema
+
+from conftest import FakeGroq
+
+
+SECTIONS = {
+    "techStack": {"frontend": "React"},
+    "features": [{"name": "cart"}],
+    "uiComponents": [{"name": "Navbar"}],
+    "uiDesign": {"colorPalette": "blue", "typography": "Inter", "aesthetic": "clean"},
+}
+
+
+class ProjectModel(FakeGroq):
+    """Answers each project agent from the text of its prompt, recording what the evaluator was sent."""
+
+    reviews: list = []
+
+    def _call(self, messages, stop=None, run_manager=None, **kwargs):
+        text = messages[-1].content
+        if "you write its core" in text:
+            return json.dumps({"appName": "Shop", "description": "d", "userRoles": ["admin"], "sections": list(SECTIONS)})
+        for name, content in SECTIONS.items():
+            if f"Your Section:** `{name}`" in text:
+                return json.dumps({"content": content})
+        if "Your Section" in text:
+            return json.dumps({"content": None})
+        if "QA Engineer" in text:
+            self.reviews.append(text)
+            return json.dumps({"status": "success", "issues": []})
+        return "{}"
+
+
+def test_run_accepts_the_request_schema():
+    """/project passes the PromptSchema it received straight to the pipeline."""
+    llm = ProjectModel(reviews=[])
+    request = PromptSchema(
+        user_input="a React frontend for a shop",
+        style=["zero_shot"],
+        framework="co_star",
+        selected_model="groq",
+    )
+
+    state = asyncio.run(ProjectPipeline(llm).run(request))
+
+    assert "error" not in state
+    assert state["user_input"] == "a React frontend for a shop"
+    assert set(state["json_prompt"]) >= {"appName", *SECTIONS}
+    assert state["validation_metrics"]["llm_evaluations"] == 1
+    assert "a React frontend for a shop" in llm.reviews[0]
+    assert "selected_model=" not in llm.reviews[0]
@@ -0,0 +1,55 @@
+from typing import Optional
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src import token_budget
+from src.config import TOKEN_BUDGET_OUTPUT_TOKENS, TOKEN_BUDGET_THINKING_TOKENS
+from src.token_budget import AGENT_OUTPUT, cap_output
+
+from conftest import FakeGroq
+
+
+class CappedGroq(FakeGroq):
+    """A Groq-like model with an output-length field; every response is cut off at the limit."""
+
+    model_name: str = "llama-3.3-70b-versatile"
+    max_tokens: Optional[int] = None
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        message = AIMessage(content='{"appName": "Sh', response_metadata={"finish_reason": "length"})
+        return ChatResult(generations=[ChatGeneration(message=message, generation_info={"finish_reason": "length"})])
+
+
+class ThinkingGemini(CappedGroq):
+    model_name: str = "gemini-2.5-flash"
+    max_output_tokens: Optional[int] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "chat-google-generative-ai"
+
+
+def test_long_output_agents_get_their_own_budget():
+    llm = CappedGroq()
+
+    assert cap_output(llm, "SelfCorrection").max_tokens == TOKEN_BUDGET_OUTPUT_TOKENS
+    assert cap_output(llm, "JSONGeneratorAgent").max_tokens == AGENT_OUTPUT["JSONGeneratorAgent"]
+    assert AGENT_OUTPUT["JSONGeneratorAgent"] > TOKEN_BUDGET_OUTPUT_TOKENS
+
+
+def test_thinking_models_get_headroom():
+    capped = cap_output(ThinkingGemini(), "JSONGeneratorAgent")
+
+    assert capped.max_output_tokens == AGENT_OUTPUT["JSONGeneratorAgent"] + TOKEN_BUDGET_THINKING_TOKENS
+
+
+def test_truncated_response_is_reported(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(token_budget.logger, "warning", lambda message, *args: warnings.append(message % args))
+    capped = cap_output(CappedGroq(), "JSONGeneratorAgent")
+
+    capped.invoke("Write the blueprint.")
+
+    assert len(warnings) == 1
+    assert "JSONGeneratorAgent" in warnings[0] and "truncated" in warnings[0]